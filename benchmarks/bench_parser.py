@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parser benchmark on a synthetic Projectfile.
+
+Compares the line classification of the previous parser (one uncompiled re.match per
+classifier, tried one after the other by the states) with the single pass tokenizer,
+and measures the full parse of the synthetic file.
+
+Usage:
+    python benchmarks/bench_parser.py [<number of lines>] [<lines per command>]
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from projects.projectfile import parser
+from projects.projectfile.parser import parse
+
+
+def generate_projectfile(line_count, lines_per_command):
+    lines = [
+        'from v1.0.0',
+        '',
+        '"""',
+        'Synthetic Projectfile for benchmarking.',
+        '"""',
+        '',
+        'variable = 42',
+        ''
+    ]
+    index = 0
+    while len(lines) < line_count:
+        lines.append('command_{0}|c{0}:'.format(index))
+        lines.append('    """')
+        lines.append('    Description of command {}.'.format(index))
+        lines.append('    """')
+        for i in range(lines_per_command):
+            if i == lines_per_command // 2:
+                lines.append('    ===')
+            elif i % 10 == 0:
+                lines.append('')
+            else:
+                lines.append('    echo "step {}" # comment'.format(i))
+        index += 1
+    return lines
+
+
+def legacy_classify(line):
+    """Classification sequence of the previous pre state for a script line."""
+    if re.match('^\\s*(#.*)?$', line):
+        return 'empty'
+    if re.match('\\s*"""\\s*(#.*)?$', line):
+        return 'comment_delimiter'
+    if re.match('\\s*===\\s*(#.*)?$', line):
+        return 'command_divisor'
+    m = re.match('^\\s+([^#]*)(#.*)?$', line)
+    if m and m.group(1).strip():
+        return 'indented'
+    return 'text'
+
+
+def run(line_count, lines_per_command, repeat=3):
+    lines = generate_projectfile(line_count, lines_per_command)
+
+    def legacy():
+        for line in lines:
+            legacy_classify(line)
+
+    def tokenizer():
+        for line in lines:
+            parse.tokenize(line)
+
+    def full_parse():
+        parser.process_lines(lines)
+
+    results = [
+        ('legacy classification', min(timeit.repeat(legacy, number=1, repeat=repeat))),
+        ('tokenizer', min(timeit.repeat(tokenizer, number=1, repeat=repeat))),
+        ('full parse', min(timeit.repeat(full_parse, number=1, repeat=repeat)))
+    ]
+    print('{} lines, {} lines per command'.format(len(lines), lines_per_command))
+    for name, seconds in results:
+        print('  {:<24}{:>10.1f} ms'.format(name, seconds * 1000))
+    print('  classification speedup  {:>10.2f}x'.format(results[0][1] / results[1][1]))
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    run(*(args + [50000, 100][len(args):]))
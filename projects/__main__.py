@@ -1,5 +1,5 @@
 import sys
-from main import main
+from projects.main import main
 
 
 if __name__ == '__main__':
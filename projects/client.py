@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Thin client of the p daemon, used by the bin/p wrapper as
+
+    python -m projects.client <cwd> <args>...
+
+It forwards the arguments, the working directory, the environment and the standard
+file descriptors to the daemon and exits with the exit code of the invocation.
+Ctrl-C is forwarded as well. If the daemon is not running, or it is busy with
+another invocation, the invocation is run in-process instead.
+"""
+
+import os
+import socket
+import sys
+
+from projects import daemon
+from projects import paths
+
+
+def main(args):
+    if '--daemon' in args[1:] or not hasattr(socket.socket, 'sendmsg'):
+        _run_in_process(args)
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(paths.get_socket_path())
+    except socket.error:
+        client.close()
+        _run_in_process(args)
+    daemon.send_request(client, {
+        'args': args,
+        'cwd': os.getcwd(),
+        'env': dict(os.environ)
+    }, [0, 1, 2])
+    exit_code = _wait_for_exit_code(client)
+    if exit_code is None:
+        client.close()
+        _run_in_process(args)
+    sys.exit(exit_code)
+
+
+def _wait_for_exit_code(client):
+    """
+    :return: exit code of the invocation, or None if the daemon is busy
+    """
+    response = b''
+    while not response.endswith(b'\n'):
+        try:
+            chunk = client.recv(64)
+        except KeyboardInterrupt:
+            client.sendall(b'interrupt\n')
+            continue
+        if not chunk:
+            sys.stderr.write('The p daemon has closed the connection.\n')
+            return 1
+        response += chunk
+    if response == daemon.BUSY_RESPONSE:
+        return None
+    return int(response)
+
+
+def _run_in_process(args):
+    os.execv(sys.executable, [sys.executable, '-m', 'projects'] + args[1:])
+
+
+if __name__ == '__main__':
+    main(sys.argv)
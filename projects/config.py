@@ -13,6 +13,19 @@ There are optional parameters as well:
 
         possible colors: red, green, yellow, blue, magenta, cyan, white
 
+    ignored-dirs      List of directory patterns that won't be walked while searching
+                      for Projectfiles, on top of the built in defaults.
+
+    parse-jobs        Number of processes parsing the Projectfiles that are not in the
+                      parse cache. 1 parses them serially, 0 uses one process per CPU.
+
+    jobs              Default number of commands executed in parallel when their
+                      dependencies allow it. 0 uses one job per CPU.
+
+    artifact-cache-size
+                      Size limit of the artifact cache of the declared command outputs
+                      in megabytes. 0 disables the cache.
+
     plugins           Projects contains an extensive plugin system. You can define here
                       your custom projects in a list, and put the project files into the
                       ~/.p/plugins directory.
@@ -20,6 +33,8 @@ There are optional parameters as well:
 API:
     get()           Returns the validated configuration as a dictionary. In case of error throws
                     a ConfigError with a displayable error message.
+    keep_in_memory()
+                    Keeps the loaded config in memory, used by the daemon.
 
 Raises:
     ConfigError     in case of config related problems:
@@ -30,6 +45,7 @@ Raises:
                         - project file cannot be written if missing
 """
 
+import copy
 import os
 import yaml
 
@@ -38,6 +54,17 @@ class ConfigError(Exception):
     pass
 
 
+_memory = None
+
+
+def keep_in_memory():
+    """Keeps the loaded config in memory for long running processes like the daemon.
+    The config file is read again only if its mtime, size or inode changes.
+    """
+    global _memory
+    _memory = {}
+
+
 def get():
     """ Only API function for the config module.
 
@@ -80,7 +107,11 @@ _INVALID_VALUE_ERROR = 'Invalid value for key "{{}}" in config file ({}).'.forma
 
 _default_config = {
     'projects-path': '~/projects',
-    'max-doc-width': 80
+    'max-doc-width': 80,
+    'ignored-dirs': [],
+    'parse-jobs': 1,
+    'jobs': 1,
+    'artifact-cache-size': 1024
 }
 
 _mandatory_keys = [
@@ -88,7 +119,11 @@ _mandatory_keys = [
 ]
 
 _optional_keys = [
-    'max-doc-width'
+    'max-doc-width',
+    'ignored-dirs',
+    'parse-jobs',
+    'jobs',
+    'artifact-cache-size'
 ]
 
 
@@ -110,8 +145,16 @@ def _load_config():
     :return: {dict} loaded but unvalidated config
     """
     config_path = _get_config_path()
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+    if _memory is None:
+        with open(config_path, 'r') as f:
+            return yaml.safe_load(f)
+    st = os.stat(config_path)
+    signature = (st.st_mtime, st.st_size, st.st_ino)
+    if _memory.get('signature') != signature:
+        with open(config_path, 'r') as f:
+            _memory['config'] = yaml.safe_load(f)
+        _memory['signature'] = signature
+    return copy.deepcopy(_memory['config'])
 
 
 def _validate(config):
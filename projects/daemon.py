@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Resident p process for the p --daemon option. It listens on a per-user Unix socket
+(~/.p/daemon.sock) and runs the forwarded invocations in the same process, so the
+interpreter startup, the imports, the config and the command tree caches are paid
+for only once. The invocations share the standard streams, the working directory
+and the environment of the process, so only one of them runs at a time. While one
+is running, the other clients get a busy response instead of waiting for it, and
+run their invocation in-process.
+
+The client (projects.client) passes its standard input, output and error file
+descriptors over the socket, so the invocation writes directly to the terminal of
+the user and interactive steps work the same way as in-process. The request is a
+JSON line with the arguments, the working directory and the environment of the
+client, the response is a line with the exit code, or the BUSY_RESPONSE line.
+Anything the client sends while
+the invocation runs, or the client disconnecting, interrupts the invocation like
+Ctrl-C would.
+
+API:
+    serve(socket_path, run)
+                        Serves the invocations until interrupted. run is called
+                        with the forwarded arguments.
+    send_request(sock, request, fds)
+    receive_request(sock)
+                        Transfer a request together with the file descriptors.
+"""
+
+import array
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import traceback
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+BUSY_RESPONSE = b'busy\n'
+
+_STANDARD_FDS = (0, 1, 2)
+_CHUNK_SIZE = 65536
+
+_lock = threading.Lock()
+_state = {'busy': False, 'running': False, 'interrupted': False}
+
+
+def send_request(sock, request, fds):
+    data = json.dumps(request).encode('utf-8') + b'\n'
+    fd_array = array.array('i', fds)
+    sent = sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fd_array)])
+    if sent < len(data):
+        sock.sendall(data[sent:])
+
+
+def receive_request(sock):
+    """
+    :return: ({dict} request, [list] received file descriptors), or (None, []) if the
+        connection was closed without a request
+    """
+    fds = array.array('i')
+    data, ancdata, flags, address = sock.recvmsg(_CHUNK_SIZE, socket.CMSG_SPACE(len(_STANDARD_FDS) * fds.itemsize))
+    for level, kind, content in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(content[:len(content) - len(content) % fds.itemsize])
+    while data and not data.endswith(b'\n'):
+        chunk = sock.recv(_CHUNK_SIZE)
+        if not chunk:
+            break
+        data += chunk
+    if not data:
+        _close_all(fds)
+        return None, []
+    try:
+        return json.loads(data.decode('utf-8')), list(fds)
+    except ValueError:
+        _close_all(fds)
+        raise
+
+
+def serve(socket_path, run):
+    if not hasattr(socket, 'AF_UNIX') or not hasattr(socket.socket, 'sendmsg'):
+        sys.stderr.write('The daemon needs a Unix system and Python 3.3 or newer.\n')
+        return
+    server = _listen(socket_path)
+    if server is None:
+        sys.stderr.write('The daemon is already running on {}\n'.format(socket_path))
+        return
+    # An interrupt is delivered to the whole process group, so the shells of the
+    # running invocation receive it too, just like from a terminal.
+    try:
+        os.setsid()
+    except OSError:
+        pass
+    previous_handler = signal.signal(signal.SIGINT, _handle_interrupt)
+    sys.stderr.write('Serving on {}\n'.format(socket_path))
+    # The invocations run on the main thread, as only that one receives the signals.
+    requests = queue.Queue()
+    acceptor = threading.Thread(target=_accept, args=(server, requests))
+    acceptor.daemon = True
+    acceptor.start()
+    try:
+        while True:
+            connection, request, fds = requests.get()
+            try:
+                _run_request(connection, request, fds, run)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                connection.close()
+                # In case the request failed before its invocation was run.
+                with _lock:
+                    _state['busy'] = False
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        server.close()
+        os.remove(socket_path)
+
+
+def _listen(socket_path):
+    directory = os.path.dirname(socket_path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+            return None
+        except socket.error:
+            os.remove(socket_path)
+        finally:
+            probe.close()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o077)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(umask)
+    server.listen(8)
+    return server
+
+
+def _accept(server, requests):
+    """Accepts the connections, and queues the request if no invocation is running,
+    otherwise answers that the daemon is busy.
+    """
+    while True:
+        try:
+            connection, address = server.accept()
+        except socket.error:
+            return
+        try:
+            request, fds = receive_request(connection)
+            if request is None:
+                connection.close()
+                continue
+            with _lock:
+                busy = _state['busy']
+                _state['busy'] = True
+            if busy:
+                # The request is read first, as closing a connection with unread
+                # data would reset it before the client gets the response.
+                _close_all(fds)
+                connection.sendall(BUSY_RESPONSE)
+                connection.close()
+            else:
+                requests.put((connection, request, fds))
+        except Exception:
+            traceback.print_exc()
+            connection.close()
+
+
+def _handle(connection, run):
+    request, fds = receive_request(connection)
+    if request is None:
+        return
+    _run_request(connection, request, fds, run)
+
+
+def _run_request(connection, request, fds, run):
+    if len(fds) != len(_STANDARD_FDS):
+        _close_all(fds)
+        raise ValueError('Request without the standard file descriptors.')
+    watcher = threading.Thread(target=_watch, args=(connection,))
+    watcher.daemon = True
+    watcher.start()
+    exit_code = 1
+    try:
+        with _redirected(fds, request['cwd'], request['env']):
+            with _lock:
+                _state['running'] = True
+                _state['interrupted'] = False
+            try:
+                exit_code = run_invocation(run, request['args'])
+            finally:
+                with _lock:
+                    _state['running'] = False
+    finally:
+        # The client may start its next invocation as soon as it has the exit code.
+        with _lock:
+            _state['busy'] = False
+        # Shutting down the connection wakes up the watcher thread as well.
+        try:
+            connection.sendall('{}\n'.format(exit_code).encode('utf-8'))
+        except socket.error:
+            pass
+        try:
+            connection.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        watcher.join()
+
+
+def run_invocation(run, args):
+    """Runs an invocation and converts its outcome to an exit code."""
+    try:
+        run(args)
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        sys.stderr.write('{}\n'.format(e.code))
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    except Exception:
+        try:
+            traceback.print_exc()
+        except (IOError, OSError):
+            pass
+        return 1
+    finally:
+        from projects import timing
+        timing.disable()
+
+
+def _watch(connection):
+    try:
+        connection.recv(_CHUNK_SIZE)
+    except socket.error:
+        pass
+    with _lock:
+        if _state['running']:
+            _state['interrupted'] = True
+            os.killpg(os.getpgrp(), signal.SIGINT)
+
+
+def _handle_interrupt(signum, frame):
+    with _lock:
+        forwarded = _state['interrupted']
+        running = _state['running']
+        _state['interrupted'] = False
+    if running or not forwarded:
+        raise KeyboardInterrupt()
+
+
+@contextlib.contextmanager
+def _redirected(fds, cwd, env):
+    saved_fds = [os.dup(fd) for fd in _STANDARD_FDS]
+    saved_streams = (sys.stdin, sys.stdout, sys.stderr)
+    saved_env = dict(os.environ)
+    saved_cwd = os.getcwd()
+    try:
+        for fd, target in zip(fds, _STANDARD_FDS):
+            os.dup2(fd, target)
+        _close_all(fds)
+        os.environ.clear()
+        os.environ.update(env)
+        os.chdir(cwd)
+        sys.stdin = io.open(0, 'r', closefd=False)
+        sys.stdout = io.open(1, 'w', buffering=1, closefd=False)
+        sys.stderr = io.open(2, 'w', buffering=1, closefd=False)
+        yield
+    finally:
+        for stream in (sys.stdin, sys.stdout, sys.stderr):
+            try:
+                stream.close()
+            except (IOError, OSError, ValueError):
+                pass
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+        for fd, target in zip(saved_fds, _STANDARD_FDS):
+            os.dup2(fd, target)
+        _close_all(saved_fds)
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
+
+
+def _close_all(fds):
+    for fd in fds:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
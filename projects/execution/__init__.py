@@ -0,0 +1,37 @@
+from .artifacts import ArtifactCache
+from .compiler import compile_command
+from .incremental import CommandInputs
+from .incremental import get_input_files
+from .incremental import get_input_hash
+from .incremental import is_up_to_date
+from .incremental import record_run
+from .incremental import load_state
+from .incremental import store_state
+from .output import get_stdout_buffer
+from .plan import plan_commands
+from .plan import get_dependencies
+from .runner import run_script
+from .scheduler import run_plan
+from .shell import SessionPool
+from .shell import ShellSession
+from .watch import watch_command
+
+__all__ = [
+    'ArtifactCache',
+    'compile_command',
+    'CommandInputs',
+    'get_input_files',
+    'get_input_hash',
+    'is_up_to_date',
+    'record_run',
+    'load_state',
+    'store_state',
+    'get_stdout_buffer',
+    'plan_commands',
+    'get_dependencies',
+    'run_script',
+    'run_plan',
+    'SessionPool',
+    'ShellSession',
+    'watch_command'
+]
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Content addressed local cache for the declared outputs of the commands. After a
+successful run the output files are stored under ~/.p/artifacts, keyed by the hash of
+the variable substituted script, the content of the inputs and the output paths.
+Before a command runs, its outputs are restored from the cache if the same key was
+stored before, so switching back to an already built branch doesn't run the command
+again.
+
+    objects/<sha1>      file contents, shared by all entries
+    entries/<key>       JSON manifest of an entry: output path -> object and mode
+    stats               JSON hit, miss and store counters
+
+The cache is bounded in size: the least recently used entries are evicted together
+with the objects no remaining entry refers to. Like the other caches it is a pure
+optimization, so every error is swallowed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+from .incremental import get_script_hash
+
+
+class ArtifactCache(object):
+    def __init__(self, directory, max_size):
+        """
+        :param directory: root directory of the cache
+        :param max_size: size limit of the stored objects in bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._store_lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0}
+
+    def get_key(self, command, input_hash):
+        digest = hashlib.sha1()
+        digest.update(get_script_hash(command).encode('utf-8'))
+        digest.update(input_hash.encode('utf-8'))
+        for path in command.get('outputs', []):
+            digest.update(b'\0' + path.encode('utf-8'))
+        return digest.hexdigest()
+
+    def restore(self, key):
+        """Restores the outputs of an entry.
+
+        :return: True if the entry was found and every output got restored
+        """
+        if self.max_size <= 0:
+            return False
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r') as f:
+                manifest = json.load(f)
+            for item in manifest:
+                if not os.path.isfile(self._object_path(item['object'])):
+                    raise IOError(item['object'])
+            for item in manifest:
+                directory = os.path.dirname(item['path'])
+                if directory and not os.path.isdir(directory):
+                    os.makedirs(directory)
+                temp_path = '{}.{}.tmp'.format(item['path'], os.getpid())
+                shutil.copyfile(self._object_path(item['object']), temp_path)
+                os.chmod(temp_path, item['mode'])
+                os.rename(temp_path, item['path'])
+            os.utime(entry_path, None)
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            self._count('misses')
+            return False
+        self._count('hits')
+        return True
+
+    def store(self, key, outputs):
+        """Stores the given output files and directories as a new entry."""
+        if self.max_size <= 0:
+            return
+        with self._store_lock:
+            try:
+                manifest = []
+                for path in _get_files(outputs):
+                    manifest.append({
+                        'path': path,
+                        'object': self._store_object(path),
+                        'mode': os.stat(path).st_mode & 0o7777
+                    })
+                _write_json(self._entry_path(key), manifest)
+            except (IOError, OSError):
+                return
+            self._count('stores')
+            self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the objects fit into the size
+        limit, then removes the objects that are not referenced any more.
+        """
+        try:
+            entries = sorted(self._list_entries(), key=lambda e: e[1])
+            objects = self._list_objects()
+            references = [self._get_referenced_objects(path) for path, mtime in entries]
+            referenced = set().union(*references)
+            while entries and sum(objects[o] for o in referenced if o in objects) > self.max_size:
+                os.remove(entries.pop(0)[0])
+                references.pop(0)
+                referenced = set().union(*references)
+            for name in objects:
+                if name not in referenced:
+                    os.remove(self._object_path(name))
+        except (IOError, OSError):
+            pass
+
+    def get_stats(self):
+        """
+        :return: {dict} entry and object counts, their size, the size limit and the
+            hit, miss and store counters including the current invocation
+        """
+        objects = self._list_objects()
+        stats = {
+            'entries': len(self._list_entries()),
+            'objects': len(objects),
+            'size': sum(objects.values()),
+            'max-size': self.max_size
+        }
+        stats.update(self._load_counters())
+        return stats
+
+    def close(self):
+        """Adds the counters of the current invocation to the persistent stats."""
+        with self._lock:
+            if not any(self._counters.values()):
+                return
+            counters = self._load_counters()
+            for name in self._counters:
+                self._counters[name] = 0
+        try:
+            _write_json(os.path.join(self.directory, 'stats'), counters)
+        except (IOError, OSError):
+            pass
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _load_counters(self):
+        counters = {'hits': 0, 'misses': 0, 'stores': 0}
+        try:
+            with open(os.path.join(self.directory, 'stats'), 'r') as f:
+                counters.update(json.load(f))
+        except (IOError, OSError, ValueError):
+            pass
+        for name in self._counters:
+            counters[name] += self._counters[name]
+        return counters
+
+    def _store_object(self, path):
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        name = digest.hexdigest()
+        object_path = self._object_path(name)
+        if not os.path.isfile(object_path):
+            _ensure_directory(os.path.dirname(object_path))
+            temp_path = '{}.{}.tmp'.format(object_path, os.getpid())
+            shutil.copyfile(path, temp_path)
+            os.rename(temp_path, object_path)
+        return name
+
+    def _get_referenced_objects(self, entry_path):
+        try:
+            with open(entry_path, 'r') as f:
+                return set(item['object'] for item in json.load(f))
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return set()
+
+    def _list_entries(self):
+        entries_dir = os.path.join(self.directory, 'entries')
+        if not os.path.isdir(entries_dir):
+            return []
+        ret = []
+        for name in os.listdir(entries_dir):
+            if name.endswith('.tmp'):
+                continue
+            path = os.path.join(entries_dir, name)
+            ret.append((path, os.path.getmtime(path)))
+        return ret
+
+    def _list_objects(self):
+        objects_dir = os.path.join(self.directory, 'objects')
+        if not os.path.isdir(objects_dir):
+            return {}
+        return dict((name, os.path.getsize(os.path.join(objects_dir, name)))
+                    for name in os.listdir(objects_dir) if not name.endswith('.tmp'))
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, 'entries', key)
+
+    def _object_path(self, name):
+        return os.path.join(self.directory, 'objects', name)
+
+
+def _get_files(outputs):
+    files = []
+    for path in outputs:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names))
+        else:
+            files.append(path)
+    return files
+
+
+def _ensure_directory(path):
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+
+def _write_json(path, content):
+    _ensure_directory(os.path.dirname(path))
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temp_path, 'w') as f:
+        json.dump(content, f)
+    os.rename(temp_path, path)
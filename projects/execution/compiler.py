@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compiles a command into a standalone POSIX shell script. The script contains the
+flattened and variable substituted steps of the command and all of its dependencies
+in execution order, so it can run from cron or in tight loops without <projects>.
+
+The header lists the POSIX cksum signature of every Projectfile the command was
+compiled from. On every run the script compares them against the current
+Projectfiles with cksum and warns on the standard error if it has become stale.
+Every step stops the script with its exit code on failure.
+"""
+
+from .plan import plan_commands
+
+
+_CRC_POLYNOMIAL = 0x04C11DB7
+
+
+def _make_crc_table():
+    table = []
+    for i in range(256):
+        c = i << 24
+        for _ in range(8):
+            c = ((c << 1) ^ _CRC_POLYNOMIAL if c & 0x80000000 else c << 1) & 0xFFFFFFFF
+        table.append(c)
+    return table
+
+
+_CRC_TABLE = _make_crc_table()
+
+_HEADER = '''\
+#!/bin/sh
+# Compiled by projects {version} from the "{command}" command.
+# Recompile it with: p --compile {command}
+#
+# Sources:
+{sources}
+
+__p_check() {{
+    [ "$(cksum < "$1" 2>/dev/null)" = "$2" ] || \\
+        echo "p: $1 has changed, this script is stale. Recompile it with: p --compile {command}" >&2
+}}
+'''
+
+_STEP = '''\
+{{
+{}
+}} || exit
+'''
+
+
+def compile_command(command_name, commands, sources, version):
+    """Generates the standalone script for a command.
+
+    Raises:
+        ProjectfileError    if the command has a dependency cycle
+
+    :param command_name: command name or alternative to compile
+    :param commands: commands of the merged command tree
+    :param sources: [list] paths of the Projectfiles the commands were assembled from
+    :param version: projects version recorded in the header
+    :return: {str} shell script
+    """
+    signatures = [(path, get_signature(path)) for path in sources]
+    parts = [_HEADER.format(
+        version=version,
+        command=command_name,
+        sources='\n'.join('#   {} {}'.format(s, p) for p, s in signatures)
+    )]
+    for path, signature in signatures:
+        parts.append('__p_check {} {}\n'.format(quote(path), quote(signature)))
+    for name in plan_commands([command_name], commands):
+        parts.append('\n# {}\n'.format(name))
+        for line in commands[name]['script']:
+            if line.strip():
+                parts.append(_STEP.format(line.strip()))
+    return ''.join(parts)
+
+
+def get_signature(path):
+    """Returns the signature of a file in the output format of 'cksum < file'."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return '{} {}'.format(cksum(data), len(data))
+
+
+def cksum(data):
+    """POSIX cksum CRC of the given bytes."""
+    crc = 0
+    for byte in bytearray(data):
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CRC_TABLE[(crc >> 24) ^ byte]
+    length = len(data)
+    while length:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CRC_TABLE[(crc >> 24) ^ (length & 0xFF)]
+        length >>= 8
+    return ~crc & 0xFFFFFFFF
+
+
+def quote(text):
+    return "'{}'".format(text.replace("'", "'\\''"))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Make style incremental execution for the commands that declare their inputs and
+outputs in the command header:
+
+    build: [lib] src/*.c, include -> build/app
+
+A command is up to date and gets skipped if its script is unchanged since its last
+successful run, all of its outputs exist, and either every output is newer than every
+input, or the content hash of the inputs is the same as at the last successful run.
+Input patterns are shell style wildcards, directories stand for all the files inside
+them.
+
+The script and input hashes of the successful runs are stored in a per project state
+file in ~/.p/state. Losing it only means that the commands run once more.
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+
+def is_incremental(command):
+    return 'inputs' in command or 'outputs' in command
+
+
+def get_input_files(command):
+    """Returns the sorted list of the files matched by the input patterns."""
+    files = set()
+    for pattern in command.get('inputs', []):
+        for path in glob.glob(pattern):
+            if os.path.isdir(path):
+                for root, dirs, names in os.walk(path):
+                    files.update(os.path.join(root, name) for name in names)
+            else:
+                files.add(path)
+    return sorted(files)
+
+
+def get_script_hash(command):
+    return hashlib.sha1('\n'.join(command['script']).encode('utf-8')).hexdigest()
+
+
+def get_input_hash(input_files):
+    digest = hashlib.sha1()
+    for path in input_files:
+        digest.update(path.encode('utf-8') + b'\0')
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class CommandInputs(object):
+    """Input files of a command. Their content hash is computed at most once, so the
+    up to date check, the artifact cache and the recorded run of the same invocation
+    read the inputs only once.
+    """
+
+    def __init__(self, command):
+        self.files = get_input_files(command)
+        self._hash = None
+
+    def get_hash(self):
+        if self._hash is None:
+            self._hash = get_input_hash(self.files)
+        return self._hash
+
+
+def is_up_to_date(command_name, command, state, inputs=None):
+    """Decides whether a command with declared inputs or outputs can be skipped.
+
+    :param command_name: resolved command name
+    :param command: command of the merged command tree
+    :param state: {dict} state of the project loaded with load_state
+    :param inputs: optional CommandInputs of the command
+    :return: True if the command doesn't have to run
+    """
+    if not is_incremental(command):
+        return False
+    previous = state.get(command_name)
+    if not previous or previous['script'] != get_script_hash(command):
+        return False
+    outputs = command.get('outputs', [])
+    if not all(os.path.exists(path) for path in outputs):
+        return False
+    inputs = inputs or CommandInputs(command)
+    if outputs and inputs.files:
+        newest_input = max(os.path.getmtime(path) for path in inputs.files)
+        oldest_output = min(os.path.getmtime(path) for path in outputs)
+        if oldest_output >= newest_input:
+            return True
+    return previous['inputs'] == inputs.get_hash()
+
+
+def record_run(command_name, command, state, inputs=None):
+    """Records the successful run of a command with declared inputs or outputs.
+
+    :param inputs: optional CommandInputs of the command, hashed before the run
+    """
+    if is_incremental(command):
+        state[command_name] = {
+            'script': get_script_hash(command),
+            'inputs': (inputs or CommandInputs(command)).get_hash()
+        }
+
+
+def load_state(state_dir, project_root):
+    try:
+        with open(_get_state_file(state_dir, project_root), 'r') as f:
+            state = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+    if not isinstance(state, dict):
+        return {}
+    return state
+
+
+def store_state(state_dir, project_root, state):
+    path = _get_state_file(state_dir, project_root)
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        if not os.path.isdir(state_dir):
+            os.makedirs(state_dir)
+        with open(temp_path, 'w') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.rename(temp_path, path)
+    except (IOError, OSError):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def _get_state_file(state_dir, project_root):
+    key = hashlib.sha1(os.path.abspath(project_root).encode('utf-8')).hexdigest()
+    return os.path.join(state_dir, '{}.json'.format(key))
@@ -0,0 +1,19 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Output helpers for the executed commands. The shells inherit the standard output and
+error of <projects>, so the output of the executed tools goes to the terminal without
+being copied. Only the markers are written from Python, as bytes, straight into the
+binary stream behind the standard output.
+"""
+
+import sys
+
+
+def get_stdout_buffer():
+    """Returns the binary stream behind the standard output. Pending text output is
+    flushed first, so it doesn't get reordered with the binary writes.
+    """
+    sys.stdout.flush()
+    return getattr(sys.stdout, 'buffer', sys.stdout)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dependency planning for command execution. The merged command tree defines a
+dependency graph between the commands. The planner resolves the command alternatives,
+detects dependency cycles and orders the commands topologically, so every command
+runs exactly once per invocation and only after all of its dependencies.
+
+Dependencies are visited in their defined order, so the resulting order is the same
+as the order of the depth first dependency execution, without the repetitions.
+"""
+
+from projects.projectfile import error
+
+
+def resolve(command_name, commands):
+    """Returns the name of the command the given name or alternative refers to."""
+    if 'alias' in commands[command_name]:
+        return commands[command_name]['alias']
+    return command_name
+
+
+def get_dependencies(command_name, commands):
+    """Returns the resolved dependency names of a command in their defined order."""
+    command = commands[resolve(command_name, commands)]
+    return [resolve(d, commands) for d in command.get('dependencies', [])]
+
+
+def plan_commands(command_names, commands):
+    """Creates the execution plan for the given commands that share one invocation.
+
+    Raises:
+        ProjectfileError    if the commands have a dependency cycle
+
+    :param command_names: command names or alternatives in the requested order
+    :param commands: commands of the merged command tree
+    :return: [list] resolved command names in execution order
+    """
+    plan = []
+    visited = set()
+    for command_name in command_names:
+        _visit(resolve(command_name, commands), commands, plan, visited, [])
+    return plan
+
+
+def _visit(command_name, commands, plan, visited, path):
+    if command_name in visited:
+        return
+    if command_name in path:
+        cycle = path[path.index(command_name):] + [command_name]
+        raise error.ProjectfileError({
+            'error': error.PROJECTFILE_DEPENDENCY_CYCLE.format(' -> '.join(cycle))
+        })
+    path.append(command_name)
+    for dependency in get_dependencies(command_name, commands):
+        _visit(dependency, commands, plan, visited, path)
+    path.pop()
+    visited.add(command_name)
+    plan.append(command_name)
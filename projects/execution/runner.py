@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Runs the script of a command step by step in a shell session. Every script line is
+one step that the shell evaluates exactly as it was written in the Projectfile. The
+markers in front of the steps are emitted from Python:
+
+    @ <dir>     for the directory changes
+    $ <line>    for the executed lines
+    > <text>    for the echo lines, their output is highlighted
+
+The script stops at the first step that fails, or at the step that exits the shell
+even if it exits successfully, like "exit 0" or a successful "exec".
+"""
+
+import sys
+
+from projects import timing
+
+ECHO_MARKER = '\033[1;32m> '
+ECHO_MARKER_END = '\033[0m'
+DIRECTORY_MARKER = '\033[0;34m@ {}\033[0m\n'
+COMMAND_MARKER = '\033[1;33m$ {}\033[0m\n'
+SHELL_EXIT_MARKER = '\033[0;33m! The shell has exited, the rest of the script is skipped.\033[0m\n'
+
+
+def run_script(session, script):
+    """Runs the script lines in the given shell session.
+
+    :param session: ShellSession the steps are evaluated in
+    :param script: [list] script lines
+    :return: exit code of the first failing step, or 0
+    """
+    directory = None
+    for line in script:
+        line = line.strip()
+        if not line:
+            continue
+        if _is_directory_change(line):
+            directory = line[2:].strip()
+        exit_code = run_step(session, line, directory)
+        if exit_code != 0:
+            return exit_code
+        if session.closed:
+            sys.stderr.write(SHELL_EXIT_MARKER)
+            return exit_code
+    return 0
+
+
+def run_step(session, line, directory=None):
+    with timing.span(line, 'step', directory=directory) as span:
+        exit_code = _run_step(session, line)
+        span.set('exit_code', exit_code)
+    return exit_code
+
+
+def _run_step(session, line):
+    if _is_echo(line):
+        session.write(ECHO_MARKER)
+        exit_code = session.run(line)
+        session.write(ECHO_MARKER_END)
+        return exit_code
+    if _is_directory_change(line):
+        session.write(DIRECTORY_MARKER.format(line[2:].strip()))
+    else:
+        session.write(COMMAND_MARKER.format(line))
+    return session.run(line)
+
+
+def _is_echo(line):
+    return line == 'echo' or line.startswith(('echo ', 'echo\t'))
+
+
+def _is_directory_change(line):
+    return line == 'cd' or line.startswith(('cd ', 'cd\t'))
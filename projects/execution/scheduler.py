@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Execution of a dependency plan. A command is ready to run once all of its
+dependencies have succeeded. With more than one job the ready commands are run
+on a bounded number of worker threads, so independent dependencies like the ones
+in "release: [lint, unit, docs]" run side by side.
+
+Execution is fail fast: after the first failure no new commands are started, the
+already running ones are waited for. Commands that never started are reported as
+skipped.
+
+With a single job the commands run one after the other in plan order. The worker
+threads are named after their job slot, so the recorded spans of the commands that
+ran in the same slot end up on the same track.
+"""
+
+import threading
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+from .plan import get_dependencies
+
+
+def run_plan(plan, commands, run_command, jobs=1):
+    """Runs the commands of an execution plan.
+
+    :param plan: [list] resolved command names in execution order
+    :param commands: commands of the merged command tree
+    :param run_command: function that runs a command by name and returns its exit code
+    :param jobs: maximum number of commands running at the same time, 0 for one per CPU
+    :return: {dict} 'succeeded', 'failed' and 'skipped' command name lists in plan order
+    """
+    if jobs == 0:
+        import multiprocessing
+        jobs = multiprocessing.cpu_count()
+    jobs = max(1, jobs)
+    dependencies = dict((c, get_dependencies(c, commands)) for c in plan)
+    pending = list(plan)
+    exit_codes = {}
+    finished = queue.Queue()
+    free_slots = list(range(jobs))
+    failed = False
+    while True:
+        if not failed:
+            for command_name in list(pending):
+                if not free_slots:
+                    break
+                if all(exit_codes.get(d) == 0 for d in dependencies[command_name]):
+                    pending.remove(command_name)
+                    _start(command_name, run_command, finished, free_slots.pop(0))
+        if len(free_slots) == jobs:
+            break
+        command_name, slot, exit_code, exception = finished.get()
+        free_slots.append(slot)
+        free_slots.sort()
+        if exception is not None:
+            raise exception
+        exit_codes[command_name] = exit_code
+        if exit_code != 0:
+            failed = True
+    return {
+        'succeeded': [c for c in plan if exit_codes.get(c) == 0],
+        'failed': [c for c in plan if c in exit_codes and exit_codes[c] != 0],
+        'skipped': [c for c in plan if c not in exit_codes]
+    }
+
+
+def _start(command_name, run_command, finished, slot):
+    def work():
+        try:
+            finished.put((command_name, slot, run_command(command_name), None))
+        except Exception as e:
+            finished.put((command_name, slot, None, e))
+    thread = threading.Thread(target=work, name='worker-{}'.format(slot + 1))
+    thread.daemon = True
+    thread.start()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Persistent shell session that executes the script lines of the commands one step at
+a time. The steps are sent to a long running POSIX shell through a control FIFO, the
+shell evaluates them exactly as they were written and reports each exit code back
+through a status FIFO. The status line is the sentinel that separates the steps, so
+the step markers can be emitted from Python in the right order and the execution
+can stop at the first failing step.
+
+The standard input, output and error of the shell are the ones of <projects>, so the
+executed tools talk to the terminal directly, and their output is not copied at all.
+The control and status channels are closed for the evaluated steps.
+"""
+
+import contextlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+from .output import get_stdout_buffer
+
+
+SHELL = '/bin/sh'
+
+_DRIVER = '''\
+exec 3<"$1" 4>"$2"
+shift 2
+while IFS= read -r __p_step <&3; do
+    eval "$__p_step" 3<&- 4>&-
+    echo "$?" >&4
+done
+'''
+
+
+class ShellSession(object):
+    def __init__(self, shell=SHELL):
+        self._directory = tempfile.mkdtemp(prefix='p-shell-')
+        control_path = os.path.join(self._directory, 'control')
+        status_path = os.path.join(self._directory, 'status')
+        os.mkfifo(control_path)
+        os.mkfifo(status_path)
+        # Opened for reading and writing, so the open doesn't block until the shell
+        # starts, and the shell only sees the end of the steps when the session closes.
+        self._control = os.open(control_path, os.O_RDWR)
+        self._output = get_stdout_buffer()
+        self.process = subprocess.Popen(
+            [shell, '-c', _DRIVER, 'p', control_path, status_path],
+            close_fds=True
+        )
+        self._status = open(status_path, 'rb')
+        self.closed = False
+
+    def write(self, data):
+        """Writes marker text into the output of the session."""
+        self._output.write(data.encode('utf-8'))
+        self._output.flush()
+
+    def run(self, step):
+        """Evaluates a single script line in the shell.
+
+        Raises:
+            ValueError  if the session is closed, for example because a previous
+                        step has exited the shell
+
+        :param step: one line of shell script
+        :return: exit code of the step, or the exit code of the shell if it exited
+        """
+        if self.closed:
+            raise ValueError('The shell session is closed.')
+        step = step.replace('\n', ' ') + '\n'
+        os.write(self._control, step.encode('utf-8'))
+        status = self._status.readline()
+        if not status:
+            self.close()
+            return self.process.returncode
+        return int(status)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        os.close(self._control)
+        self.process.wait()
+        self._status.close()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SessionPool(object):
+    """Shell sessions shared by the commands of one invocation. A session is started
+    only when no idle one is left, so serial execution runs every step in the same
+    shell and parallel execution starts at most one shell per job. Sessions whose
+    shell exited are not reused.
+    """
+
+    def __init__(self, shell=SHELL):
+        self._shell = shell
+        self._idle = []
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def session(self):
+        with self._lock:
+            if self._idle:
+                session = self._idle.pop()
+            else:
+                session = ShellSession(self._shell)
+                self._sessions.append(session)
+        try:
+            yield session
+        finally:
+            with self._lock:
+                if not session.closed:
+                    self._idle.append(session)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._idle = []
+            self._sessions = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Watch mode of the p --watch option. The compiled script of a command runs in its own
+process group, and runs again whenever files under the project change:
+
+    - the changes are coalesced until nothing has changed for the debounce window,
+    - the declared outputs of the command and its dependencies never trigger a run,
+    - a run that is still in progress is stopped as soon as files change, and the
+      command runs again once the changes have settled, so a command that writes
+      into the project has to declare those files as outputs, or write them into an
+      ignored directory, not to trigger itself,
+    - the script is compiled again only if the revision of the index shows that a
+      Projectfile has changed, otherwise the previous script is run again.
+
+The changes come from a ProjectIndex, so the ignored directories are not watched and
+the waiting is event driven wherever inotify is available. The script doesn't own
+the terminal, so its standard input is /dev/null.
+"""
+
+import fnmatch
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from .shell import SHELL
+
+DEBOUNCE = 0.2
+POLL_INTERVAL = 0.1
+STOP_TIMEOUT = 5
+
+_MESSAGE = '\033[1;34m[WATCH]\033[0;34m {}\033[0m\n'
+
+
+def watch_command(index, compile_script, debounce=DEBOUNCE, shell=SHELL):
+    """Runs the command, then runs it again after every change until interrupted.
+
+    :param index: ProjectIndex of the project
+    :param compile_script: function that compiles the command from the current
+        command data into a {dict} with the 'script' and the declared 'outputs' path
+        patterns of the command and its dependencies, or returns None if it cannot
+        be compiled
+    :param debounce: seconds without changes before the command runs again
+    :param shell: shell that runs the script
+    :return: None
+    """
+    directory = tempfile.mkdtemp(prefix='p-watch-')
+    script_path = os.path.join(directory, 'script')
+    revision = None
+    compiled = None
+    process = None
+    changed = True
+    try:
+        while True:
+            if changed:
+                if index.revision != revision:
+                    revision = index.revision
+                    compiled = compile_script()
+                    _write_script(script_path, compiled)
+                if compiled:
+                    _message('Running the command..')
+                    process = _start(shell, script_path)
+                else:
+                    _message('Waiting for the Projectfiles to be fixed..')
+            changed = _wait_for_changes(index, process, compiled)
+            if process is not None:
+                if changed:
+                    stop(process)
+                    _message('Files have changed, the run was stopped.')
+                else:
+                    _message('Finished with exit code {}. Waiting for changes..'.format(process.returncode))
+                process = None
+            if changed:
+                while _get_changes(index, debounce, compiled):
+                    pass
+    finally:
+        if process is not None:
+            stop(process)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def stop(process, timeout=STOP_TIMEOUT):
+    """Terminates the process group of a run, and kills it if it is still running
+    after the timeout.
+    """
+    _signal_group(process, signal.SIGTERM)
+    deadline = time.time() + timeout
+    while process.poll() is None and time.time() < deadline:
+        time.sleep(0.01)
+    if process.poll() is None:
+        _signal_group(process, signal.SIGKILL)
+        process.wait()
+
+
+def _wait_for_changes(index, process, compiled):
+    """
+    :return: True if files have changed, False if the run has finished first
+    """
+    timeout = None if process is None else POLL_INTERVAL
+    while not _get_changes(index, timeout, compiled):
+        if process is not None and process.poll() is not None:
+            return False
+    return True
+
+
+def _get_changes(index, timeout, compiled):
+    """Returns the changed paths except the declared outputs."""
+    outputs = compiled['outputs'] if compiled else []
+    return [path for path, is_directory in index.update(timeout) if path is None or not _matches(path, outputs)]
+
+
+def _matches(path, patterns):
+    """Tells whether a path matches one of the path patterns or is inside of one."""
+    for pattern in patterns:
+        if fnmatch.fnmatch(path, pattern) or path.startswith(pattern.rstrip(os.sep) + os.sep):
+            return True
+    return False
+
+
+def _write_script(path, compiled):
+    if compiled is not None:
+        with open(path, 'w') as f:
+            f.write(compiled['script'])
+
+
+def _start(shell, script_path):
+    sys.stdout.flush()
+    sys.stderr.flush()
+    with open(os.devnull, 'rb') as devnull:
+        return subprocess.Popen([shell, script_path], stdin=devnull, close_fds=True, preexec_fn=os.setpgrp)
+
+
+def _signal_group(process, signum):
+    try:
+        os.killpg(process.pid, signum)
+    except OSError:
+        pass
+
+
+def _message(text):
+    sys.stderr.write(_MESSAGE.format(text))
+    sys.stderr.flush()
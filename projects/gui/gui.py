@@ -1,7 +1,13 @@
 import pydoc
+import sys
 
 import urwid
 
+try:
+    from urwid.display.raw import Screen
+except ImportError:
+    from urwid.raw_display import Screen
+
 from projects.gui import doc_generator
 from projects.gui.project_selector import ProjectSelector
 
@@ -51,7 +57,10 @@ def select_project(project_list, path_callback):
     footer = urwid.Text(['Start typing to search. Use arrow keys to navigate. Press (', ('enter button', 'Enter'), ') to select project. ', 'Press (', ('quit button', 'Q'), ') to exit.'])
     frame = urwid.Frame(body=box, footer=footer)
 
-    loop = urwid.MainLoop(frame, palette, unhandled_input=exit_on_q)
+    # The default streams of the screen are bound when urwid is imported, which can
+    # be inside an earlier invocation of the daemon, so the current ones are passed.
+    screen = Screen(input=sys.stdin, output=sys.stdout)
+    loop = urwid.MainLoop(frame, palette, screen=screen, unhandled_input=exit_on_q)
     refresh_list()
     loop.run()
 
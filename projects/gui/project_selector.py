@@ -2,11 +2,19 @@ import re
 
 
 class ProjectSelector(object):
+    """Appending a key can only narrow the matching entries, so only the matches of
+    the previous keys are filtered again. The states of the previous keys are kept
+    on a stack, so removing a key doesn't filter at all.
+    """
+
     def __init__(self, data, normal, highlighted, selected):
         self.data = data
         self.keys = ''
         self.focus = 0
-        self.last_selection_result = _filter_data(self.keys, self.data)
+        self._order = sorted(range(len(data)), key=lambda i: data[i])
+        self._unmatched = _transform_data([{'string': data[i], 'selection': ()} for i in self._order])
+        self.last_selection_result = list(self._unmatched)
+        self._states = [(self.keys, list(range(len(data))), self.last_selection_result)]
         self.normal = normal
         self.highlighted = highlighted
         self.selected = selected
@@ -14,27 +22,19 @@ class ProjectSelector(object):
     def add_key(self, key):
         temp = self.keys
         temp += key
-        result = _filter_data(temp, self.data)
-        match_occurred = False
-        for item in result:
-            for part in item:
-                if part['highlight']:
-                    match_occurred = True
-                    break
-        if match_occurred:
+        candidates = self._states[-1][1]
+        matches, result = _filter_candidates(temp, self.data, candidates, self._order, self._unmatched)
+        if matches:
             self.focus = 0
             self.last_selection_result = result
             self.keys = temp
+            self._states.append((temp, matches, result))
 
     def remove_key(self):
-        if len(self.keys) == 0:
-            pass
-        elif len(self.keys) == 1:
-            self.keys = ''
-        else:
-            self.keys = self.keys[:-1]
+        if len(self._states) > 1:
+            self._states.pop()
+        self.keys, _, self.last_selection_result = self._states[-1]
         self.focus = 0
-        self.last_selection_result = _filter_data(self.keys, self.data)
 
     def up(self):
         if self.focus > 0:
@@ -132,9 +132,9 @@ def _merge_neighbour_selections(data):
 
 def _generate_data_structure_for_search_string(patterns, search_string):
     ret = []
+    patterns = [re.compile(pattern) for pattern in patterns]
     for line in search_string:
-        for pattern in patterns:
-            p = re.compile(pattern)
+        for p in patterns:
             selections = []
             for m in p.finditer(line):
                 selections.extend(m.regs[1:])
@@ -201,6 +201,30 @@ def _filter_data(keys, data):
     return final_data
 
 
+def _filter_candidates(keys, data, candidates, order, unmatched):
+    """Filters only the candidate entries with the keys, the rest of the entries
+    can't match.
+
+    :param candidates: [list] indexes of the candidate entries in increasing order
+    :param order: [list] indexes of all entries sorted by their strings
+    :param unmatched: [list] transformed entries without highlight in the same order
+    :return: ([list] indexes of the matching entries in increasing order,
+        [list] transformed result in the same format as _filter_data)
+    """
+    pattern = _get_pattern_list(keys)
+    structure = _generate_data_structure_for_search_string(pattern, [data[i] for i in candidates])
+    matched = []
+    for i, item in zip(candidates, structure):
+        if item['selection']:
+            item['index'] = i
+            matched.append(item)
+    matches = [item['index'] for item in matched]
+    matched_set = set(matches)
+    result = _transform_data(_sort_structure(matched))
+    result.extend(node for i, node in zip(order, unmatched) if i not in matched_set)
+    return matches, result
+
+
 def _render_string(data, index, normal, highlighted, selected):
     ret = []
     for i in range(len(data)):
@@ -1,21 +1,21 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import functools
 import os
-import pydoc
-import subprocess
 import sys
 import signal
 
-from pkg_resources import get_distribution
-from termcolor import colored
-
 from projects import config
-from projects import gui
+from projects import execution
 from projects import paths
+from projects import profiling
 from projects import projectfile
+from projects import timing
+from projects.version import __version__
 
-__version__ = get_distribution('projects').version
+# The gui package (urwid), pydoc and termcolor are imported only by
+# the code paths that need them, so executing a command doesn't pay for them.
 
 help_text = '''\
 ===============================================================================
@@ -59,7 +59,11 @@ Configuration
 
   ╔═══════════════════════════════════════════════════════════════════════════╗
   ║ $ cat ~/.prc                                                              ║
+  ║ artifact-cache-size: 1024                                                 ║
+  ║ ignored-dirs: []                                                          ║
+  ║ jobs: 1                                                                   ║
   ║ max-doc-width: 80                                                         ║
+  ║ parse-jobs: 1                                                             ║
   ║ projects-path: ~/projects                                                 ║
   ╚═══════════════════════════════════════════════════════════════════════════╝
 
@@ -72,11 +76,47 @@ Configuration
     The maximum width of the generated manual pages. If not defined, it will be
     set to 80. <projects> will adapt to narrower terminals.
 
+  ignored-dirs  [optional]
+
+    List of directory patterns <projects> won't descend into while it searches
+    for Projectfiles. Version control directories,  node_modules,  __pycache__
+    and  virtualenvs  are  always skipped.  Patterns are shell style wildcards
+    matched against the directory name,  or against the path relative  to  the
+    project root if  they  contain a slash.  You can  also  list patterns line
+    by line in a .projectignore file in your project's root directory.
+
+  parse-jobs  [optional]
+
+    Number  of  processes  that  parse  the  Projectfiles  that  changed since
+    the last run.  With the default 1 they are parsed one after the other,  0
+    starts one process per CPU. Useful for projects with hundreds of them.
+
+  jobs  [optional]
+
+    Default  number  of  commands  <projects>  executes  in  parallel  if their
+    dependencies  allow it.  The default 1 executes them one after the other,
+    0 uses one job per CPU. Can be overridden with the (-j|--jobs) option.
+
+  artifact-cache-size  [optional]
+
+    Size limit of the artifact cache in megabytes.  The declared outputs of the
+    commands are stored there and restored instead of running a command again
+    with the same inputs. The default is 1024, 0 disables the cache.
+
 
 Usage:
   p
   p p
   p <command>
+  p (-j|--jobs) <number> <command>...
+  p --compile <command> [(-o|--output) <file>]
+  p --watch <command>
+  p --cache-stats
+  p --timings[=<file>] ...
+  p --trace <file> ...
+  p --profile[=<file>] ...
+  p --profile-memory ...
+  p --daemon
   p (-h|--help)
   p (-v|--version)
   p (-i|--init)
@@ -115,7 +155,92 @@ p <command>
   The commands started with a dash reserved for <projects> itself.
 
   The <command> keyword can be anything except the already taken keywords:
-  p, -h, --help, -v, --version, -i, --init, -w, --walk, -l, --list
+  p, -h, --help, -v, --version, -i, --init, -w, --walk, -l, --list, -j, --jobs,
+  --compile, --watch, --cache-stats, --timings, --trace, --profile,
+  --profile-memory, --daemon
+
+
+p (-j|--jobs) <number> <command>...
+
+  Executes the given commands and their dependencies with at most <number> of
+  them running at the same time.  A command starts as soon as  all  of its own
+  dependencies have succeeded,  so independent dependencies run in  parallel.
+  After the first failure no new command is started,  and a summary lists the
+  succeeded, failed and skipped commands. 0 runs one command per CPU.
+
+
+p --compile <command> [(-o|--output) <file>]
+
+  Compiles the command and all of its  dependencies  into a standalone  POSIX
+  shell script  that can run  without  <projects>,  for example  from cron. The
+  script contains the flattened steps in execution order  and  stops  at  the
+  first failing one.  It records the cksum signatures of the Projectfiles it
+  was compiled from,  and warns on every run if any of them has changed since.
+  The script is printed to the standard output unless a file is given.
+
+
+p --watch <command>
+
+  Runs the command,  then runs it again whenever files change in the project.
+  Changes are collected until nothing has changed for 0.2 seconds. The ignored
+  directories and the declared outputs don't trigger a run,  so a command that
+  writes into the project has to declare those files as outputs.  A run that is
+  in progress is stopped when other files change. The command is compiled like
+  with --compile,  and compiled again only if a Projectfile has changed. The
+  command gets no standard input. Stop watching with Ctrl-C.
+
+
+p --cache-stats
+
+  Prints the number of entries, the size and the hit rate of the artifact cache
+  in ~/.p/artifacts.
+
+
+p --timings[=<file>] ...
+
+  Can be added to any other  invocation.  Records the wall time of the internal
+  phases (config loading, walk, parse, command tree generation, flattening and
+  variable substitution),  every executed command and every step.  A  summary
+  table sorted by the total time  is printed at the end.  If a file is given,
+  the recorded spans are also appended to it as JSON lines for trend tracking.
+
+
+p --trace <file> ...
+
+  Can be added to any other invocation.  Writes the same spans as a Chrome trace
+  event file  that  can  be  opened  in  chrome://tracing  or  Perfetto.  The
+  Projectfiles are parsed in separate spans, and the steps carry their directory
+  and exit code. With parallel execution every job gets its own track.
+
+
+p --profile[=<file>] ...
+
+  Can be added to any other invocation.  Runs the whole invocation  under the
+  cProfile profiler, writes the statistics into the given  .prof  file or into
+  a timestamped one in ~/.p/profiles, and prints the top entries sorted by the
+  cumulative time.  Setting the  P_PROFILE=1  environment variable has the same
+  effect.  The Projectfiles parsed by the parser processes are  not  included,
+  set parse-jobs to 1 to profile the parsing too.
+
+
+p --profile-memory ...
+
+  Can be added to any other invocation.  Traces the memory allocations of the
+  invocation  and  prints the peak memory usage  and  the top allocation sites.
+  Setting the P_PROFILE=memory environment variable has the same effect.
+
+
+p --daemon
+
+  Starts a resident  <projects>  process that listens on ~/.p/daemon.sock, for
+  example with "p --daemon &". While it runs,  the p command forwards every
+  invocation to it,  so the Python startup and the config and command tree
+  loading are skipped. The output still goes directly to your terminal, Ctrl-C
+  interrupts the forwarded invocation.  While an invocation is running,  the
+  other ones run in-process.  The config,  the list of the projects and the
+  Projectfiles are kept in memory.  The directories of the projects are watched
+  with inotify,  so only the changed Projectfiles are parsed again.  Restart
+  the daemon after upgrading <projects>. Needs Python 3.3 or newer.
 
 
 p (-h|--help)
@@ -252,7 +377,10 @@ variables  [optional]
     $variable
     ${{variable}}
 
-  Both escapement is interpreted equally.
+  Both escapement is interpreted equally.  The short  form  refers  to  the
+  longest defined  variable  name  its  characters  start  with,  so  $ab is
+  variable "ab" if it is defined, otherwise variable "a" followed by a "b".
+  References to undefined variables are left intact for the shell.
 
   Defined  variables  go  to  the  global  variable  pool.  You cannot assign a
   variable the more than once.  Hence you cannot redefine a variable in a later
@@ -293,6 +421,29 @@ command header  [mandatory]
   each other according to the path relationship of these files.
 
 
+command inputs and outputs  [optional]
+  ╔═══════════════════════════════════════════════════════════════════════════╗
+  ║ ...                                                                       ║
+  ║ build: [lib] src/*.c, include -> build/app                                ║
+  ║ ...                                                                       ║
+  ╚═══════════════════════════════════════════════════════════════════════════╝
+
+  After the dependency list a command can declare its inputs and outputs  as
+  "inputs -> outputs".  Both  sides are comma separated path lists relative to
+  the Projectfile,  inputs can be shell style wildcards or directories.  Either
+  side can be empty.  A redefined command collects the paths of every file.
+
+  Such a command is skipped when its body didn't change since its last success-
+  ful run, all of its outputs exist, and every output is newer than its inputs
+  or the content of its inputs didn't change. This makes the execution incre-
+  mental like Make. The state of the last runs is kept in ~/.p/state.
+
+  The outputs of a successful run are also stored in the artifact cache, keyed
+  by the command body and the content of its inputs.  If a command would run
+  with inputs it already ran with,  for example after switching  back  to  an
+  already built branch, its outputs are restored from the cache instead.
+
+
 command description  [optional]
   ╔═══════════════════════════════════════════════════════════════════════════╗
   ║ ...                                                                       ║
@@ -574,80 +725,220 @@ Advanced Projectfile examples
        command.
 '''.format(version=__version__)
 
-return_path = ''
-
-
-def path_setting_callback(path):
-    global return_path
-    return_path = path
-
-
-def process_command(command_name, data):
+def process_command(command_name, data, sessions, state=None, artifacts=None):
+    with timing.span(command_name, 'command') as span:
+        exit_code = run_command(command_name, data, sessions, state, artifacts)
+        span.set('exit_code', exit_code)
+    return exit_code
+
+
+def run_command(command_name, data, sessions, state=None, artifacts=None):
+    """Runs the script of a command in one of the shell sessions of the invocation.
+    If the incremental state of the project is given, commands with up to date
+    declared outputs are skipped. If an artifact cache is given, declared outputs
+    are restored from it instead of running the command, and stored into it after a
+    successful run.
+    """
+    if 'alias' in data['commands'][command_name]:
+        command_name = data['commands'][command_name]['alias']
     command = data['commands'][command_name]
-    if 'alias' in command:
-        command = data['commands'][command['alias']]
-    if 'dependencies' in command:
-        for dep in command['dependencies']:
-            process_command(dep, data)
-    echoed_commands = []
-    for line in command['script']:
-        if '&&' in line:
-            line = line.split('&&')
-            line = [l.strip() for l in line]
-        else:
-            line = [line.strip()]
-        for l in line:
-            if l.startswith('echo'):
-                echoed_commands.append('printf "\033[1;32m> " && {0} && printf "\033[0m"'.format(l))
-            elif l.startswith('cd'):
-                p = l.split('cd')
-                p = p[1].strip()
-                echoed_commands.append('printf "\033[0;34m@ {0}\033[0m\n" && {1}'.format(p, l))
-            else:
-                echoed_commands.append('printf "\033[1;33m$ {0}\033[0m\n" && {0}'.format(l))
-    concatenated_commands = ' && '.join(echoed_commands)
-    execute_call(concatenated_commands)
-
-def execute_call(command):
-    process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-
-    while True:
-        nextline = process.stdout.readline()
-        if nextline == '' and process.poll() is not None:
-            break
-        sys.stdout.write(nextline)
+    # The inputs are listed and hashed at most once for the whole run.
+    inputs = execution.CommandInputs(command)
+    if state is not None and execution.is_up_to_date(command_name, command, state, inputs):
+        sys.stdout.write('\033[0;32m= {} is up to date\033[0m\n'.format(command_name))
         sys.stdout.flush()
-
-    output, error = process.communicate()
-    exit_code = process.returncode
+        return 0
+    artifact_key = None
+    if artifacts is not None and command.get('outputs'):
+        artifact_key = artifacts.get_key(command, inputs.get_hash())
+        if artifacts.restore(artifact_key):
+            sys.stdout.write('\033[0;32m= {} was restored from the artifact cache\033[0m\n'.format(command_name))
+            sys.stdout.flush()
+            if state is not None:
+                execution.record_run(command_name, command, state, inputs)
+            return 0
+    with sessions.session() as session:
+        exit_code = execution.run_script(session, command['script'])
 
     if exit_code != 0:
         sys.stderr.write('\r\033[1;31m[ERROR {}]\033[0;31m Error during execution!\033[0m\n'.format(exit_code))
+        return exit_code
+    if artifact_key is not None:
+        artifacts.store(artifact_key, command['outputs'])
+    if state is not None:
+        execution.record_run(command_name, command, state, inputs)
+    return exit_code
 
 
 def execute(args, data, conf):
+    try:
+        jobs, args = get_job_option(args, conf['jobs'])
+    except ValueError:
+        print('Invalid job count for this option..\np (-j|--jobs) <number> <command>...')
+        return
     if args:
-        for command_name in args:
-            if command_name in data['commands']:
-                try:
-                    process_command(command_name, data)
-                except (KeyboardInterrupt):
-                    sigterm_handle(None, None)
-            else:
-                pass
+        command_names = [c for c in args if c in data['commands']]
+        plan = execution.plan_commands(command_names, data['commands'])
+        state = execution.load_state(paths.get_state_path(), data['path'])
+        previous_state = dict(state)
+        artifacts = get_artifact_cache(conf)
+        try:
+            with execution.SessionPool() as sessions:
+                summary = execution.run_plan(plan, data['commands'], lambda c: process_command(c, data, sessions, state, artifacts), jobs)
+        except (KeyboardInterrupt):
+            sigterm_handle(None, None)
+        finally:
+            if state != previous_state:
+                execution.store_state(paths.get_state_path(), data['path'], state)
+            artifacts.close()
+        if len(plan) > 1:
+            print_summary(summary)
     else:
+        from projects import gui
         gui.show_project_details(data, conf['max-doc-width'])
 
 
+def get_recording_options(args):
+    """Separates the --timings[=<file>] and --trace <file> options from the arguments
+    and enables the timing recording if any of them is present.
+
+    :return: (remaining args, {dict} options)
+    """
+    remaining = args[:2]
+    options = {'timings': False, 'timings-file': None, 'trace-file': None}
+    rest = iter(args[2:])
+    for arg in rest:
+        if arg == '--timings':
+            options['timings'] = True
+        elif arg.startswith('--timings='):
+            options['timings'] = True
+            options['timings-file'] = arg[len('--timings='):]
+        elif arg == '--trace':
+            options['trace-file'] = next(rest, None)
+        elif arg.startswith('--trace='):
+            options['trace-file'] = arg[len('--trace='):]
+        else:
+            remaining.append(arg)
+    if options['timings'] or options['trace-file']:
+        timing.enable()
+    return remaining, options
+
+
+def report_timings(options):
+    if not timing.is_enabled():
+        return
+    if options['timings']:
+        sys.stderr.write('\nTimings:\n' + timing.format_summary())
+    for path, write in [(options['timings-file'], timing.write_json_lines),
+                        (options['trace-file'], timing.write_trace)]:
+        if path:
+            try:
+                write(path)
+            except (IOError, OSError) as e:
+                sys.stderr.write('Timings cannot be written to "{}": {}\n'.format(path, e))
+
+
+def get_artifact_cache(conf):
+    return execution.ArtifactCache(paths.get_artifacts_path(), conf['artifact-cache-size'] * 1024 * 1024)
+
+
+def print_cache_stats(conf):
+    stats = get_artifact_cache(conf).get_stats()
+    lookups = stats['hits'] + stats['misses']
+    print('Artifact cache: {}'.format(paths.get_artifacts_path()))
+    print('  entries     {}'.format(stats['entries']))
+    print('  objects     {}'.format(stats['objects']))
+    print('  size        {:.1f} / {:.1f} MB'.format(stats['size'] / 1048576.0, stats['max-size'] / 1048576.0))
+    print('  hits        {}'.format(stats['hits']))
+    print('  misses      {}'.format(stats['misses']))
+    print('  stores      {}'.format(stats['stores']))
+    if lookups:
+        print('  hit rate    {:.1f}%'.format(100.0 * stats['hits'] / lookups))
+
+
+def get_job_option(args, default):
+    """Separates the -j/--jobs option from the command names.
+
+    Raises:
+        ValueError  on a missing or invalid job count
+
+    :return: (jobs, remaining args)
+    """
+    jobs = default
+    remaining = []
+    args = iter(args)
+    for arg in args:
+        if arg in ['-j', '--jobs']:
+            jobs = int(next(args, ''))
+        elif arg.startswith('--jobs='):
+            jobs = int(arg[len('--jobs='):])
+        elif arg.startswith('-j') and arg[2:].isdigit():
+            jobs = int(arg[2:])
+        else:
+            remaining.append(arg)
+    if jobs < 0:
+        raise ValueError(jobs)
+    return jobs, remaining
+
+
+def print_summary(summary):
+    lines = []
+    for name in summary['succeeded']:
+        lines.append('\033[1;32m[OK]\033[0m {}'.format(name))
+    for name in summary['failed']:
+        lines.append('\033[1;31m[FAILED]\033[0m {}'.format(name))
+    for name in summary['skipped']:
+        lines.append('\033[1;33m[SKIPPED]\033[0m {}'.format(name))
+    sys.stderr.write('\n'.join(lines) + '\n')
+
+
 def sigterm_handle(signal, frame):
     sys.stderr.write('\r\r\033[1;31m[!]\033[0;31m User interrupt..\033[0m\n')
     sys.exit(1)
 
 
+def get_profiling_options(args, environ):
+    """Separates the --profile[=<file>] and --profile-memory options from the
+    arguments. The P_PROFILE environment variable can turn them on too: 1 for the
+    cProfile profiling, memory for the memory profiling.
+
+    :return: (remaining args, {dict} options)
+    """
+    remaining = args[:2]
+    options = {'profile-file': None, 'profile-memory': False}
+    for arg in args[2:]:
+        if arg == '--profile':
+            options['profile-file'] = profiling.get_default_profile_path()
+        elif arg.startswith('--profile='):
+            options['profile-file'] = arg[len('--profile='):]
+        elif arg == '--profile-memory':
+            options['profile-memory'] = True
+        else:
+            remaining.append(arg)
+    variable = environ.get('P_PROFILE', '')
+    if variable == '1' and not options['profile-file']:
+        options['profile-file'] = profiling.get_default_profile_path()
+    elif variable == 'memory':
+        options['profile-memory'] = True
+    return remaining, options
+
+
 def main(args):
     signal.signal(signal.SIGTSTP, sigterm_handle)
+    args, options = get_profiling_options(args, os.environ)
+    invocation = functools.partial(run, args)
+    if options['profile-memory']:
+        invocation = functools.partial(profiling.profile_memory, invocation)
+    if options['profile-file']:
+        invocation = functools.partial(profiling.profile_cpu, invocation, options['profile-file'])
+    invocation()
+
+
+def run(args):
+    args, recording = get_recording_options(args)
     try:
-        conf = config.get()
+        with timing.span('load config', 'phase'):
+            conf = config.get()
 
         if not os.path.isdir(conf['projects-path']):
             os.mkdir(conf['projects-path'])
@@ -664,6 +955,10 @@ def main(args):
                 return
 
         args = args[2:]
+        if args and args[0] == '--compile':
+            handle_compile(args[1:], conf)
+            return
+
         if len(args) == 1:
             if args[0] in ['-v', '--version']:
                 print(__version__)
@@ -682,13 +977,26 @@ def main(args):
                     print('You are not inside any of your projects. Use the "p" command to navigate into one.')
                 return
 
+            elif args[0] in ['--cache-stats']:
+                print_cache_stats(conf)
+                return
+
+            elif args[0] in ['--daemon']:
+                from projects import daemon
+                config.keep_in_memory()
+                paths.keep_listings()
+                projectfile.keep_indexes()
+                daemon.serve(paths.get_socket_path(), main)
+                return
+
             elif args[0] in ['-h', '--help']:
+                import pydoc
                 pydoc.pager(help_text)
                 return
 
             elif args[0] in ['-w', '--walk']:
                 if paths.inside_project(conf['projects-path']):
-                    print(projectfile.get_walk_order(os.getcwd()))
+                    print(projectfile.get_walk_order(os.getcwd(), conf['ignored-dirs']))
                 else:
                     print('You are not inside any of your projects. Use the "p" command to navigate into one.')
                 return
@@ -703,8 +1011,9 @@ def main(args):
 
             elif args[0] in ['-md', '--markdown']:
                 project_root = paths.get_project_root(conf['projects-path'], os.getcwd())
-                data = projectfile.get_data_for_root(project_root['path'])
+                data = load_project_data(project_root, conf)
                 data['name'] = project_root['name']
+                from projects import gui
                 md_content = gui.generate_markdown(data)
                 with open(os.path.join(project_root['path'], 'README.md'), 'w+') as f:
                     f.write(md_content)
@@ -715,7 +1024,7 @@ def main(args):
             if args[0] in ['-l', '--list']:
                 command = args[1]
                 project_root = paths.get_project_root(conf['projects-path'], os.getcwd())
-                data = projectfile.get_data_for_root(project_root['path'])
+                data = load_project_data(project_root, conf)
                 if command in data['commands']:
                     if 'alias' in data['commands'][command]:
                         command = data['commands'][command]['alias']
@@ -726,11 +1035,15 @@ def main(args):
                     for c in data['commands']:
                         print(c)
                 return
+            elif args[0] in ['--watch']:
+                handle_watch(args[1], conf)
+                return
             elif args[0] in ['-md', '--markdown']:
                 name = args[1]
                 project_root = paths.get_project_root(conf['projects-path'], os.getcwd())
-                data = projectfile.get_data_for_root(project_root['path'])
+                data = load_project_data(project_root, conf)
                 data['name'] = project_root['name']
+                from projects import gui
                 md_content = gui.generate_markdown(data)
                 with open(os.path.join(project_root['path'], name), 'w+') as f:
                     f.write(md_content)
@@ -743,35 +1056,136 @@ def main(args):
             handle_project_selection(conf)
 
     except projectfile.error.ProjectfileError as e:
-        error = e.args[0]
-        message = 'Projectfile error!\n{}'.format(error['error'])
-        if 'path' in error:
-            message = '{}\nPath: {}/Projectfile'.format(message, error['path'])
-        if 'line' in error:
-            message = '{}\nLine: {}'.format(message, error['line'])
-        print(colored(message, 'red'))
+        print_projectfile_error(e)
         sys.exit(-1)
 
     except config.ConfigError as e:
         error = e.args[0]
         message = 'Config error!\n{}'.format(error)
-        print(colored(message, 'red'))
+        print_error(message)
         sys.exit(-1)
 
+    finally:
+        report_timings(recording)
+
+
+def print_error(message):
+    from termcolor import colored
+    print(colored(message, 'red'))
+
+
+def print_projectfile_error(e):
+    error = e.args[0]
+    message = 'Projectfile error!\n{}'.format(error['error'])
+    if 'path' in error:
+        message = '{}\nPath: {}/Projectfile'.format(message, error['path'])
+    if 'line' in error:
+        message = '{}\nLine: {}'.format(message, error['line'])
+    print_error(message)
+
 
 def handle_project_selection(conf):
+    from projects import gui
+    # Collected per invocation, as the daemon runs many of them in the same process.
+    selection = []
     gui.select_project(
         paths.list_dir_for_path(conf['projects-path']),
-        path_setting_callback
+        selection.append
     )
-    if return_path:
+    if selection:
         with open(os.path.join(os.path.expanduser('~'), '.p-path'), 'w+') as f:
-            f.write(os.path.join(os.path.expanduser(conf['projects-path']), return_path))
+            f.write(os.path.join(os.path.expanduser(conf['projects-path']), selection[-1]))
+
+
+def handle_compile(args, conf):
+    output_path = None
+    if len(args) == 3 and args[1] in ['-o', '--output']:
+        output_path = args[2]
+    elif len(args) != 1:
+        print('Invalid arguments for this option..\np --compile <command> [(-o|--output) <file>]')
+        return
+    if not paths.inside_project(conf['projects-path']):
+        print('You are not inside any of your projects. Use the "p" command to navigate into one.')
+        return
+    command = args[0]
+    project_root = paths.get_project_root(conf['projects-path'], os.getcwd())
+    data = load_project_data(project_root, conf)
+    if command not in data['commands']:
+        print('Invalid command: "{}"\nAvailable commands:'.format(command))
+        for c in data['commands']:
+            print(c)
+        return
+    sources = projectfile.get_projectfiles(project_root['path'], conf['ignored-dirs'])
+    script = execution.compile_command(command, data['commands'], sources, __version__)
+    if output_path is None:
+        sys.stdout.write(script)
+    else:
+        with open(output_path, 'w+') as f:
+            f.write(script)
+        os.chmod(output_path, os.stat(output_path).st_mode | 0o111)
+        print('Command "{}" was compiled into "{}".'.format(command, output_path))
+
+
+def handle_watch(command, conf):
+    if not paths.inside_project(conf['projects-path']):
+        print('You are not inside any of your projects. Use the "p" command to navigate into one.')
+        return
+    project_root = paths.get_project_root(conf['projects-path'], os.getcwd())
+    with projectfile.index.ProjectIndex(
+        project_root['path'],
+        conf['ignored-dirs'],
+        cache_dir=paths.get_cache_path(),
+        jobs=conf['parse-jobs']
+    ) as index:
+        data = index.get_data()
+        if command not in data['commands']:
+            print('Invalid command: "{}"\nAvailable commands:'.format(command))
+            for c in data['commands']:
+                print(c)
+            return
+        try:
+            execution.watch_command(index, functools.partial(compile_watched_command, command, index))
+        except KeyboardInterrupt:
+            sigterm_handle(None, None)
+
+
+def compile_watched_command(command, index):
+    """Compiles the watched command from the current state of the index. Errors are
+    printed instead of raised, so the watching goes on until they are fixed.
+
+    :return: {dict} shell script with the declared outputs of the planned commands,
+        or None on error
+    """
+    try:
+        data = index.get_data()
+        if command not in data['commands']:
+            print_error('The watched command "{}" is not defined anymore.'.format(command))
+            return None
+        ret = {
+            'script': execution.compile_command(command, data['commands'], index.get_projectfiles(), __version__),
+            'outputs': []
+        }
+        for name in execution.plan_commands([command], data['commands']):
+            ret['outputs'].extend(data['commands'][name].get('outputs', []))
+        return ret
+    except projectfile.error.ProjectfileError as e:
+        print_projectfile_error(e)
+        return None
+
+
+def load_project_data(project_root, conf):
+    return projectfile.get_data_for_root(
+        project_root['path'],
+        ignored=conf['ignored-dirs'],
+        cache_dir=paths.get_cache_path(),
+        jobs=conf['parse-jobs']
+    )
 
 
 def handle_inside_project(args, conf):
     project_root = paths.get_project_root(conf['projects-path'], os.getcwd())
-    data = projectfile.get_data_for_root(project_root['path'])
+    data = load_project_data(project_root, conf)
     data['name'] = project_root['name']
+    data['path'] = project_root['path']
     execute(args, data, conf)
 
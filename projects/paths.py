@@ -3,9 +3,30 @@
 
 import os
 
+_listings = None
+
+
+def keep_listings():
+    """Keeps the directory listings in memory for long running processes like the
+    daemon. A directory is listed again only if its mtime or inode changes.
+    """
+    global _listings
+    _listings = {}
+
 
 def list_dir_for_path(path):
-    dirs = os.listdir(os.path.expanduser(path))
+    path = os.path.expanduser(path)
+    if _listings is None:
+        return _list_dir(path)
+    st = os.stat(path)
+    signature = (st.st_mtime, st.st_ino)
+    if path not in _listings or _listings[path][0] != signature:
+        _listings[path] = (signature, _list_dir(path))
+    return list(_listings[path][1])
+
+
+def _list_dir(path):
+    dirs = os.listdir(path)
     return [d for d in dirs if not d.startswith('.')]
 
 
@@ -27,3 +48,22 @@ def get_project_root(projects_root, current_path):
     }
     return ret
 
+
+def get_cache_path():
+    return os.path.join(os.path.expanduser('~'), '.p', 'cache')
+
+
+def get_state_path():
+    return os.path.join(os.path.expanduser('~'), '.p', 'state')
+
+
+def get_artifacts_path():
+    return os.path.join(os.path.expanduser('~'), '.p', 'artifacts')
+
+
+def get_profiles_path():
+    return os.path.join(os.path.expanduser('~'), '.p', 'profiles')
+
+
+def get_socket_path():
+    return os.path.join(os.path.expanduser('~'), '.p', 'daemon.sock')
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Profiling hooks for the --profile and --profile-memory options. They wrap a whole
+invocation, so a profile can be captured on any machine without extra tooling.
+
+API:
+    profile_cpu(function, path, top)
+                        Runs the function under cProfile, dumps the statistics
+                        into a .prof file and prints the top entries sorted by
+                        cumulative time to the standard error.
+    profile_memory(function, top)
+                        Runs the function with tracemalloc, then prints the peak
+                        of the traced memory and the top allocation sites of the
+                        memory that is still allocated at the end to the
+                        standard error.
+    get_default_profile_path()
+                        Returns a timestamped .prof file path inside ~/.p/profiles.
+"""
+
+import os
+import sys
+import time
+
+from projects import paths
+
+TOP = 25
+
+
+def get_default_profile_path():
+    name = 'p-{}-{}.prof'.format(time.strftime('%Y%m%d-%H%M%S'), os.getpid())
+    return os.path.join(paths.get_profiles_path(), name)
+
+
+def profile_cpu(function, path, top=TOP):
+    """Returns the return value of the function. The statistics are written even if
+    the function raises, for example with sys.exit. The profilers are imported on
+    use, so the module costs nothing for the invocations that don't profile.
+    """
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return function()
+    finally:
+        profiler.disable()
+        try:
+            directory = os.path.dirname(path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            profiler.dump_stats(path)
+            sys.stderr.write('\nProfile was written to {}\n'.format(path))
+        except (IOError, OSError) as e:
+            sys.stderr.write('\nProfile cannot be written to "{}": {}\n'.format(path, e))
+        stats = pstats.Stats(profiler, stream=sys.stderr)
+        stats.sort_stats('cumulative').print_stats(top)
+
+
+def profile_memory(function, top=TOP):
+    """Returns the return value of the function. The report is printed even if the
+    function raises.
+    """
+    try:
+        import tracemalloc
+    except ImportError:
+        sys.stderr.write('Memory profiling needs Python 3.4 or newer.\n')
+        return function()
+    tracemalloc.start()
+    try:
+        return function()
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')
+        ])
+        sys.stderr.write(format_memory_report(peak, current, snapshot.statistics('lineno')[:top]))
+
+
+def format_memory_report(peak, current, statistics):
+    lines = [
+        '',
+        'Peak memory:    {:>12.1f} KiB'.format(peak / 1024.0),
+        'At exit:        {:>12.1f} KiB'.format(current / 1024.0),
+        '',
+        '{:>12}{:>10}  {}'.format('size KiB', 'blocks', 'allocation site')
+    ]
+    for stat in statistics:
+        frame = stat.traceback[0]
+        lines.append('{:>12.1f}{:>10}  {}:{}'.format(stat.size / 1024.0, stat.count, frame.filename, frame.lineno))
+    return '\n'.join(lines) + '\n'
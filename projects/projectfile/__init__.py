@@ -1,7 +1,11 @@
+import os
+
+from projects import timing
+from . import cache
 from . import command_processor
 from . import file_handler
 from . import defs
-import os
+from . import index
 
 DEFAULT_PROJECTFILE = '''\
 from v{}
@@ -46,10 +50,25 @@ answer|ans|a:
 '''
 
 
-def get_data_for_root(project_root):
+_indexes = None
+
+
+def keep_indexes():
+    """Serves get_data_for_root from a live ProjectIndex per project root, that is
+    kept up to date by a directory watcher. Used by long running processes like the
+    daemon.
+    """
+    global _indexes
+    _indexes = {}
+
+
+def get_data_for_root(project_root, ignored=None, cache_dir=None, jobs=1):
     """This is the only API function of the projectfile module. It parses the Projectfiles
     from the given path and assembles the flattened command data structure.
 
+    The command scripts are built lazily: a command gets flattened and its variables
+    substituted when its 'script' key is accessed first.
+
     Returned data: {
         'min-version': (1, 0, 0),
         'description': 'Optional main description.',
@@ -78,35 +97,58 @@ def get_data_for_root(project_root):
 
 
     :param project_root:
+    :param ignored: optional list of directory patterns that should not be walked
+    :param cache_dir: optional directory of the persistent parse and command tree cache
+    :param jobs: number of processes parsing the Projectfiles, 0 means one per CPU
     :return: {dict} parsed and flattened commands with descriptions
     """
-    raw_nodes = file_handler.get_node_list(project_root)
-    command_tree = command_processor.generate_command_tree(raw_nodes)
-    command_processor.flatten_commands(command_tree)
-    command_processor.process_variables(command_tree)
-    return command_tree
-
-
-def get_walk_order(project_root):
-    starting = ['.git', '.svn', 'node_modules']
-    ending = ['__pycache__']
-    data = file_handler.get_walk_data(project_root)
+    if _indexes is not None:
+        key = (project_root, tuple(ignored or []))
+        with timing.span('update index', 'phase'):
+            if key not in _indexes:
+                _indexes[key] = index.ProjectIndex(project_root, ignored, cache_dir=cache_dir, jobs=jobs)
+            return _indexes[key].get_data()
+    command_tree = None
+    signatures = None
+    if cache_dir:
+        with timing.span('load tree cache', 'phase'):
+            command_tree = cache.load_tree(cache_dir, project_root, ignored)
+        signatures = {}
+    if command_tree is None:
+        with timing.span('get node list', 'phase'):
+            raw_nodes = file_handler.get_node_list(
+                project_root,
+                ignored=ignored,
+                cache_dir=cache_dir,
+                signatures=signatures,
+                jobs=jobs
+            )
+        with timing.span('generate command tree', 'phase'):
+            command_tree = command_processor.generate_command_tree(raw_nodes)
+        if cache_dir:
+            with timing.span('store tree cache', 'phase'):
+                cache.store_tree(cache_dir, project_root, ignored, signatures, command_tree)
+    return command_processor.defer_commands(command_tree)
+
+
+def get_walk_order(project_root, ignored=None):
+    data = file_handler.get_walk_data(project_root, ignored=ignored)
     ret = ''
     for root, dirs, files in data:
-        root = root[len(project_root) + 1:]
-        for e in starting:
-            if root.startswith(e):
-                break
+        if defs.PROJECTFILE in files:
+            mark = '[x] '
         else:
-            for e in ending:
-                if root.endswith(e):
-                    break
-            else:
-                if not root:
-                    root = '.'
-                if os.path.isfile(os.path.join(root, defs.PROJECTFILE)):
-                    ret += '[x] ' + root + '\n'
-                else:
-                    ret += '[ ] ' + root + '\n'
+            mark = '[ ] '
+        ret += mark + (root[len(project_root) + 1:] or '.') + '\n'
     return ret
 
+
+def get_projectfiles(project_root, ignored=None):
+    """Returns the absolute paths of the Projectfiles under the project root in walk
+    order.
+    """
+    ret = []
+    for root, dirs, files in file_handler.get_walk_data(project_root, ignored=ignored):
+        if defs.PROJECTFILE in files:
+            ret.append(os.path.abspath(os.path.join(root, defs.PROJECTFILE)))
+    return ret
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Persistent cache for the parsed Projectfiles. Every project root gets its own cache
+file inside the cache directory (~/.p/cache by default) that maps the absolute path
+of each Projectfile to its stat signature and its parsed data.
+
+A Projectfile only has to be parsed again if its signature (mtime, size, inode)
+changes. The cache is a pure optimization: unreadable or outdated cache files are
+ignored and write errors are swallowed.
+
+On top of the parsed Projectfiles, the final command tree is cached as well together
+with the signatures of every walked directory, every Projectfile and the ignore file.
+Adding or removing a Projectfile changes the signature of its directory, editing one
+changes its own signature, so the cached tree can be revalidated with a few stat
+calls instead of a full walk.
+"""
+
+import hashlib
+import os
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+CACHE_VERSION = 3
+
+
+def get_signature(path):
+    st = os.stat(path)
+    mtime = getattr(st, 'st_mtime_ns', None)
+    if mtime is None:
+        mtime = int(st.st_mtime * 1000000000)
+    return mtime, st.st_size, st.st_ino
+
+
+def get_signature_if_exists(path):
+    try:
+        return get_signature(path)
+    except OSError:
+        return None
+
+
+def load_tree(cache_dir, project_root, ignored):
+    """Loads the cached command tree for the given project root if none of the
+    files and directories it was assembled from have changed since.
+
+    :return: {dict} the cached command tree or None
+    """
+    entry = _load(_get_cache_file(cache_dir, project_root, 'tree'))
+    if not entry or entry['ignored'] != list(ignored or []):
+        return None
+    for path in entry['signatures']:
+        if get_signature_if_exists(path) != entry['signatures'][path]:
+            return None
+    return entry['tree']
+
+
+def store_tree(cache_dir, project_root, ignored, signatures, tree):
+    _store(_get_cache_file(cache_dir, project_root, 'tree'), {
+        'ignored': list(ignored or []),
+        'signatures': signatures,
+        'tree': tree
+    })
+
+
+def load_nodes(cache_dir, project_root):
+    """Loads the cached parsed Projectfiles for the given project root.
+
+    :return: {dict} absolute Projectfile path -> (signature, parsed data)
+    """
+    return _load(_get_cache_file(cache_dir, project_root, 'nodes'))
+
+
+def store_nodes(cache_dir, project_root, nodes):
+    _store(_get_cache_file(cache_dir, project_root, 'nodes'), nodes)
+
+
+def _get_cache_file(cache_dir, project_root, kind):
+    key = hashlib.sha1(os.path.abspath(project_root).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, '{}.{}'.format(key, kind))
+
+
+def _load(path):
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    except Exception:
+        return {}
+    if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+        return {}
+    return data['content']
+
+
+def _store(path, content):
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(temp_path, 'wb') as f:
+            pickle.dump({'version': CACHE_VERSION, 'content': content}, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(temp_path, path)
+    except (IOError, OSError):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
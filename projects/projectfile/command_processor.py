@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
 import re
 
+from projects import timing
 from . import error
 
 
@@ -18,14 +20,60 @@ def generate_command_tree(processing_tree):
     return ret
 
 
-def process_commands(command_buffer, node):
+def update_command_tree(command_tree, processing_tree, command_names):
+    """Merges the given commands again from the processing tree in place, the other
+    commands of the tree are left untouched. The version, the variables and the main
+    description are merged again from every node, as they are cheap to merge.
+
+    :param command_names: names of the commands defined by the changed nodes before
+        and after the change, the names aliased with them are added automatically
+    """
+    command_buffer = command_tree['commands']
+    command_names = get_related_commands(command_buffer, processing_tree, command_names)
+    for command_name in command_names:
+        command_buffer.pop(command_name, None)
+    for key in ['min-version', 'variables', 'description']:
+        command_tree.pop(key, None)
+    for node in processing_tree:
+        process_commands(command_buffer, node, command_names)
+        add_version(command_tree, node)
+        add_variables(command_tree, node)
+        add_description(command_tree, node)
+    remove_helper_values(command_buffer)
+    return command_tree
+
+
+def get_related_commands(command_buffer, processing_tree, command_names):
+    """Extends the command names with the ones that are merged together with them,
+    that is their aliases and the commands they are aliases of.
+    """
+    related = set(command_names)
+    while True:
+        extended = set(related)
+        for command_name, command in command_buffer.items():
+            if 'alias' in command and (command_name in related or command['alias'] in related):
+                extended.update([command_name, command['alias']])
+        for node in processing_tree:
+            for command_name, command in node['commands'].items():
+                if 'alias' in command and (command_name in related or command['alias'] in related):
+                    extended.update([command_name, command['alias']])
+        if extended == related:
+            return related
+        related = extended
+
+
+def process_commands(command_buffer, node, command_names=None):
     for command_name in node['commands']:
+        if command_names is not None and command_name not in command_names:
+            continue
         pool = get_pool(command_buffer, command_name, node)
         if pool is not None:
             add_path(node, pool)
             add_alternatives(command_name, node, command_buffer)
             add_command_description(command_name, node, command_buffer)
             add_dependency(command_name, node, command_buffer)
+            add_inputs(command_name, node, command_buffer)
+            add_outputs(command_name, node, command_buffer)
             add_pre(command_name, node, pool)
             add_post(command_name, node, pool)
 
@@ -49,7 +97,27 @@ def add_dependency(command_name, node, command_buffer):
                 if dep not in command_buffer[command_name]['dependencies']:
                     command_buffer[command_name]['dependencies'].append(dep)
         else:
-            command_buffer[command_name]['dependencies'] = node['commands'][command_name]['dependencies']
+            command_buffer[command_name]['dependencies'] = list(node['commands'][command_name]['dependencies'])
+
+
+def add_inputs(command_name, node, command_buffer):
+    _add_paths('inputs', command_name, node, command_buffer)
+
+
+def add_outputs(command_name, node, command_buffer):
+    _add_paths('outputs', command_name, node, command_buffer)
+
+
+def _add_paths(key, command_name, node, command_buffer):
+    """Merges the declared input or output paths of a command into the command
+    buffer. The paths are relative to the Projectfile that declares them.
+    """
+    if key in node['commands'][command_name]:
+        paths = command_buffer[command_name].setdefault(key, [])
+        for path in node['commands'][command_name][key]:
+            path = os.path.normpath(os.path.join(node['path'], path))
+            if path not in paths:
+                paths.append(path)
 
 
 def add_alternatives(command_name, node, command_buffer):
@@ -60,7 +128,7 @@ def add_alternatives(command_name, node, command_buffer):
                     command_buffer[command_name]['alternatives'].extend([alt])
             command_buffer[command_name]['alternatives'].sort(key=len, reverse=True)
         else:
-            command_buffer[command_name]['alternatives'] = node['commands'][command_name]['alternatives']
+            command_buffer[command_name]['alternatives'] = list(node['commands'][command_name]['alternatives'])
 
 
 def add_pre(command_name, node, pool):
@@ -155,11 +223,29 @@ def reset_stack(command_buffer, command_name):
     command_buffer[command_name]['stack'] = [command_buffer[command_name]['root']]
 
 
+_VARIABLE_REFERENCE = re.compile(r'\$(?:\{([\w\.-]+)\}|([\w\.-]+))')
+
+
 def substitute_variables(line, variables):
-    for var_name in variables:
-        line = line.replace('$' + var_name, variables[var_name]['value'])
-        line = line.replace('${' + var_name + '}', variables[var_name]['value'])
-    return line
+    """Substitutes the $name and ${name} variable references in a single pass.
+
+    The braced form has to name a variable exactly. The short form refers to the
+    longest defined variable name its characters start with, so "$ab" is "ab" if it
+    is defined and "a" followed by "b" otherwise. Unknown references are left intact
+    for the shell, and substituted values are not scanned for references again.
+    """
+    def resolve(match):
+        name = match.group(1)
+        if name is not None:
+            if name in variables:
+                return variables[name]['value']
+            return match.group(0)
+        name = match.group(2)
+        for end in range(len(name), 0, -1):
+            if name[:end] in variables:
+                return variables[name[:end]]['value'] + name[end:]
+        return match.group(0)
+    return _VARIABLE_REFERENCE.sub(resolve, line)
 
 
 def process_variables(data):
@@ -223,3 +309,73 @@ def flatten_commands(command_tree):
             flatten_node(script, node)
         command['script'] = script
         del command['root']
+
+
+class LazyCommand(dict):
+    """Command whose script is flattened and gets its variables substituted only when
+    its 'script' key is accessed first. Everything else is available right away, so
+    listing or documenting the commands never pays for building the scripts.
+    """
+
+    def __init__(self, command, variables):
+        command = dict(command)
+        self._root = command.pop('root')
+        self._variables = variables
+        dict.__init__(self, command)
+
+    def __missing__(self, key):
+        if key != 'script' or self._root is None:
+            raise KeyError(key)
+        return self.expand()
+
+    def __contains__(self, key):
+        if key == 'script' and self._root is not None:
+            return True
+        return dict.__contains__(self, key)
+
+    def __eq__(self, other):
+        self.expand()
+        if isinstance(other, LazyCommand):
+            other.expand()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def expand(self):
+        if self._root is not None:
+            script = []
+            with timing.span('flatten', 'phase'):
+                for node in self._root:
+                    flatten_node(script, node)
+            if self._variables:
+                with timing.span('substitute variables', 'phase'):
+                    script = [substitute_variables(line, self._variables) for line in script]
+            self['script'] = script
+            self._root = None
+        return dict.__getitem__(self, 'script')
+
+
+def defer_commands(command_tree):
+    """Lazy alternative of flatten_commands followed by process_variables. The
+    descriptions get their variables substituted right away, while every command is
+    replaced by a LazyCommand that builds its script on first access.
+    """
+    variables = command_tree.pop('variables', None)
+    for command_name in command_tree['commands']:
+        command = command_tree['commands'][command_name]
+        if 'alias' in command:
+            continue
+        if variables and 'description' in command:
+            command['description'] = substitute_variables(command['description'], variables)
+        command_tree['commands'][command_name] = LazyCommand(command, variables)
+    if variables and 'description' in command_tree:
+        command_tree['description'] = substitute_variables(command_tree['description'], variables)
+    return command_tree
@@ -1,3 +1,15 @@
 PROJECTFILE = 'Projectfile'
+IGNOREFILE = '.projectignore'
 
-PROHIBITED_COMMANDS = ('p',)
\ No newline at end of file
+PROHIBITED_COMMANDS = ('p',)
+
+IGNORED_DIRECTORIES = (
+    '.git',
+    '.svn',
+    '.hg',
+    'node_modules',
+    '__pycache__',
+    '.tox',
+    '.venv',
+    '*.egg-info'
+)
@@ -11,6 +11,7 @@ PROJECTFILE_NO_COMMAND_IN_COMMAND_ERROR = 'Command {} do not have any executable
 PROJECTFILE_INVALID_DEPENDENCY = 'Invalid dependency "{}" for command "{}".'
 PROJECTFILE_NO_PROJECTFILE = 'No Projectfile was found. Nothing to do..'
 PROJECTFILE_ALTERNATIVE_REDEFINED = 'Alternative "{}" was used for both "{}" and "{}"..'
+PROJECTFILE_DEPENDENCY_CYCLE = 'Dependency cycle detected: {}'
 
 COMMENT_DELIMITER_UNEXPECTED_ERROR = 'Unexpected comment delimiter (""")!'
 COMMAND_DELIMITER_UNEXPECTED_ERROR = 'Unexpected command delimiter (===)!'
@@ -32,6 +33,7 @@ COMMAND_HEADER_INVALID_ALTERNATIVE = 'Invalid command alternative syntax! It sho
 COMMAND_HEADER_EMPTY_DEPENDENCY_LIST = 'Empty dependency list!'
 COMMAND_HEADER_INVALID_DEPENDENCY_LIST = 'Invalid dependency list syntax! It should be: "[dep1, dep2]".'
 COMMAND_HEADER_SYNTAX_ERROR = 'Invalid command header format! It should be "command|c: [dep1, dep2]".'
+COMMAND_HEADER_INVALID_PATH_LIST = 'Invalid input or output list syntax! It should be: "input1, input2 -> output1, output2".'
 COMMAND_HEADER_UNEXPECTED_UNINDENTED_ERROR = 'Unexpected unindented line!'
 COMMAND_HEADER_REDEFINED_ERROR = 'Command "{}" was defined already!'
 COMMAND_HEADER_PROHIBITED_COMMAND = 'Command "{}" is prohibited. Choose another name instead.'
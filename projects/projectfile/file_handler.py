@@ -1,36 +1,261 @@
+import fnmatch
 import os
+import re
+import time
 from os import walk
+from projects import timing
+from . import cache
 from . import defs
 from . import error
 from projects.projectfile import parser
 
 
-def get_walk_data(root):
-    return walk(root)
+def get_walk_data(root, ignored=None):
+    """Top-down walk of the project tree that prunes the ignored directories before
+    descending into them, so their content never gets listed.
 
+    :param root: project root path
+    :param ignored: optional list of additional ignore patterns
+    :return: generator of (path, dirs, files) tuples like os.walk
+    """
+    matcher = _get_matcher(get_ignore_patterns(root, ignored))
+    for path, dirs, files in walk(root):
+        relative_path = path[len(root) + 1:]
+        dirs[:] = [d for d in dirs if not _is_ignored(matcher, relative_path, d)]
+        yield path, dirs, files
 
-def get_node_list(project_root):
-    result = []
-    for root, dirs, files in get_walk_data(project_root):
-        for f in files:
-            if f == defs.PROJECTFILE:
-                try:
-                    raw_lines = _load(os.path.join(root, f))
-                    node = {'path': root}
-                    node.update(parser.process_lines(raw_lines))
-                    result.append(node)
-                except Exception as e:
-                    message = e.args[0]
-                    message['path'] = root
-                    raise error.ProjectfileError(message)
-    if not result:
+
+def get_ignore_filter(project_root, ignored=None):
+    """Returns a function that tells whether a path is an ignored directory or is
+    inside one, i.e. whether get_walk_data would skip it. The function takes the
+    path and whether it is a directory.
+    """
+    matcher = _get_matcher(get_ignore_patterns(project_root, ignored))
+    project_root = os.path.abspath(project_root)
+
+    def is_ignored(path, is_directory):
+        names = os.path.relpath(os.path.abspath(path), project_root).split(os.sep)
+        if names[0] in (os.curdir, os.pardir):
+            return False
+        if not is_directory:
+            names.pop()
+        for i, name in enumerate(names):
+            if _is_ignored(matcher, '/'.join(names[:i]), name):
+                return True
+        return False
+
+    return is_ignored
+
+
+def get_ignore_patterns(project_root, ignored=None):
+    """Assembles the ignore patterns from the built in defaults, the configured
+    patterns and the optional ignore file in the project root.
+
+    Patterns are shell style wildcards. A pattern without a slash is matched against
+    the directory name, a pattern with a slash against the path relative to the
+    project root.
+    """
+    patterns = list(defs.IGNORED_DIRECTORIES)
+    if ignored:
+        patterns.extend(ignored)
+    patterns.extend(_load_ignore_file(os.path.join(project_root, defs.IGNOREFILE)))
+    return patterns
+
+
+def get_node_list(project_root, ignored=None, cache_dir=None, signatures=None, jobs=1):
+    """Collects and parses all Projectfiles under the project root in walk order.
+
+    If a cache directory is given, Projectfiles with an unchanged stat signature
+    are served from the persistent parse cache instead of being parsed again.
+
+    If a signatures dict is given, it gets filled with the stat signatures of the
+    ignore file, every walked directory and every Projectfile, which are needed to
+    revalidate anything built from the returned node list.
+
+    With more than one job the Projectfiles that need parsing are parsed on a process
+    pool. The results are assembled in walk order, so the node list and the reported
+    errors are the same as with serial parsing.
+    """
+    cached = {}
+    if cache_dir:
+        cached = cache.load_nodes(cache_dir, project_root)
+    if signatures is not None:
+        ignore_file = os.path.abspath(os.path.join(project_root, defs.IGNOREFILE))
+        signatures[ignore_file] = cache.get_signature_if_exists(ignore_file)
+    roots = []
+    with timing.span('walk', 'phase'):
+        for root, dirs, files in get_walk_data(project_root, ignored=ignored):
+            if signatures is not None:
+                signatures[os.path.abspath(root)] = cache.get_signature(root)
+            for f in files:
+                if f == defs.PROJECTFILE:
+                    roots.append(root)
+    if not roots:
         raise error.ProjectfileError({
             'error': error.PROJECTFILE_NO_PROJECTFILE
         })
+
+    entries = {}
+    if cache_dir or signatures is not None:
+        for root in roots:
+            path = os.path.abspath(os.path.join(root, defs.PROJECTFILE))
+            entries[root] = (path, cache.get_signature(path))
+            if signatures is not None:
+                signatures[path] = entries[root][1]
+    parsing_roots = [root for root in roots if not _is_cached(entries.get(root), cached)]
+
+    result = []
+    parsed = {}
+    outcomes = _parse_projectfiles(parsing_roots, jobs)
+    with timing.span('parse', 'phase', parsed=len(parsing_roots), cached=len(roots) - len(parsing_roots)):
+        try:
+            for root in roots:
+                try:
+                    if root in entries and _is_cached(entries[root], cached):
+                        data = cached[entries[root][0]][1]
+                    else:
+                        data, exception = next(outcomes)
+                        if exception is not None:
+                            raise exception
+                    if root in entries:
+                        parsed[entries[root][0]] = (entries[root][1], data)
+                    result.append(_make_node(root, data))
+                except Exception as e:
+                    raise _make_error(root, e)
+        finally:
+            outcomes.close()
+    if cache_dir and parsed != cached:
+        cache.store_nodes(cache_dir, project_root, parsed)
     return result
 
 
+def get_node(root):
+    """Parses the Projectfile in the given directory into a node of the node list.
+
+    Raises:
+        ProjectfileError with the path of the directory
+    """
+    try:
+        return _make_node(root, _parse(os.path.join(root, defs.PROJECTFILE)))
+    except Exception as e:
+        raise _make_error(root, e)
+
+
+def _make_node(root, data):
+    node = {'path': root}
+    node.update(data)
+    return node
+
+
+def _make_error(root, e):
+    message = e.args[0]
+    message['path'] = root
+    return error.ProjectfileError(message)
+
+
+def _is_cached(entry, cached):
+    return entry is not None and entry[0] in cached and cached[entry[0]][0] == entry[1]
+
+
+def _parse_projectfiles(roots, jobs):
+    """Generates the (data, exception) parsing outcomes for the Projectfiles in the
+    given directories in order. Parsing happens on a process pool if more than one
+    job is allowed, otherwise in the current process.
+    """
+    paths = [os.path.join(root, defs.PROJECTFILE) for root in roots]
+    if jobs != 1:
+        import multiprocessing
+    if jobs == 0:
+        jobs = multiprocessing.cpu_count()
+    if jobs > 1 and len(paths) > 1:
+        pool = multiprocessing.Pool(min(jobs, len(paths)))
+        try:
+            if timing.is_enabled():
+                for path, timed_outcome in zip(paths, pool.imap(_parse_file_timed, paths)):
+                    outcome, start, duration, worker = timed_outcome
+                    start -= timing.get_start_time()
+                    timing.add_span('parse Projectfile', 'phase', start, duration, worker, path=path)
+                    yield outcome
+            else:
+                for outcome in pool.imap(_parse_file, paths):
+                    yield outcome
+        finally:
+            pool.terminate()
+            pool.join()
+    else:
+        for path in paths:
+            with timing.span('parse Projectfile', 'phase', path=path):
+                outcome = _parse_file(path)
+            yield outcome
+
+
+def _parse_file(path):
+    try:
+        return _parse(path), None
+    except Exception as e:
+        return None, e
+
+
+def _parse_file_timed(path):
+    """Parses a Projectfile in a pool worker, and reports the epoch start time and
+    the duration of the parsing together with the worker name for the recorded spans.
+    """
+    start = time.time()
+    outcome = _parse_file(path)
+    return outcome, start, time.time() - start, 'parser-{}'.format(os.getpid())
+
+
+def _parse(path):
+    raw_lines = _load(path)
+    return parser.process_lines(raw_lines)
+
+
 def _load(path):
     with open(path, 'r') as f:
         raw = f.read()
     return raw.split('\n')
+
+
+def _load_ignore_file(path):
+    try:
+        lines = _load(path)
+    except (IOError, OSError):
+        return []
+    ret = []
+    for line in lines:
+        line = line.split('#')[0].strip()
+        if line:
+            ret.append(line)
+    return ret
+
+
+def _get_matcher(patterns):
+    names = []
+    paths = []
+    for pattern in patterns:
+        pattern = pattern.rstrip('/')
+        if '/' in pattern:
+            paths.append(fnmatch.translate(pattern.lstrip('/')))
+        elif pattern:
+            names.append(fnmatch.translate(pattern))
+    return {
+        'names': _compile_alternatives(names),
+        'paths': _compile_alternatives(paths)
+    }
+
+
+def _compile_alternatives(translated_patterns):
+    if not translated_patterns:
+        return None
+    return re.compile('|'.join('(?:{})'.format(p) for p in translated_patterns))
+
+
+def _is_ignored(matcher, relative_path, name):
+    if matcher['names'] and matcher['names'].match(name):
+        return True
+    if matcher['paths']:
+        if relative_path:
+            name = relative_path + '/' + name
+        if matcher['paths'].match(name):
+            return True
+    return False
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Live index of the Projectfiles of a project for long running processes like the
+daemon. Every walked directory is watched, so instead of revalidating the stat
+signature of every file on every request, only the changes reported by the watcher
+are processed:
+
+    - a changed Projectfile is parsed again on its own, and only the commands it
+      defined before or defines after the change are merged again,
+    - a created or deleted directory, Projectfile or ignore file triggers a walk
+      of the tree, but only the new Projectfiles get parsed.
+
+If the watcher loses events, everything is parsed again. The first scan goes through
+the persistent parse cache, so creating an index costs the same as a normal run.
+
+Changes inside the ignored directories are dropped. The revision of the index is
+increased whenever a Projectfile was added, removed or changed, so its users can
+tell whether anything built from the command data is stale.
+"""
+
+import os
+
+from projects import watcher as watchers
+from . import command_processor
+from . import defs
+from . import error
+from . import file_handler
+
+
+class ProjectIndex(object):
+    def __init__(self, project_root, ignored=None, watcher=None, cache_dir=None, jobs=1):
+        """
+        :param watcher: optional directory watcher, see projects.watcher
+        :param cache_dir: optional directory of the persistent parse cache
+        :param jobs: number of processes parsing the Projectfiles on the first scan
+        """
+        self.project_root = os.path.abspath(project_root)
+        self.ignored = ignored
+        self._cache_dir = cache_dir
+        self._jobs = jobs
+        self._watcher = watcher or watchers.create()
+        self._is_ignored = None
+        self._directories = set()
+        self._roots = []
+        self._nodes = {}
+        self._tree = None
+        self.revision = 0
+        self._scan(set())
+
+    def get_data(self):
+        """Processes the pending changes, then returns the command data in the same
+        format as projectfile.get_data_for_root.
+        """
+        self.update(0)
+        if not self._roots:
+            raise error.ProjectfileError({
+                'error': error.PROJECTFILE_NO_PROJECTFILE
+            })
+        for root in self._roots:
+            if isinstance(self._nodes[root], Exception):
+                raise self._nodes[root]
+        if self._tree is None:
+            self._tree = command_processor.generate_command_tree(self._get_node_list())
+        return command_processor.defer_commands(_copy_tree(self._tree))
+
+    def update(self, timeout=None):
+        """Waits at most timeout seconds for changes and processes them.
+
+        :return: [list] (path, is_directory) changes outside of the ignored
+            directories, empty if nothing has changed
+        """
+        events = [(path, is_directory) for path, is_directory in self._watcher.read(timeout)
+                  if path is None or not self._is_ignored(path, is_directory)]
+        if not events:
+            return []
+        changed = set()
+        rescan = False
+        for path, is_directory in events:
+            if path is None:
+                changed.update(self._roots)
+                rescan = True
+            elif is_directory or os.path.basename(path) == defs.IGNOREFILE:
+                rescan = True
+            elif os.path.basename(path) == defs.PROJECTFILE:
+                root = os.path.dirname(path)
+                changed.add(root)
+                if root not in self._nodes or not os.path.isfile(path):
+                    rescan = True
+        if rescan:
+            self._scan(changed)
+        else:
+            self._reparse(changed)
+        return events
+
+    def get_projectfiles(self):
+        """Returns the absolute paths of the Projectfiles in walk order."""
+        return [os.path.join(root, defs.PROJECTFILE) for root in self._roots]
+
+    def close(self):
+        self._watcher.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _scan(self, changed):
+        self._is_ignored = file_handler.get_ignore_filter(self.project_root, self.ignored)
+        directories = []
+        roots = []
+        for root, dirs, files in file_handler.get_walk_data(self.project_root, ignored=self.ignored):
+            directories.append(root)
+            if defs.PROJECTFILE in files:
+                roots.append(root)
+        self._watch(directories)
+        previous_roots = [root for root in self._roots if root in roots]
+        previous_nodes = self._nodes or self._load_nodes()
+        self._nodes = {}
+        for root in roots:
+            if root in previous_nodes and root not in changed:
+                self._nodes[root] = previous_nodes[root]
+            else:
+                self._nodes[root] = _get_node(root)
+        updated = set(roots) ^ set(self._roots) | (changed & set(roots))
+        kept_order = previous_roots == [root for root in roots if root in self._roots]
+        self._roots = roots
+        if updated:
+            self.revision += 1
+        self._merge(updated, previous_nodes, kept_order)
+
+    def _reparse(self, changed):
+        previous_nodes = dict(self._nodes)
+        for root in changed:
+            self._nodes[root] = _get_node(root)
+        if changed:
+            self.revision += 1
+        self._merge(changed, previous_nodes, True)
+
+    def _merge(self, updated, previous_nodes, kept_order):
+        if self._tree is None or not updated:
+            return
+        nodes = [previous_nodes.get(root) for root in updated] + [self._nodes.get(root) for root in updated]
+        if not kept_order or any(isinstance(node, Exception) for node in nodes):
+            self._tree = None
+            return
+        command_names = set()
+        for node in nodes:
+            if node is not None:
+                command_names.update(node['commands'])
+        try:
+            command_processor.update_command_tree(self._tree, self._get_node_list(), command_names)
+        except error.ProjectfileError:
+            # Reported by get_data when it merges the whole tree again.
+            self._tree = None
+
+    def _watch(self, directories):
+        directories = set(directories)
+        for directory in self._directories - directories:
+            self._watcher.remove(directory)
+        for directory in directories - self._directories:
+            try:
+                self._watcher.add(directory)
+            except OSError:
+                if isinstance(self._watcher, watchers.PollingWatcher):
+                    raise
+                # The inotify watch limit is reached, so fall back to polling.
+                self._watcher.close()
+                self._watcher = watchers.PollingWatcher()
+                self._directories = set()
+                return self._watch(directories)
+        self._directories = directories
+
+    def _load_nodes(self):
+        try:
+            nodes = file_handler.get_node_list(self.project_root, ignored=self.ignored,
+                                               cache_dir=self._cache_dir, jobs=self._jobs)
+        except error.ProjectfileError:
+            return {}
+        return dict((node['path'], node) for node in nodes)
+
+    def _get_node_list(self):
+        return [self._nodes[root] for root in self._roots]
+
+
+def _get_node(root):
+    try:
+        return file_handler.get_node(root)
+    except error.ProjectfileError as e:
+        return e
+
+
+def _copy_tree(tree):
+    ret = dict(tree)
+    ret['commands'] = dict((name, dict(command)) for name, command in tree['commands'].items())
+    return ret
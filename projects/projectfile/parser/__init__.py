@@ -1,4 +1,6 @@
 from .. import error
+from .. import utils
+from . import parse
 from . import state
 
 
@@ -9,11 +11,12 @@ def process_lines(lines):
 
 
 def _parse_lines(lines):
-    data = {}
+    context = utils.ParsingContext()
+    data = context.data
     state_function = state.start
     for i in range(len(lines)):
         try:
-            state_function = state_function(data, lines[i])
+            state_function = state_function(context, parse.tokenize(lines[i]))
         except SyntaxError as e:
             message = e.args[0]
             raise error.ProjectfileError({
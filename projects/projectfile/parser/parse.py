@@ -1,24 +1,82 @@
 import re
+from collections import namedtuple
 
 from projects.projectfile import error
 from projects.projectfile import defs
 
 
+EMPTY = 'empty'
+COMMENT_DELIMITER = 'comment_delimiter'
+COMMAND_DIVISOR = 'command_divisor'
+INDENTED = 'indented'
+TEXT = 'text'
+
+Token = namedtuple('Token', ['kind', 'line', 'value'])
+
+_TOKEN = re.compile(
+    r'^(?:'
+    r'(?P<empty>\s*(?:#.*)?)|'
+    r'(?P<comment_delimiter>\s*"""\s*(?:#.*)?)|'
+    r'(?P<command_divisor>\s*===\s*(?:#.*)?)|'
+    r'\s+(?P<indented>[^#]*)(?:#.*)?'
+    r')$'
+)
+
+_VERSION = re.compile(r'^from\s+v?(\d+)\.(\d+)\.(\d+)\s*(#.*)?$')
+_VERSION_INDENTED = re.compile(r'^\s+from.*$')
+_VERSION_KEYWORD = re.compile(r'^from.*$')
+_VERSION_WITHOUT_COMMENT = re.compile(r'^from\s+v?(\d+)\.(\d+)\.(\d+)\s*$')
+_LINE = re.compile(r'^(.*)$')
+_EMPTY_LINE = re.compile(r'^\s*(#.*)?$')
+_INDENTED_LINE = re.compile(r'^\s+([^#]*)(#.*)?$')
+_COMMENT_DELIMITER = re.compile(r'\s*"""\s*(#.*)?$')
+_VARIABLE = re.compile(r'^([\w\.-]+)\s*=\s*([^#]*)(#.*)?$')
+_VARIABLE_INDENTED = re.compile(r'^\s+[\w\.-]+\s*=\s*.*$')
+_COMMAND_DIVISOR = re.compile(r'\s*===\s*(#.*)?$')
+_HEADER_COMMENTED_COLON = re.compile(r'^[^#]*#[^#]*:.*')
+_HEADER_INDENTED = re.compile(r'^\s+.*:.*')
+_HEADER = re.compile(r'^([\w\|\.\s-]+):\s*(?:\[([\w\.\s,-]+)\])?\s*(?:([^#\[\]]*?)\s*->\s*([^#\[\]]*?))?\s*(#.*)?$')
+_INDENTATION = re.compile(r'^\s+.*')
+_COLON = re.compile(r':')
+_MISPLACED_COLON = re.compile(r'(\w:\w|^:)')
+_EMPTY_DEPENDENCY_LIST = re.compile(r'\[\]')
+_BRACKET = re.compile(r'[\[\]]')
+_DEPENDENCY_LIST = re.compile(r'\[[^\[\]]*\]')
+_INVALID_DEPENDENCY_LIST = re.compile(r'\[(\s*,\s*|[^,]*,\s*,[^,]*)\]')
+
+
+def tokenize(line):
+    """Classifies a raw line with a single match into a token. The value of an
+    indented token is its stripped content without the trailing comment.
+
+    Lines that are none of the structural kinds (version, variable, command header or
+    invalid lines) become text tokens. The states parse those on demand with the more
+    specific parser functions, as their meaning depends on the state.
+    """
+    m = _TOKEN.match(line)
+    if m is None:
+        return Token(TEXT, line, None)
+    kind = m.lastgroup
+    if kind == INDENTED:
+        return Token(INDENTED, line, m.group(INDENTED).strip())
+    return Token(kind, line, None)
+
+
 def version(line):
-    m = re.match('^from\s+v?(\d+)\.(\d+)\.(\d+)\s*(#.*)?$', line)
+    m = _VERSION.match(line)
     if m:
         return int(m.group(1)), int(m.group(2)), int(m.group(3))
     else:
-        if re.match('^\s+from.*$', line):
+        if _VERSION_INDENTED.match(line):
             raise SyntaxError(error.VERSION_INDENTATION_ERROR)
-        elif re.match('^from.*$', line) and not re.match('^from\s+v?(\d+)\.(\d+)\.(\d+)\s*$', line):
+        elif _VERSION_KEYWORD.match(line) and not _VERSION_WITHOUT_COMMENT.match(line):
             raise SyntaxError(error.VERSION_FORMAT_ERROR)
         else:
             return None
 
 
 def line(line):
-    m = re.match('^(.*)$', line)
+    m = _LINE.match(line)
     if m:
         return m.group(1).strip()
     else:
@@ -26,14 +84,14 @@ def line(line):
 
 
 def empty_line(line):
-    if re.match('^\s*(#.*)?$', line):
+    if _EMPTY_LINE.match(line):
         return True
     else:
         return False
 
 
 def indented_line(line):
-    m = re.match('^\s+([^#]*)(#.*)?$', line)
+    m = _INDENTED_LINE.match(line)
     if m:
         ret = m.group(1).strip()
         if len(ret) == 0:
@@ -45,14 +103,14 @@ def indented_line(line):
 
 
 def comment_delimiter(line):
-    if re.match('\s*"""\s*(#.*)?$', line):
+    if _COMMENT_DELIMITER.match(line):
         return True
     else:
         return False
 
 
 def variable(line):
-    m = re.match('^([\w\.-]+)\s*=\s*([^#]*)(#.*)?$', line)
+    m = _VARIABLE.match(line)
     if m:
         value = m.group(2).strip()
         if len(value) == 0:
@@ -72,24 +130,24 @@ def variable(line):
         value = value.replace("\\'", "'")
         return {m.group(1): value}
     else:
-        if re.match('^\s+[\w\.-]+\s*=\s*.*$', line):
+        if _VARIABLE_INDENTED.match(line):
             raise SyntaxError(error.VARIABLE_INDENTATION_ERROR)
         return None
 
 
 def command_divisor(line):
-    if re.match('\s*===\s*(#.*)?$', line):
+    if _COMMAND_DIVISOR.match(line):
         return True
     else:
         return False
 
 
 def command_header(line):
-    if re.match('^[^#]*#[^#]*:.*', line):
+    if _HEADER_COMMENTED_COLON.match(line):
         raise SyntaxError(error.COMMAND_HEADER_MISSING_COLON_ERROR)
-    if re.match('^\s+.*:.*', line):
+    if _HEADER_INDENTED.match(line):
         raise SyntaxError(error.COMMAND_HEADER_INDENTATION_ERROR)
-    m = re.match('^([\w\|\.\s-]+):\s*(?:\[([\w\.\s,-]+)\])?\s*(#.*)?$', line)
+    m = _HEADER.match(line)
     if m:
         keys = m.group(1).split('|')
         keys = [k.strip() for k in keys]
@@ -112,6 +170,13 @@ def command_header(line):
         ret = {keys[0]: {'done': False}}
         if deps:
             ret[keys[0]]['dependencies'] = deps
+        if m.group(3) is not None:
+            inputs = _path_list(m.group(3))
+            outputs = _path_list(m.group(4))
+            if inputs:
+                ret[keys[0]]['inputs'] = inputs
+            if outputs:
+                ret[keys[0]]['outputs'] = outputs
         if len(keys) > 1:
             alternatives = sorted(keys[1:], key=len, reverse=True)
             ret[keys[0]]['alternatives'] = alternatives
@@ -119,19 +184,23 @@ def command_header(line):
                 ret[a] = {'alias': keys[0]}
         return ret
     else:
-        if not re.match('^\s+.*', line) and not re.search(':', line):
+        if not _INDENTATION.match(line) and not _COLON.search(line):
             raise SyntaxError(error.COMMAND_HEADER_MISSING_COLON_ERROR)
-        if not re.match('^\s+.*', line) and re.search('(\w:\w|^:)', line):
+        if not _INDENTATION.match(line) and _MISPLACED_COLON.search(line):
             raise SyntaxError(error.COMMAND_HEADER_COLON_ERROR)
-        if re.search('\[\]', line):
+        if _EMPTY_DEPENDENCY_LIST.search(line):
             raise SyntaxError(error.COMMAND_HEADER_EMPTY_DEPENDENCY_LIST)
-        if re.search('[\[\]]', line):
-            if not re.search('\[[^\[\]]*\]', line) or re.search('\[(\s*,\s*|[^,]*,\s*,[^,]*)\]', line):
+        if _BRACKET.search(line):
+            if not _DEPENDENCY_LIST.search(line) or _INVALID_DEPENDENCY_LIST.search(line):
                 raise SyntaxError(error.COMMAND_HEADER_INVALID_DEPENDENCY_LIST)
-        raise SyntaxError(error.COMMAND_HEADER_SYNTAX_ERROR)
-
-
-
-
-
-
+        raise SyntaxError(error.COMMAND_HEADER_SYNTAX_ERROR)
+
+
+def _path_list(text):
+    if not text.strip():
+        return []
+    paths = [p.strip() for p in text.split(',')]
+    for path in paths:
+        if not path:
+            raise SyntaxError(error.COMMAND_HEADER_INVALID_PATH_LIST)
+    return paths
@@ -1,42 +1,42 @@
 from . import parse
 from .. import error
-from .. import utils
 
 
-def start(data, line):
-    v = parse.version(line)
+def start(context, token):
+    if token.kind == parse.EMPTY:
+        return start
+    v = parse.version(token.line)
     if v:
-        data.update({'min-version': v})
+        context.data.update({'min-version': v})
         return before_commands
-    elif parse.empty_line(line):
-        return start
     else:
         raise SyntaxError(error.VERSION_MISSING_ERROR)
 
 
-def before_commands(data, line):
-    if parse.empty_line(line):
+def before_commands(context, token):
+    if token.kind == parse.EMPTY:
         return before_commands
-    if parse.comment_delimiter(line):
+    if token.kind == parse.COMMENT_DELIMITER:
         return main_comment
-    v = parse.variable(line)
+    v = parse.variable(token.line)
     if v:
-        data.update({'variables': v})
+        context.data.update({'variables': v})
         return variables
-    c = parse.command_header(line)
+    c = parse.command_header(token.line)
     if c:
-        data['commands'] = c
+        context.add_command(c)
         return command
     else:
         raise SyntaxError(error.COMMAND_HEADER_SYNTAX_ERROR)
 
 
-def main_comment(data, line):
-    if parse.comment_delimiter(line):
+def main_comment(context, token):
+    if token.kind == parse.COMMENT_DELIMITER:
         return variables
+    data = context.data
     if 'description' not in data:
         data['description'] = ''
-    l = parse.line(line)
+    l = token.line.strip()
     if l:
         if data['description'] == '':
             data['description'] = l
@@ -46,56 +46,55 @@ def main_comment(data, line):
             else:
                 data['description'] += l
         return main_comment
-    if parse.empty_line(line):
+    if token.kind == parse.EMPTY:
         if data['description'] != '':
             if data['description'][-2:] != '\n\n':
                 data['description'] += '\n\n'
         return main_comment
 
 
-def variables(data, line):
-    if parse.empty_line(line):
+def variables(context, token):
+    if token.kind == parse.EMPTY:
         return variables
-    if parse.comment_delimiter(line):
+    if token.kind == parse.COMMENT_DELIMITER:
         raise SyntaxError(error.COMMENT_DELIMITER_UNEXPECTED_ERROR)
-    v = parse.variable(line)
+    v = parse.variable(token.line)
     if v:
-        if 'variables' not in data:
-            data['variables'] = {}
-        data['variables'].update(v)
+        if 'variables' not in context.data:
+            context.data['variables'] = {}
+        context.data['variables'].update(v)
         return variables
     else:
-        c = parse.command_header(line)
+        c = parse.command_header(token.line)
         if c:
-            data['commands'] = c
+            context.add_command(c)
             return command
         else:
             raise SyntaxError(error.VARIABLE_SYNTAX_ERROR)
 
 
-def command(data, line):
-    if parse.empty_line(line):
+def command(context, token):
+    if token.kind == parse.EMPTY:
         return command
-    current_command = utils.get_current_command(data)
-    if parse.comment_delimiter(line):
+    current_command = context.command
+    if token.kind == parse.COMMENT_DELIMITER:
         return command_comment
-    if parse.command_divisor(line):
+    if token.kind == parse.COMMAND_DIVISOR:
         return post
-    l = parse.indented_line(line)
-    if l:
-        current_command['pre'] = [l]
+    if token.kind == parse.INDENTED:
+        current_command['pre'] = [token.value]
         return pre
     else:
         raise SyntaxError(error.COMMAND_HEADER_UNEXPECTED_UNINDENTED_ERROR)
 
 
-def command_comment(data, line):
-    if parse.comment_delimiter(line):
+def command_comment(context, token):
+    if token.kind == parse.COMMENT_DELIMITER:
         return pre
-    current_command = utils.get_current_command(data)
+    current_command = context.command
     if 'description' not in current_command:
         current_command['description'] = ''
-    l = parse.line(line)
+    l = token.line.strip()
     if l:
         if current_command['description'] == '':
             current_command['description'] = l
@@ -105,52 +104,46 @@ def command_comment(data, line):
             else:
                 current_command['description'] += l
         return command_comment
-    if parse.empty_line(line):
+    if token.kind == parse.EMPTY:
         if current_command['description'] != '':
             if current_command['description'][-2:] != '\n\n':
                 current_command['description'] += '\n\n'
         return command_comment
 
 
-def pre(data, line):
-    if parse.empty_line(line):
+def pre(context, token):
+    if token.kind == parse.EMPTY:
         return pre
-    if parse.comment_delimiter(line):
+    if token.kind == parse.COMMENT_DELIMITER:
         raise SyntaxError(error.COMMENT_DELIMITER_UNEXPECTED_ERROR)
-    current_command = utils.get_current_command(data)
+    current_command = context.command
     if 'pre' not in current_command:
         current_command['pre'] = []
-    if parse.command_divisor(line):
+    if token.kind == parse.COMMAND_DIVISOR:
         return post
-    l = parse.indented_line(line)
-    if l:
-        current_command['pre'].append(l)
+    if token.kind == parse.INDENTED:
+        current_command['pre'].append(token.value)
         return pre
-    c = parse.command_header(line)
+    c = parse.command_header(token.line)
     if c:
-        current_command['done'] = True
-        utils.assert_command_is_present(c, data)
-        data['commands'].update(c)
+        context.add_command(c)
         return command
 
 
-def post(data, line):
-    if parse.empty_line(line):
+def post(context, token):
+    if token.kind == parse.EMPTY:
         return post
-    if parse.command_divisor(line):
+    if token.kind == parse.COMMAND_DIVISOR:
         raise SyntaxError(error.COMMAND_DELIMITER_UNEXPECTED_ERROR)
-    if parse.comment_delimiter(line):
+    if token.kind == parse.COMMENT_DELIMITER:
         raise SyntaxError(error.COMMENT_DELIMITER_UNEXPECTED_ERROR)
-    current_command = utils.get_current_command(data)
+    current_command = context.command
     if 'post' not in current_command:
         current_command['post'] = []
-    l = parse.indented_line(line)
-    if l:
-        current_command['post'].append(l)
+    if token.kind == parse.INDENTED:
+        current_command['post'].append(token.value)
         return post
-    c = parse.command_header(line)
+    c = parse.command_header(token.line)
     if c:
-        current_command['done'] = True
-        utils.assert_command_is_present(c, data)
-        data['commands'].update(c)
+        context.add_command(c)
         return command
@@ -1,5 +1,39 @@
 from . import error
 
+
+class ParsingContext(object):
+    """Parsing state that is carried through the state functions: the data parsed
+    so far and the command whose body is currently being parsed. Keeping track of
+    the active command makes every line lookup constant time.
+    """
+
+    def __init__(self, data=None):
+        if data is None:
+            data = {}
+        self.data = data
+        self.command = None
+        if 'commands' in data:
+            self.command = get_current_command(data)
+
+    def add_command(self, c):
+        """Closes the active command and registers the freshly parsed command header
+        with its alternatives. The main command of the header becomes active.
+
+        Raises:
+            SyntaxError     if a command or an alternative was defined already
+        """
+        if 'commands' in self.data:
+            if self.command is not None:
+                self.command['done'] = True
+            assert_command_is_present(c, self.data)
+            self.data['commands'].update(c)
+        else:
+            self.data['commands'] = c
+        for key in c:
+            if 'alias' not in c[key]:
+                self.command = c[key]
+
+
 def get_current_command(data):
     for command in data['commands']:
         if 'done' in data['commands'][command]:
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Wall time recording for the --timings and --trace options. The internal phases,
+the executed commands and their steps are wrapped into spans. Recording is off by
+default, in that case a span is a shared no-op context manager, so the
+instrumentation costs a function call.
+
+API:
+    enable()            Starts recording the spans.
+    disable()           Stops recording and drops the recorded spans.
+    span(name, category, **args)
+                        Context manager that records a span if recording is on.
+                        Extra data can be attached with its set(key, value) method.
+    get_spans()         Returns the recorded spans in their finishing order.
+    format_summary()    Returns the summary table of the recorded spans.
+    write_json_lines(path)
+                        Appends the recorded spans to a JSON lines file.
+    write_trace(path)   Writes the recorded spans as a Chrome trace event file.
+"""
+
+import json
+import os
+import threading
+import time
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+_lock = threading.Lock()
+_spans = None
+_origin = None
+_started = None
+
+
+class Span(object):
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.thread = threading.current_thread().name
+        self.start = None
+        self.duration = None
+
+    def set(self, key, value):
+        self.args[key] = value
+
+    def __enter__(self):
+        self.start = _clock() - _origin
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = _clock() - _origin - self.start
+        with _lock:
+            if _spans is not None:
+                _spans.append(self)
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'category': self.category,
+            'thread': self.thread,
+            'start': self.start,
+            'duration': self.duration,
+            'args': self.args
+        }
+
+
+class _NullSpan(object):
+    def set(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable():
+    global _spans, _origin, _started
+    with _lock:
+        if _spans is None:
+            _spans = []
+            _origin = _clock()
+            _started = time.time()
+
+
+def add_span(name, category, start, duration, thread, **args):
+    """Records a span that was measured elsewhere, for example in another process.
+
+    :param start: start time in seconds relative to the start of the recording
+    :param duration: duration in seconds
+    :param thread: name of the track the span belongs to
+    """
+    if _spans is None:
+        return
+    s = Span(name, category, args)
+    s.start = start
+    s.duration = duration
+    s.thread = thread
+    with _lock:
+        _spans.append(s)
+
+
+def disable():
+    """Stops recording and drops the recorded spans."""
+    global _spans
+    with _lock:
+        _spans = None
+
+
+def is_enabled():
+    return _spans is not None
+
+
+def span(name, category, **args):
+    if _spans is None:
+        return _NULL_SPAN
+    return Span(name, category, args)
+
+
+def get_spans():
+    with _lock:
+        return list(_spans or [])
+
+
+def get_start_time():
+    """Returns the epoch time the recording was enabled at."""
+    return _started
+
+
+def format_summary():
+    """Aggregates the spans with the same category and name, and lists them in
+    descending order of their total duration.
+    """
+    totals = {}
+    for s in get_spans():
+        key = (s.category, s.name)
+        count, duration = totals.get(key, (0, 0.0))
+        totals[key] = (count + 1, duration + s.duration)
+    rows = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+    lines = ['{:<10}{:>8}{:>12}  {}'.format('category', 'count', 'total ms', 'name')]
+    for (category, name), (count, duration) in rows:
+        lines.append('{:<10}{:>8}{:>12.1f}  {}'.format(category, count, duration * 1000, name))
+    return '\n'.join(lines) + '\n'
+
+
+def write_json_lines(path):
+    """Appends one JSON object per recorded span to the given file. Every line carries
+    the start time of the invocation, so the runs can be told apart.
+    """
+    with open(path, 'a') as f:
+        for s in get_spans():
+            line = s.as_dict()
+            line['invocation'] = _started
+            f.write(json.dumps(line, sort_keys=True) + '\n')
+
+
+def write_trace(path):
+    """Writes the recorded spans as a Chrome trace event file that can be opened in
+    chrome://tracing or Perfetto. Every thread or worker process gets its own track.
+    """
+    pid = os.getpid()
+    tracks = {}
+    events = []
+    for s in sorted(get_spans(), key=lambda s: s.start):
+        if s.thread not in tracks:
+            tracks[s.thread] = len(tracks) + 1
+            events.append({
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': pid,
+                'tid': tracks[s.thread],
+                'args': {'name': s.thread}
+            })
+        events.append({
+            'name': s.name,
+            'cat': s.category,
+            'ph': 'X',
+            'ts': s.start * 1000000,
+            'dur': s.duration * 1000000,
+            'pid': pid,
+            'tid': tracks[s.thread],
+            'args': s.args
+        })
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,6 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The single source of the version number. It is read by setup.py without importing
+# the package, and by the p command without querying the installed distribution.
+__version__ = '1.0.9'
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Directory watchers for the long running processes. A watcher reports the entries
+that were created, deleted, moved or written in the watched directories. On Linux
+it is built on inotify through a small ctypes binding, so waiting for changes costs
+nothing. Elsewhere, or if inotify is not available, a polling watcher compares the
+stat signatures of the directory entries, which is O(entries) per check.
+
+API:
+    create()            Returns an inotify watcher if possible, a polling one otherwise.
+    watcher.add(path)   Starts watching a directory, not recursively.
+    watcher.remove(path)
+                        Stops watching a directory.
+    watcher.read(timeout)
+                        Waits at most timeout seconds (None waits forever) for
+                        changes and returns them as (path, is_directory) tuples. A
+                        (None, True) event means that events were lost and everything
+                        has to be checked again.
+    watcher.close()
+"""
+
+import errno
+import os
+import select
+import stat
+import struct
+import sys
+import time
+
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (_IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE |
+               _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct('iIII')
+_BUFFER_SIZE = 65536
+
+POLLING_INTERVAL = 0.5
+
+
+def create():
+    try:
+        return InotifyWatcher()
+    except OSError:
+        return PollingWatcher()
+
+
+class InotifyWatcher(object):
+    def __init__(self):
+        """
+        Raises:
+            OSError     if inotify is not available
+        """
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise _get_error()
+        self._paths = {}
+        self._descriptors = {}
+
+    def add(self, path):
+        """
+        Raises:
+            OSError     if the directory cannot be watched, for example because the
+                        inotify watch limit is reached
+        """
+        path = os.path.abspath(path)
+        descriptor = self._libc.inotify_add_watch(self._fd, path.encode(sys.getfilesystemencoding()), _WATCH_MASK)
+        if descriptor < 0:
+            raise _get_error()
+        self._paths[descriptor] = path
+        self._descriptors[path] = descriptor
+
+    def remove(self, path):
+        descriptor = self._descriptors.pop(os.path.abspath(path), None)
+        if descriptor is not None:
+            self._paths.pop(descriptor, None)
+            self._libc.inotify_rm_watch(self._fd, descriptor)
+
+    def read(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait = None if deadline is None else max(deadline - time.time(), 0)
+            if not select.select([self._fd], [], [], wait)[0]:
+                return []
+            try:
+                data = os.read(self._fd, _BUFFER_SIZE)
+            except OSError as e:
+                if e.errno == errno.EAGAIN:
+                    continue
+                raise
+            events = self._parse(data)
+            if events:
+                return events
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def fileno(self):
+        return self._fd
+
+    def _parse(self, data):
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            descriptor, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode(sys.getfilesystemencoding())
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                events.append((None, True))
+                continue
+            path = self._paths.get(descriptor)
+            if path is None:
+                continue
+            if mask & _IN_IGNORED:
+                self._paths.pop(descriptor, None)
+                if self._descriptors.get(path) == descriptor:
+                    del self._descriptors[path]
+                continue
+            if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+                events.append((path, True))
+            else:
+                events.append((os.path.join(path, name), bool(mask & _IN_ISDIR)))
+        return events
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PollingWatcher(object):
+    """Fallback watcher that lists the watched directories and compares the stat
+    signatures of their entries on every check.
+    """
+
+    def __init__(self, interval=POLLING_INTERVAL):
+        self.interval = interval
+        self._snapshots = {}
+
+    def add(self, path):
+        path = os.path.abspath(path)
+        snapshot = _take_snapshot(path)
+        if snapshot is None:
+            raise OSError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        self._snapshots[path] = snapshot
+
+    def remove(self, path):
+        self._snapshots.pop(os.path.abspath(path), None)
+
+    def read(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            events = []
+            for path in list(self._snapshots):
+                snapshot = _take_snapshot(path)
+                if snapshot is None:
+                    events.append((path, True))
+                    del self._snapshots[path]
+                    continue
+                previous = self._snapshots[path]
+                for name in set(previous) | set(snapshot):
+                    if previous.get(name) != snapshot.get(name):
+                        is_directory = (previous.get(name) or snapshot.get(name))[1]
+                        events.append((os.path.join(path, name), is_directory))
+                self._snapshots[path] = snapshot
+            if events or (deadline is not None and time.time() >= deadline):
+                return events
+            wait = self.interval
+            if deadline is not None:
+                wait = min(wait, deadline - time.time())
+            time.sleep(max(wait, 0))
+
+    def close(self):
+        self._snapshots = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _take_snapshot(path):
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return None
+    snapshot = {}
+    for name in names:
+        try:
+            st = os.lstat(os.path.join(path, name))
+        except OSError:
+            continue
+        is_directory = stat.S_ISDIR(st.st_mode)
+        signature = None if is_directory else (st.st_mtime, st.st_size, st.st_ino)
+        snapshot[name] = (signature, is_directory)
+    return snapshot
+
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        raise OSError(errno.ENOSYS, 'inotify is only available on Linux')
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    if not hasattr(libc, 'inotify_init1'):
+        raise OSError(errno.ENOSYS, 'inotify is not available')
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+def _get_error():
+    import ctypes
+    number = ctypes.get_errno()
+    return OSError(number, os.strerror(number))
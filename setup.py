@@ -1,8 +1,16 @@
+import re
+
 from setuptools import find_packages, setup
 
+
+def get_version():
+    with open('projects/version.py') as f:
+        return re.search(r"__version__ = '(.+)'", f.read()).group(1)
+
+
 setup(
     name='projects',
-    version='1.0.9',
+    version=get_version(),
     description='The intuitive project manager',
     long_description=("projects is an easy to use project navigation tool "
                       "and a Makefile-like scripting engine. It's main purpose "
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from test.helpers import *
+
+from projects.execution import artifacts
+
+
+class ArtifactStorage(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = artifacts.ArtifactCache(os.path.join(self.directory, 'cache'), 1024 * 1024)
+        self.output = os.path.join(self.directory, 'out', 'app')
+        self.command = {
+            'script': ['make'],
+            'outputs': [self.output]
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, path, content, mode=0o644):
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(path, 'w') as f:
+            f.write(content)
+        os.chmod(path, mode)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test__key_depends_on_script_inputs_and_outputs(self):
+        key = self.cache.get_key(self.command, 'inputs')
+        self.assertEqual(key, self.cache.get_key(dict(self.command), 'inputs'))
+        self.assertNotEqual(key, self.cache.get_key(self.command, 'other inputs'))
+        self.assertNotEqual(key, self.cache.get_key({'script': ['make all'], 'outputs': [self.output]}, 'inputs'))
+        self.assertNotEqual(key, self.cache.get_key({'script': ['make'], 'outputs': ['other']}, 'inputs'))
+
+    def test__missing_entry_is_a_miss(self):
+        self.assertFalse(self.cache.restore('key'))
+        self.assertEqual(1, self.cache.get_stats()['misses'])
+
+    def test__stored_outputs_are_restored(self):
+        self.write(self.output, 'version 1', 0o755)
+        self.cache.store('key', [self.output])
+        shutil.rmtree(os.path.dirname(self.output))
+        self.assertTrue(self.cache.restore('key'))
+        self.assertEqual('version 1', self.read(self.output))
+        self.assertEqual(0o755, os.stat(self.output).st_mode & 0o777)
+
+    def test__directory_outputs_are_stored_file_by_file(self):
+        output_dir = os.path.join(self.directory, 'out')
+        self.write(os.path.join(output_dir, 'a'), 'a')
+        self.write(os.path.join(output_dir, 'sub', 'b'), 'b')
+        self.cache.store('key', [output_dir])
+        shutil.rmtree(output_dir)
+        self.assertTrue(self.cache.restore('key'))
+        self.assertEqual('b', self.read(os.path.join(output_dir, 'sub', 'b')))
+
+    def test__same_content_is_stored_once(self):
+        self.write(self.output, 'same')
+        self.cache.store('key1', [self.output])
+        self.cache.store('key2', [self.output])
+        stats = self.cache.get_stats()
+        self.assertEqual(2, stats['entries'])
+        self.assertEqual(1, stats['objects'])
+
+    def test__disabled_cache_stores_nothing(self):
+        cache = artifacts.ArtifactCache(os.path.join(self.directory, 'cache'), 0)
+        self.write(self.output, 'content')
+        cache.store('key', [self.output])
+        self.assertFalse(cache.restore('key'))
+        self.assertEqual(0, cache.get_stats()['entries'])
+
+    def test__counters_are_persisted_on_close(self):
+        self.write(self.output, 'content')
+        self.cache.store('key', [self.output])
+        self.cache.restore('key')
+        self.cache.restore('other')
+        self.cache.close()
+        stats = artifacts.ArtifactCache(self.cache.directory, 1024).get_stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(1, stats['stores'])
+
+
+class ArtifactEviction(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = artifacts.ArtifactCache(os.path.join(self.directory, 'cache'), 250)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def store(self, key, content, mtime):
+        path = os.path.join(self.directory, key)
+        with open(path, 'w') as f:
+            f.write(content)
+        self.cache.store(key, [path])
+        entry = self.cache._entry_path(key)
+        os.utime(entry, (mtime, mtime))
+
+    def test__least_recently_used_entries_are_evicted(self):
+        self.store('a', 'a' * 100, 1000)
+        self.store('b', 'b' * 100, 2000)
+        self.cache.restore('a')
+        self.store('c', 'c' * 100, 3000)
+        self.assertTrue(os.path.exists(self.cache._entry_path('a')))
+        self.assertFalse(os.path.exists(self.cache._entry_path('b')))
+        self.assertTrue(os.path.exists(self.cache._entry_path('c')))
+        stats = self.cache.get_stats()
+        self.assertEqual(2, stats['objects'])
+        self.assertEqual(200, stats['size'])
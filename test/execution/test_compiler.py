@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import subprocess
+import tempfile
+from unittest import TestCase
+
+from test.helpers import *
+
+from projects.execution import compiler
+
+
+class Checksum(TestCase):
+    def test__empty_data(self):
+        self.assertEqual(4294967295, compiler.cksum(b''))
+
+    def test__matches_the_posix_cksum_utility(self):
+        for data in [b'a', b'hello world\n', bytes(bytearray(range(256))) * 300]:
+            process = subprocess.Popen(['cksum'], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            expected = process.communicate(data)[0].decode('utf-8').strip()
+            self.assertEqual(expected, '{} {}'.format(compiler.cksum(data), len(data)))
+
+
+class CommandCompilation(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.projectfile = os.path.join(self.directory, 'Projectfile')
+        with open(self.projectfile, 'w') as f:
+            f.write('from v1.0.0\n')
+        self.output = os.path.join(self.directory, 'output')
+        self.commands = {
+            'build': {
+                'script': [
+                    'cd {}'.format(self.directory),
+                    'echo "build" >> output'
+                ],
+                'dependencies': ['lib']
+            },
+            'lib': {
+                'script': [
+                    'cd {}'.format(self.directory),
+                    'echo "lib it\'s" >> output'
+                ]
+            },
+            'b': {'alias': 'build'}
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_script(self, script):
+        process = subprocess.Popen(['/bin/sh', '-c', script], stderr=subprocess.PIPE)
+        error = process.communicate()[1].decode('utf-8')
+        return process.returncode, error
+
+    def read_output(self):
+        with open(self.output) as f:
+            return f.read()
+
+    def test__steps_run_in_dependency_order(self):
+        script = compiler.compile_command('b', self.commands, [self.projectfile], '1.0.0')
+        exit_code, error = self.run_script(script)
+        self.assertEqual(0, exit_code)
+        self.assertEqual('', error)
+        self.assertEqual('lib it\'s\nbuild\n', self.read_output())
+
+    def test__script_stops_at_first_failure(self):
+        self.commands['lib']['script'].insert(1, 'exit_code=3; (exit $exit_code)')
+        script = compiler.compile_command('build', self.commands, [self.projectfile], '1.0.0')
+        exit_code, error = self.run_script(script)
+        self.assertEqual(3, exit_code)
+        self.assertFalse(os.path.exists(self.output))
+
+    def test__header_records_the_source_signatures(self):
+        script = compiler.compile_command('build', self.commands, [self.projectfile], '1.0.0')
+        self.assertTrue(script.startswith('#!/bin/sh\n'))
+        signature = compiler.get_signature(self.projectfile)
+        self.assertIn('#   {} {}\n'.format(signature, self.projectfile), script)
+
+    def test__stale_script_warns(self):
+        script = compiler.compile_command('build', self.commands, [self.projectfile], '1.0.0')
+        with open(self.projectfile, 'a') as f:
+            f.write('\n')
+        exit_code, error = self.run_script(script)
+        self.assertEqual(0, exit_code)
+        self.assertIn('{} has changed, this script is stale'.format(self.projectfile), error)
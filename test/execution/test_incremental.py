@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+
+from test.helpers import *
+
+from projects.execution import incremental
+
+
+class IncrementalExecution(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, 'src')
+        os.mkdir(self.source)
+        self.write('src/a.c', 'a', mtime=500)
+        self.write('src/b.c', 'b', mtime=500)
+        self.command = {
+            'script': ['cd {}'.format(self.directory), 'make'],
+            'inputs': [os.path.join(self.directory, 'src', '*.c')],
+            'outputs': [os.path.join(self.directory, 'app')]
+        }
+        self.state = {}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content, mtime=None):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def build(self, mtime=2000):
+        self.write('app', 'built', mtime)
+        incremental.record_run('build', self.command, self.state)
+
+    def test__command_without_paths_always_runs(self):
+        command = {'script': ['make']}
+        incremental.record_run('build', command, self.state)
+        self.assertFalse(incremental.is_up_to_date('build', command, self.state))
+        self.assertEqual({}, self.state)
+
+    def test__command_runs_without_previous_run(self):
+        self.write('app', 'built')
+        self.assertFalse(incremental.is_up_to_date('build', self.command, self.state))
+
+    def test__command_is_skipped_after_successful_run(self):
+        self.build()
+        self.assertTrue(incremental.is_up_to_date('build', self.command, self.state))
+
+    def test__missing_output_runs_the_command(self):
+        self.build()
+        os.remove(os.path.join(self.directory, 'app'))
+        self.assertFalse(incremental.is_up_to_date('build', self.command, self.state))
+
+    def test__changed_script_runs_the_command(self):
+        self.build()
+        self.command['script'] = ['cd {}'.format(self.directory), 'make all']
+        self.assertFalse(incremental.is_up_to_date('build', self.command, self.state))
+
+    def test__changed_input_runs_the_command(self):
+        self.build(mtime=1000)
+        self.write('src/a.c', 'changed', mtime=3000)
+        self.assertFalse(incremental.is_up_to_date('build', self.command, self.state))
+
+    def test__new_input_runs_the_command(self):
+        self.build(mtime=1000)
+        self.write('src/c.c', 'c', mtime=3000)
+        self.assertFalse(incremental.is_up_to_date('build', self.command, self.state))
+
+    def test__touched_input_with_same_content_is_skipped(self):
+        self.build(mtime=1000)
+        self.write('src/a.c', 'a', mtime=3000)
+        self.assertTrue(incremental.is_up_to_date('build', self.command, self.state))
+
+    def test__outputs_newer_than_inputs_are_up_to_date(self):
+        self.build(mtime=3000)
+        self.write('src/a.c', 'changed', mtime=1000)
+        self.assertTrue(incremental.is_up_to_date('build', self.command, self.state))
+
+    def test__shared_inputs_are_hashed_once(self):
+        self.build(mtime=1000)
+        self.write('src/a.c', 'changed', mtime=3000)
+        with mock.patch.object(incremental, 'get_input_hash', wraps=incremental.get_input_hash) as get_input_hash:
+            inputs = incremental.CommandInputs(self.command)
+            self.assertFalse(incremental.is_up_to_date('build', self.command, self.state, inputs))
+            inputs.get_hash()
+            incremental.record_run('build', self.command, self.state, inputs)
+        get_input_hash.assert_called_once_with(inputs.files)
+        self.assertTrue(incremental.is_up_to_date('build', self.command, self.state))
+
+    def test__directory_inputs_include_the_files_inside(self):
+        self.command['inputs'] = [self.source]
+        expected = [os.path.join(self.source, name) for name in ['a.c', 'b.c']]
+        self.assertEqual(expected, incremental.get_input_files(self.command))
+
+
+class StateFile(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test__state_round_trip(self):
+        state_dir = os.path.join(self.directory, 'state')
+        state = {'build': {'script': 'abc', 'inputs': 'def'}}
+        incremental.store_state(state_dir, '/project', state)
+        self.assertEqual(state, incremental.load_state(state_dir, '/project'))
+        self.assertEqual({}, incremental.load_state(state_dir, '/other_project'))
+
+    def test__invalid_state_file_is_ignored(self):
+        path = incremental._get_state_file(self.directory, '/project')
+        with open(path, 'w') as f:
+            f.write('{invalid')
+        self.assertEqual({}, incremental.load_state(self.directory, '/project'))
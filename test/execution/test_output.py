@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+
+from test.helpers import *
+
+from projects.execution import output
+
+
+class StdoutBuffer(TestCase):
+    @mock.patch('sys.stdout')
+    def test__binary_buffer_is_returned_after_flushing_the_text_output(self, mock_stdout):
+        self.assertIs(mock_stdout.buffer, output.get_stdout_buffer())
+        mock_stdout.flush.assert_called_once_with()
+
+    @mock.patch('sys.stdout', spec=['write', 'flush'])
+    def test__stream_without_buffer_is_returned_as_is(self, mock_stdout):
+        self.assertIs(mock_stdout, output.get_stdout_buffer())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+from test.helpers import *
+
+from projects import execution
+from projects.projectfile import error
+
+
+class DependencyPlanning(TestCase):
+    def test__command_without_dependencies(self):
+        commands = {
+            'a': {'script': ['x']}
+        }
+        self.assertEqual(['a'], execution.plan_commands(['a'], commands))
+
+    def test__dependencies_run_before_the_command_in_defined_order(self):
+        commands = {
+            'a': {'script': ['x'], 'dependencies': ['c', 'b']},
+            'b': {'script': ['x']},
+            'c': {'script': ['x']}
+        }
+        self.assertEqual(['c', 'b', 'a'], execution.plan_commands(['a'], commands))
+
+    def test__diamond_dependency_runs_only_once(self):
+        commands = {
+            'app': {'script': ['x'], 'dependencies': ['left', 'right']},
+            'left': {'script': ['x'], 'dependencies': ['lib']},
+            'right': {'script': ['x'], 'dependencies': ['lib']},
+            'lib': {'script': ['x']}
+        }
+        self.assertEqual(['lib', 'left', 'right', 'app'], execution.plan_commands(['app'], commands))
+
+    def test__alternatives_are_resolved(self):
+        commands = {
+            'a': {'script': ['x'], 'dependencies': ['bb', 'b']},
+            'b': {'script': ['x'], 'alternatives': ['bb']},
+            'bb': {'alias': 'b'}
+        }
+        self.assertEqual(['b', 'a'], execution.plan_commands(['a'], commands))
+
+    def test__requested_alternative_is_resolved(self):
+        commands = {
+            'b': {'script': ['x'], 'alternatives': ['bb']},
+            'bb': {'alias': 'b'}
+        }
+        self.assertEqual(['b'], execution.plan_commands(['bb', 'b'], commands))
+
+    def test__multiple_commands_share_one_plan(self):
+        commands = {
+            'test': {'script': ['x'], 'dependencies': ['build']},
+            'deploy': {'script': ['x'], 'dependencies': ['build']},
+            'build': {'script': ['x']}
+        }
+        self.assertEqual(['build', 'test', 'deploy'], execution.plan_commands(['test', 'deploy'], commands))
+
+    def test__dependency_cycle_is_reported(self):
+        commands = {
+            'a': {'script': ['x'], 'dependencies': ['b']},
+            'b': {'script': ['x'], 'dependencies': ['c']},
+            'c': {'script': ['x'], 'dependencies': ['a']}
+        }
+        with self.assertRaises(Exception) as cm:
+            execution.plan_commands(['a'], commands)
+        assert_exception(self, cm, error.ProjectfileError,
+                         {'error': error.PROJECTFILE_DEPENDENCY_CYCLE.format('a -> b -> c -> a')})
+
+    def test__self_dependency_is_reported(self):
+        commands = {
+            'a': {'script': ['x'], 'dependencies': ['a']}
+        }
+        with self.assertRaises(Exception) as cm:
+            execution.plan_commands(['a'], commands)
+        assert_exception(self, cm, error.ProjectfileError,
+                         {'error': error.PROJECTFILE_DEPENDENCY_CYCLE.format('a -> a')})
+
+
+class DependencyListing(TestCase):
+    def test__dependencies_are_resolved(self):
+        commands = {
+            'a': {'alias': 'b'},
+            'b': {'script': ['x'], 'dependencies': ['cc']},
+            'c': {'script': ['x']},
+            'cc': {'alias': 'c'}
+        }
+        self.assertEqual(['c'], execution.get_dependencies('a', commands))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+
+from test.helpers import *
+
+from projects import timing
+from projects.execution import runner
+
+
+class ScriptRunning(TestCase):
+    def setUp(self):
+        self.session = mock.MagicMock()
+        self.session.run.return_value = 0
+        self.session.closed = False
+
+    def test__lines_are_run_as_separate_steps(self):
+        runner.run_script(self.session, ['make', 'make install'])
+        self.assertEqual([mock.call('make'), mock.call('make install')], self.session.run.mock_calls)
+
+    def test__lines_are_not_split_on_and_operators(self):
+        runner.run_script(self.session, ['grep "a && b" file && make'])
+        self.session.run.assert_called_once_with('grep "a && b" file && make')
+
+    def test__empty_lines_are_skipped(self):
+        runner.run_script(self.session, ['', '   ', 'make'])
+        self.session.run.assert_called_once_with('make')
+
+    def test__script_stops_at_first_failing_step(self):
+        self.session.run.side_effect = [0, 2, 0]
+        exit_code = runner.run_script(self.session, ['a', 'b', 'c'])
+        self.assertEqual(2, exit_code)
+        self.assertEqual([mock.call('a'), mock.call('b')], self.session.run.mock_calls)
+
+    def test__successful_script_returns_zero(self):
+        self.assertEqual(0, runner.run_script(self.session, ['a', 'b']))
+
+    @mock.patch('sys.stderr')
+    def test__script_stops_when_a_step_exits_the_shell(self, mock_stderr):
+        def run(step):
+            self.session.closed = step == 'exit 0'
+            return 0
+        self.session.run.side_effect = run
+        exit_code = runner.run_script(self.session, ['a', 'exit 0', 'b'])
+        self.assertEqual(0, exit_code)
+        self.assertEqual([mock.call('a'), mock.call('exit 0')], self.session.run.mock_calls)
+        mock_stderr.write.assert_called_once_with(runner.SHELL_EXIT_MARKER)
+
+
+class StepTiming(TestCase):
+    def setUp(self):
+        self.session = mock.MagicMock()
+        self.session.run.return_value = 0
+        self.session.closed = False
+        timing.enable()
+
+    def tearDown(self):
+        timing.disable()
+
+    def test__steps_are_recorded_with_their_directory(self):
+        runner.run_script(self.session, ['cd /project', 'make'])
+        spans = timing.get_spans()
+        self.assertEqual(['cd /project', 'make'], [s.name for s in spans])
+        self.assertEqual({'directory': '/project', 'exit_code': 0}, spans[1].args)
+
+
+class StepMarkers(TestCase):
+    def setUp(self):
+        self.session = mock.MagicMock()
+        self.session.run.return_value = 0
+        self.session.closed = False
+
+    def test__command_marker(self):
+        runner.run_step(self.session, 'make')
+        self.session.write.assert_called_once_with(runner.COMMAND_MARKER.format('make'))
+
+    def test__directory_marker(self):
+        runner.run_step(self.session, 'cd /some/path')
+        self.session.write.assert_called_once_with(runner.DIRECTORY_MARKER.format('/some/path'))
+
+    def test__echo_output_is_highlighted(self):
+        runner.run_step(self.session, 'echo hello')
+        self.assertEqual([
+            mock.call(runner.ECHO_MARKER),
+            mock.call(runner.ECHO_MARKER_END)
+        ], self.session.write.mock_calls)
+
+    def test__commands_starting_like_builtins_are_not_mistaken(self):
+        runner.run_step(self.session, 'cdrecord image.iso')
+        runner.run_step(self.session, 'echoserver')
+        self.assertEqual([
+            mock.call(runner.COMMAND_MARKER.format('cdrecord image.iso')),
+            mock.call(runner.COMMAND_MARKER.format('echoserver'))
+        ], self.session.write.mock_calls)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+from unittest import TestCase
+
+from test.helpers import *
+
+from projects import execution
+
+
+class SerialExecution(TestCase):
+    def setUp(self):
+        self.commands = {
+            'release': {'script': ['x'], 'dependencies': ['lint', 'unit', 'docs']},
+            'lint': {'script': ['x']},
+            'unit': {'script': ['x']},
+            'docs': {'script': ['x']}
+        }
+        self.plan = execution.plan_commands(['release'], self.commands)
+
+    def test__commands_run_in_plan_order(self):
+        executed = []
+
+        def run(command_name):
+            executed.append(command_name)
+            return 0
+        summary = execution.run_plan(self.plan, self.commands, run)
+        self.assertEqual(['lint', 'unit', 'docs', 'release'], executed)
+        self.assertEqual({
+            'succeeded': ['lint', 'unit', 'docs', 'release'],
+            'failed': [],
+            'skipped': []
+        }, summary)
+
+    def test__execution_stops_at_first_failure(self):
+        executed = []
+
+        def run(command_name):
+            executed.append(command_name)
+            return 1 if command_name == 'unit' else 0
+        summary = execution.run_plan(self.plan, self.commands, run)
+        self.assertEqual(['lint', 'unit'], executed)
+        self.assertEqual({
+            'succeeded': ['lint'],
+            'failed': ['unit'],
+            'skipped': ['docs', 'release']
+        }, summary)
+
+    def test__exception_is_propagated(self):
+        def run(command_name):
+            raise OSError('boom')
+        with self.assertRaises(OSError):
+            execution.run_plan(self.plan, self.commands, run)
+
+
+class ParallelExecution(TestCase):
+    def setUp(self):
+        self.commands = {
+            'release': {'script': ['x'], 'dependencies': ['lint', 'unit', 'docs']},
+            'lint': {'script': ['x']},
+            'unit': {'script': ['x']},
+            'docs': {'script': ['x']}
+        }
+        self.plan = execution.plan_commands(['release'], self.commands)
+
+    def test__independent_dependencies_run_at_the_same_time(self):
+        barrier = threading.Event()
+        started = []
+        lock = threading.Lock()
+
+        def run(command_name):
+            if command_name == 'release':
+                return 0
+            with lock:
+                started.append(command_name)
+                if len(started) == 3:
+                    barrier.set()
+            return 0 if barrier.wait(5) else 1
+        summary = execution.run_plan(self.plan, self.commands, run, jobs=3)
+        self.assertEqual(['lint', 'unit', 'docs', 'release'], summary['succeeded'])
+
+    def test__job_limit_is_respected(self):
+        state = {'running': 0, 'max': 0}
+        lock = threading.Lock()
+
+        def run(command_name):
+            with lock:
+                state['running'] += 1
+                state['max'] = max(state['max'], state['running'])
+            threading.Event().wait(0.01)
+            with lock:
+                state['running'] -= 1
+            return 0
+        execution.run_plan(self.plan, self.commands, run, jobs=2)
+        self.assertEqual(2, state['max'])
+
+    def test__workers_are_named_after_their_job_slot(self):
+        threads = []
+        lock = threading.Lock()
+
+        def run(command_name):
+            with lock:
+                threads.append(threading.current_thread().name)
+            return 0
+        execution.run_plan(self.plan, self.commands, run, jobs=2)
+        self.assertEqual(4, len(threads))
+        self.assertTrue(set(threads) <= set(['worker-1', 'worker-2']))
+
+    def test__command_waits_for_its_dependencies(self):
+        finished = []
+
+        def run(command_name):
+            if command_name == 'release':
+                self.assertEqual(['docs', 'lint', 'unit'], sorted(finished))
+            finished.append(command_name)
+            return 0
+        execution.run_plan(self.plan, self.commands, run, jobs=4)
+        self.assertEqual('release', finished[-1])
+
+    def test__failure_skips_dependent_commands(self):
+        def run(command_name):
+            return 2 if command_name == 'lint' else 0
+        summary = execution.run_plan(self.plan, self.commands, run, jobs=1)
+        self.assertEqual(['lint'], summary['failed'])
+        self.assertEqual(['unit', 'docs', 'release'], summary['skipped'])
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import tempfile
+from unittest import TestCase
+
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+
+from test.helpers import *
+
+from projects.execution import runner
+from projects.execution import shell
+
+
+class CapturedOutput(object):
+    """Points the standard output and error file descriptors, that the shells
+    inherit, and the marker stream into a temporary file.
+    """
+
+    def capture(self):
+        self.output = tempfile.TemporaryFile()
+        self.saved_fds = [os.dup(1), os.dup(2)]
+        os.dup2(self.output.fileno(), 1)
+        os.dup2(self.output.fileno(), 2)
+        self.stdout_buffer = mock.patch.object(shell, 'get_stdout_buffer',
+                                               return_value=io.open(1, 'wb', 0, closefd=False))
+        self.stdout_buffer.start()
+
+    def release(self):
+        self.stdout_buffer.stop()
+        for fd, target in zip(self.saved_fds, [1, 2]):
+            os.dup2(fd, target)
+            os.close(fd)
+        self.output.close()
+
+    def get_output(self):
+        self.output.seek(0)
+        return self.output.read()
+
+
+class ShellSessionSteps(CapturedOutput, TestCase):
+    def setUp(self):
+        self.capture()
+        self.session = shell.ShellSession()
+
+    def tearDown(self):
+        self.session.close()
+        self.release()
+
+    def test__step_exit_codes_are_reported(self):
+        self.assertEqual(0, self.session.run('true'))
+        self.assertEqual(3, self.session.run('(exit 3)'))
+        self.assertEqual(0, self.session.run('true'))
+
+    def test__steps_are_evaluated_as_written(self):
+        self.session.run('echo "a && b" \'$HOME\'')
+        self.session.close()
+        self.assertEqual(b'a && b $HOME\n', self.get_output())
+
+    def test__shell_state_persists_between_steps(self):
+        directory = os.path.realpath(tempfile.gettempdir())
+        self.session.run('export P_TEST_VARIABLE=42')
+        self.session.run('cd {}'.format(directory))
+        self.session.run('echo "$P_TEST_VARIABLE $(pwd)"')
+        self.session.close()
+        self.assertEqual('42 {}\n'.format(directory).encode('utf-8'), self.get_output())
+
+    def test__markers_and_output_keep_their_order(self):
+        for i in range(20):
+            self.session.write('[{}]'.format(i))
+            self.session.run('echo {}'.format(i))
+        self.session.close()
+        expected = ''.join('[{0}]{0}\n'.format(i) for i in range(20))
+        self.assertEqual(expected.encode('utf-8'), self.get_output())
+
+    def test__control_channels_are_closed_for_the_steps(self):
+        self.assertEqual(0, self.session.run('! { true >&4; } 2>/dev/null'))
+
+    def test__exiting_shell_reports_its_exit_code(self):
+        self.assertEqual(5, self.session.run('exit 5'))
+        self.assertTrue(self.session.closed)
+
+    def test__closed_session_refuses_to_run_steps(self):
+        self.assertEqual(0, self.session.run('exit 0'))
+        self.assertTrue(self.session.closed)
+        with self.assertRaises(ValueError):
+            self.session.run('echo b')
+
+
+class SessionPoolHandling(CapturedOutput, TestCase):
+    def setUp(self):
+        self.capture()
+        self.pool = shell.SessionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.release()
+
+    def test__idle_session_is_reused(self):
+        with self.pool.session() as first:
+            first.run('export P_TEST_VARIABLE=1')
+        with self.pool.session() as second:
+            self.assertIs(first, second)
+            self.assertEqual(0, second.run('test "$P_TEST_VARIABLE" = 1'))
+
+    def test__concurrent_users_get_separate_sessions(self):
+        with self.pool.session() as first:
+            with self.pool.session() as second:
+                self.assertIsNot(first, second)
+
+    def test__exited_session_is_not_reused(self):
+        with self.pool.session() as first:
+            first.run('exit 1')
+        with self.pool.session() as second:
+            self.assertIsNot(first, second)
+            self.assertEqual(0, second.run('true'))
+
+    def test__session_exited_successfully_is_replaced(self):
+        with self.pool.session() as first:
+            self.assertEqual(0, runner.run_script(first, ['echo a', 'exit 0', 'echo b']))
+        with self.pool.session() as second:
+            self.assertIsNot(first, second)
+            self.assertEqual(0, runner.run_script(second, ['echo c']))
+        self.pool.close()
+        self.assertIn(b'a\n', self.get_output())
+        self.assertNotIn(b'b\n', self.get_output())
+        self.assertIn(b'c\n', self.get_output())
+
+    def test__close_stops_every_session(self):
+        with self.pool.session() as first:
+            pass
+        self.pool.close()
+        self.assertTrue(first.closed)
+        self.assertEqual(0, first.process.returncode)
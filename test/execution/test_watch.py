@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+
+from test.helpers import *
+
+from projects.execution import watch
+from projects.projectfile import index
+
+
+class ScriptedIndex(object):
+    """Index that reports the scripted changes once their condition is met."""
+
+    def __init__(self, steps, timeout=10):
+        self.revision = 1
+        self.steps = list(steps)
+        self.deadline = time.time() + timeout
+
+    def update(self, timeout=None):
+        if time.time() > self.deadline:
+            raise AssertionError('Scripted step was not reached: {}'.format(self.steps))
+        condition, action = self.steps[0]
+        if not condition():
+            time.sleep(0.01)
+            return []
+        self.steps.pop(0)
+        return action(self)
+
+
+def change(index):
+    return [('/project/src/main.c', False)]
+
+
+def output_change(index):
+    return [('/project/build/app', False)]
+
+
+def other_change(index):
+    return [('/project/notes.txt', False)]
+
+
+def projectfile_change(index):
+    index.revision += 1
+    return [('Projectfile', False)]
+
+
+def interrupt(index):
+    raise KeyboardInterrupt()
+
+
+def always():
+    return True
+
+
+def after(seconds):
+    deadline = time.time() + seconds
+    return lambda: time.time() > deadline
+
+
+class WatchMode(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, 'output')
+        self.compile_script = mock.Mock(return_value=self.compiled('echo run >> {}\n'.format(self.output)))
+        self.stderr = mock.patch('sys.stderr')
+        self.stderr.start()
+
+    def tearDown(self):
+        self.stderr.stop()
+        shutil.rmtree(self.directory)
+
+    def compiled(self, script):
+        return {'script': script, 'outputs': ['/project/build/*']}
+
+    def get_runs(self):
+        if not os.path.isfile(self.output):
+            return []
+        with open(self.output) as f:
+            return f.read().split()
+
+    def runs(self, count, settle=0):
+        reached = []
+
+        def condition():
+            if len(self.get_runs()) != count:
+                return False
+            if not reached:
+                reached.append(time.time())
+            return time.time() - reached[0] >= settle
+        return condition
+
+    def watch(self, steps):
+        with self.assertRaises(KeyboardInterrupt):
+            watch.watch_command(ScriptedIndex(steps), self.compile_script, debounce=0)
+
+    def test__command_runs_again_after_changes_without_compiling_again(self):
+        self.watch([
+            (self.runs(1), change),
+            (self.runs(2), interrupt)
+        ])
+        self.assertEqual(['run', 'run'], self.get_runs())
+        self.compile_script.assert_called_once_with()
+
+    def test__projectfile_change_compiles_the_script_again(self):
+        self.watch([
+            (self.runs(1), projectfile_change),
+            (self.runs(2), interrupt)
+        ])
+        self.assertEqual(2, self.compile_script.call_count)
+
+    def test__changes_are_coalesced(self):
+        self.watch([
+            (self.runs(1), change),
+            (always, change),
+            (always, change),
+            (self.runs(2), change),
+            (self.runs(3), interrupt)
+        ])
+        self.assertEqual(['run', 'run', 'run'], self.get_runs())
+
+    def test__running_command_is_stopped_on_changes_and_on_interrupt(self):
+        self.compile_script.return_value = self.compiled('echo started >> {0}; sleep 10; echo finished >> {0}\n'.format(self.output))
+        start = time.time()
+        self.watch([
+            (self.runs(1), change),
+            (self.runs(2), interrupt)
+        ])
+        time.sleep(0.1)
+        self.assertEqual(['started', 'started'], self.get_runs())
+        self.assertLess(time.time() - start, 5)
+
+    def test__command_is_not_run_until_it_can_be_compiled(self):
+        script = self.compile_script.return_value
+        self.compile_script.return_value = None
+        self.watch([
+            (always, change),
+            (always, lambda index: self.compile_script.configure_mock(return_value=script) or projectfile_change(index)),
+            (self.runs(1), interrupt)
+        ])
+        self.assertEqual(['run'], self.get_runs())
+        self.assertEqual(2, self.compile_script.call_count)
+
+    def test__declared_outputs_do_not_trigger_a_run(self):
+        self.watch([
+            (self.runs(1), output_change),
+            (after(0.3), interrupt)
+        ])
+        self.assertEqual(['run'], self.get_runs())
+
+    def test__changes_outside_the_declared_outputs_are_not_lost_during_a_run(self):
+        self.compile_script.return_value = self.compiled('echo started >> {0}; sleep 0.3; echo finished >> {0}\n'.format(self.output))
+        self.watch([
+            (self.runs(1), output_change),
+            (always, other_change),
+            (self.runs(3), interrupt)
+        ])
+        self.assertEqual(['started', 'started', 'finished'], self.get_runs())
+
+
+class WatchModeInProject(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.root, 'Projectfile'), 'w') as f:
+            f.write('from v1.0.0\n\nbuild:\n    echo built\n')
+        self.output = os.path.join(self.root, 'out.txt')
+        self.stderr = mock.patch('sys.stderr')
+        self.stderr.start()
+
+    def tearDown(self):
+        self.stderr.stop()
+        shutil.rmtree(self.root)
+
+    def test__command_writing_its_declared_outputs_does_not_trigger_itself(self):
+        script = 'echo built >> {}; sleep 0.3\n'.format(self.output)
+        compiled = {'script': script, 'outputs': [self.output]}
+        with index.ProjectIndex(self.root) as project_index:
+            deadline = time.time() + 2
+            update = project_index.update
+
+            def update_until_deadline(timeout=None):
+                if time.time() > deadline:
+                    raise KeyboardInterrupt()
+                return update(min(0.1, timeout) if timeout is not None else 0.1)
+
+            project_index.update = update_until_deadline
+            with self.assertRaises(KeyboardInterrupt):
+                watch.watch_command(project_index, lambda: compiled, debounce=0)
+        with open(self.output) as f:
+            self.assertEqual(['built'], f.read().split())
@@ -3,6 +3,11 @@
 
 from unittest import TestCase
 
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+
 from projects.gui import project_selector
 
 
@@ -110,3 +115,47 @@ class ProjectSelectorBaseCases(TestCase):
         selector.remove_key()
         self.assertEqual('', selector.keys)
 
+
+
+class IncrementalFiltering(TestCase):
+    def setUp(self):
+        self.data = [
+            'two',
+            'one',
+            'three',
+            'ten',
+            'four'
+        ]
+        self.selector = project_selector.ProjectSelector(self.data, '', '', '')
+
+    def test__result_is_the_same_as_filtering_everything(self):
+        self.assertEqual(project_selector._filter_data('', self.data), self.selector.last_selection_result)
+        for keys in ['t', 'te', 'tee']:
+            self.selector.add_key(keys[-1])
+            self.assertEqual(project_selector._filter_data(keys, self.data), self.selector.last_selection_result)
+
+    def test__only_the_previous_matches_are_filtered(self):
+        self.selector.add_key('t')
+        with mock.patch.object(project_selector, '_generate_data_structure_for_search_string',
+                               wraps=project_selector._generate_data_structure_for_search_string) as mock_generate:
+            self.selector.add_key('e')
+        mock_generate.assert_called_once_with(mock.ANY, ['two', 'three', 'ten'])
+
+    def test__removing_key_restores_the_previous_result_without_filtering(self):
+        self.selector.add_key('t')
+        expected = self.selector.last_selection_result
+        self.selector.add_key('e')
+        self.selector.down()
+        with mock.patch.object(project_selector, '_filter_candidates') as mock_filter:
+            self.selector.remove_key()
+        self.assertFalse(mock_filter.called)
+        self.assertEqual('t', self.selector.keys)
+        self.assertEqual(expected, self.selector.last_selection_result)
+        self.assertEqual(0, self.selector.focus)
+
+    def test__rejected_key_is_not_pushed(self):
+        self.selector.add_key('t')
+        self.selector.add_key('x')
+        self.selector.remove_key()
+        self.assertEqual('', self.selector.keys)
+        self.assertEqual(project_selector._filter_data('', self.data), self.selector.last_selection_result)
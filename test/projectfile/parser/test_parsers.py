@@ -8,6 +8,63 @@ from projects.projectfile.parser import parse
 from test.helpers import *
 
 
+class Tokenizer(TestCase):
+    def test__empty_line(self):
+        result = parse.tokenize('')
+        self.assertEqual(parse.Token(parse.EMPTY, '', None), result)
+
+    def test__whitespace_and_comment_only_line_is_empty(self):
+        line = '    # some comment'
+        result = parse.tokenize(line)
+        self.assertEqual(parse.Token(parse.EMPTY, line, None), result)
+
+    def test__comment_delimiter(self):
+        line = '  """  # comment'
+        result = parse.tokenize(line)
+        self.assertEqual(parse.Token(parse.COMMENT_DELIMITER, line, None), result)
+
+    def test__command_divisor(self):
+        line = '  ===  # comment'
+        result = parse.tokenize(line)
+        self.assertEqual(parse.Token(parse.COMMAND_DIVISOR, line, None), result)
+
+    def test__indented_line_value_is_stripped_without_comment(self):
+        line = '    echo "hello"   # comment'
+        result = parse.tokenize(line)
+        self.assertEqual(parse.Token(parse.INDENTED, line, 'echo "hello"'), result)
+
+    def test__unindented_line_is_text(self):
+        line = 'command|c: [dep]'
+        result = parse.tokenize(line)
+        self.assertEqual(parse.Token(parse.TEXT, line, None), result)
+
+    def test__tokens_agree_with_the_line_parsers(self):
+        lines = [
+            '',
+            '   ',
+            '# comment',
+            '"""',
+            '  """ # comment',
+            '  """ text',
+            '===',
+            '\t=== # comment',
+            '  echo "hello"',
+            '  a = 42',
+            'a = 42',
+            'from v1.2.3',
+            'command:'
+        ]
+        for line in lines:
+            token = parse.tokenize(line)
+            self.assertEqual(parse.empty_line(line), token.kind == parse.EMPTY)
+            if token.kind != parse.EMPTY:
+                self.assertEqual(parse.comment_delimiter(line), token.kind == parse.COMMENT_DELIMITER)
+            if token.kind not in (parse.EMPTY, parse.COMMENT_DELIMITER):
+                self.assertEqual(parse.command_divisor(line), token.kind == parse.COMMAND_DIVISOR)
+            if token.kind not in (parse.EMPTY, parse.COMMENT_DELIMITER, parse.COMMAND_DIVISOR):
+                self.assertEqual(parse.indented_line(line), token.value)
+
+
 class VersionParser(TestCase):
     def test__valid_version_can_be_parsed_1(self):
         line = 'from v1.2.3'
@@ -978,4 +1035,55 @@ class CommandHeaderParser(TestCase):
         line = 'pommand|p:'
         with self.assertRaises(Exception) as cm:
             parse.command_header(line)
-        assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_PROHIBITED_COMMAND.format('p'))
\ No newline at end of file
+        assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_PROHIBITED_COMMAND.format('p'))
+
+
+class CommandHeaderInputOutputParser(TestCase):
+    def test__inputs_and_outputs(self):
+        line = 'build|b: [lib] src/*.c, include -> build/app, build/app.map  # comment'
+        result = parse.command_header(line)
+        self.assertEqual(['src/*.c', 'include'], result['build']['inputs'])
+        self.assertEqual(['build/app', 'build/app.map'], result['build']['outputs'])
+        self.assertEqual(['lib'], result['build']['dependencies'])
+
+    def test__inputs_and_outputs_without_dependencies(self):
+        line = 'build: src -> app'
+        expected = {
+            'build': {
+                'inputs': ['src'],
+                'outputs': ['app'],
+                'done': False
+            }
+        }
+        result = parse.command_header(line)
+        self.assertEqual(expected, result)
+
+    def test__only_outputs(self):
+        line = 'build: -> app'
+        result = parse.command_header(line)
+        self.assertNotIn('inputs', result['build'])
+        self.assertEqual(['app'], result['build']['outputs'])
+
+    def test__only_inputs(self):
+        line = 'check: src ->'
+        result = parse.command_header(line)
+        self.assertEqual(['src'], result['check']['inputs'])
+        self.assertNotIn('outputs', result['check'])
+
+    def test__header_without_paths_is_unchanged(self):
+        line = 'build: [lib]'
+        result = parse.command_header(line)
+        self.assertNotIn('inputs', result['build'])
+        self.assertNotIn('outputs', result['build'])
+
+    def test__invalid_path_list__raises_exception(self):
+        line = 'build: src, , include -> app'
+        with self.assertRaises(Exception) as cm:
+            parse.command_header(line)
+        assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_INVALID_PATH_LIST)
+
+    def test__paths_without_arrow__raises_exception(self):
+        line = 'build: src app'
+        with self.assertRaises(Exception) as cm:
+            parse.command_header(line)
+        assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_SYNTAX_ERROR)
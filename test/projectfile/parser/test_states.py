@@ -4,6 +4,8 @@
 from unittest import TestCase
 
 from projects.projectfile import error
+from projects.projectfile import utils
+from projects.projectfile.parser import parse
 from projects.projectfile.parser import state
 from test.helpers import *
 
@@ -14,7 +16,7 @@ class StartState(TestCase):
         line = 'from v1.2.3'
         expected = {'min-version': (1, 2, 3)}
         expected_state = state.before_commands
-        next_state = state.start(data, line)
+        next_state = state.start(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -28,11 +30,11 @@ class StartState(TestCase):
         expected_state1 = state.start
         expected_state2 = state.before_commands
 
-        next_state1 = state.start(data, line1)
+        next_state1 = state.start(utils.ParsingContext(data), parse.tokenize(line1))
         self.assertEqual(expected1, data)
         self.assertEqual(expected_state1, next_state1)
 
-        next_state2 = state.start(data, line2)
+        next_state2 = state.start(utils.ParsingContext(data), parse.tokenize(line2))
         self.assertEqual(expected2, data)
         self.assertEqual(expected_state2, next_state2)
 
@@ -40,14 +42,14 @@ class StartState(TestCase):
         data = {}
         line = 'valami'
         with self.assertRaises(Exception) as cm:
-            state.start(data, line)
+            state.start(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.VERSION_MISSING_ERROR)
 
     def test__raise_error_on_invalid_version(self):
         data = {}
         line = 'from v.1'
         with self.assertRaises(Exception) as cm:
-            state.start(data, line)
+            state.start(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.VERSION_FORMAT_ERROR)
 
 
@@ -57,7 +59,7 @@ class BeforeCommandsState(TestCase):
         line = ''
         expected = {}
         expected_state = state.before_commands
-        next_state = state.before_commands(data, line)
+        next_state = state.before_commands(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -66,7 +68,7 @@ class BeforeCommandsState(TestCase):
         line = '"""'
         expected = {}
         expected_state = state.main_comment
-        next_state = state.before_commands(data, line)
+        next_state = state.before_commands(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -75,7 +77,7 @@ class BeforeCommandsState(TestCase):
         line = 'some_variable = 42'
         expected = {'variables': {'some_variable': '42'}}
         expected_state = state.variables
-        next_state = state.before_commands(data, line)
+        next_state = state.before_commands(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -90,7 +92,7 @@ class BeforeCommandsState(TestCase):
             }
         }
         expected_state = state.command
-        next_state = state.before_commands(data, line)
+        next_state = state.before_commands(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -98,21 +100,21 @@ class BeforeCommandsState(TestCase):
         data = {}
         line = '  invalid_variable=4'
         with self.assertRaises(Exception) as cm:
-            state.before_commands(data, line)
+            state.before_commands(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.VARIABLE_INDENTATION_ERROR)
 
     def test__invalid_command_header__raises_error(self):
         data = {}
         line = '  invalid_command|:'
         with self.assertRaises(Exception) as cm:
-            state.before_commands(data, line)
+            state.before_commands(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_INDENTATION_ERROR)
 
     def test__indented_line_raises_error(self):
         data = {}
         line = '  indented line'
         with self.assertRaises(Exception) as cm:
-            state.before_commands(data, line)
+            state.before_commands(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_SYNTAX_ERROR)
 
 
@@ -122,7 +124,7 @@ class MainCommentState(TestCase):
         line = 'This is the first line for the main comment..'
         expected = {'description': line}
         expected_state = state.main_comment
-        next_state = state.main_comment(data, line)
+        next_state = state.main_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -131,7 +133,7 @@ class MainCommentState(TestCase):
         line = 'This should be appended..'
         expected = {'description': 'Some text. This should be appended..'}
         expected_state = state.main_comment
-        next_state = state.main_comment(data, line)
+        next_state = state.main_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -140,7 +142,7 @@ class MainCommentState(TestCase):
         line = '         \t\tThis should be appended..    \t   '
         expected = {'description': 'Some text. This should be appended..'}
         expected_state = state.main_comment
-        next_state = state.main_comment(data, line)
+        next_state = state.main_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -149,7 +151,7 @@ class MainCommentState(TestCase):
         line = ''
         expected = {'description': 'Some text.\n\n'}
         expected_state = state.main_comment
-        next_state = state.main_comment(data, line)
+        next_state = state.main_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -158,7 +160,7 @@ class MainCommentState(TestCase):
         line = ''
         expected = {'description': 'Some text.\n\n'}
         expected_state = state.main_comment
-        next_state = state.main_comment(data, line)
+        next_state = state.main_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -167,7 +169,7 @@ class MainCommentState(TestCase):
         line = 'vmi'
         expected = {'description': 'Some text.\n\nvmi'}
         expected_state = state.main_comment
-        next_state = state.main_comment(data, line)
+        next_state = state.main_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -176,7 +178,7 @@ class MainCommentState(TestCase):
         line = '"""'
         expected = {'description': 'Some text.\n\n'}
         expected_state = state.variables
-        next_state = state.main_comment(data, line)
+        next_state = state.main_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -187,7 +189,7 @@ class VariableState(TestCase):
         line = 'my-variable = 42'
         expected = {'variables': {'my-variable': '42'}}
         expected_state = state.variables
-        next_state = state.variables(data, line)
+        next_state = state.variables(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -201,7 +203,7 @@ class VariableState(TestCase):
             'second-variable': '23'
         }}
         expected_state = state.variables
-        next_state = state.variables(data, line)
+        next_state = state.variables(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -210,7 +212,7 @@ class VariableState(TestCase):
         line = ''
         expected = {}
         expected_state = state.variables
-        next_state = state.variables(data, line)
+        next_state = state.variables(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -218,7 +220,7 @@ class VariableState(TestCase):
         data = {}
         line = 'some-variable = \'23'
         with self.assertRaises(Exception) as cm:
-            state.variables(data, line)
+            state.variables(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.VARIABLE_QUOTE_AFTER_ERROR)
 
     def test__non_variable__raises_invalid_command_header_exception(self):
@@ -228,7 +230,7 @@ class VariableState(TestCase):
         }}
         line = ' non-variable'
         with self.assertRaises(Exception) as cm:
-            state.variables(data, line)
+            state.variables(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_SYNTAX_ERROR)
 
     def test__comment_delimiter__raises_exception(self):
@@ -237,7 +239,7 @@ class VariableState(TestCase):
         }}
         line = '"""'
         with self.assertRaises(Exception) as cm:
-            state.variables(data, line)
+            state.variables(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.COMMENT_DELIMITER_UNEXPECTED_ERROR)
 
     def test__valid_command_header_switches_state(self):
@@ -256,7 +258,7 @@ class VariableState(TestCase):
             }
         }
         expected_state = state.command
-        next_state = state.variables(data, line)
+        next_state = state.variables(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -273,7 +275,7 @@ class CommandState(TestCase):
         line = ''
         expected = dict(data)
         expected_state = state.command
-        next_state = state.command(data, line)
+        next_state = state.command(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -288,7 +290,7 @@ class CommandState(TestCase):
         line = '"""'
         expected = dict(data)
         expected_state = state.command_comment
-        next_state = state.command(data, line)
+        next_state = state.command(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -312,7 +314,7 @@ class CommandState(TestCase):
             }
         }
         expected_state = state.pre
-        next_state = state.command(data, line)
+        next_state = state.command(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -333,7 +335,7 @@ class CommandState(TestCase):
             }
         }
         expected_state = state.post
-        next_state = state.command(data, line)
+        next_state = state.command(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -347,7 +349,7 @@ class CommandState(TestCase):
         }
         line = 'something'
         with self.assertRaises(Exception) as cm:
-            state.command(data, line)
+            state.command(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_UNEXPECTED_UNINDENTED_ERROR)
 
 
@@ -370,7 +372,7 @@ class CommandCommentState(TestCase):
             }
         }
         expected_state = state.command_comment
-        next_state = state.command_comment(data, line)
+        next_state = state.command_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -393,7 +395,7 @@ class CommandCommentState(TestCase):
             }
         }
         expected_state = state.command_comment
-        next_state = state.command_comment(data, line)
+        next_state = state.command_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -416,7 +418,7 @@ class CommandCommentState(TestCase):
             }
         }
         expected_state = state.command_comment
-        next_state = state.command_comment(data, line)
+        next_state = state.command_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -439,7 +441,7 @@ class CommandCommentState(TestCase):
             }
         }
         expected_state = state.command_comment
-        next_state = state.command_comment(data, line)
+        next_state = state.command_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -462,7 +464,7 @@ class CommandCommentState(TestCase):
             }
         }
         expected_state = state.command_comment
-        next_state = state.command_comment(data, line)
+        next_state = state.command_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -485,7 +487,7 @@ class CommandCommentState(TestCase):
             }
         }
         expected_state = state.command_comment
-        next_state = state.command_comment(data, line)
+        next_state = state.command_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -508,7 +510,7 @@ class CommandCommentState(TestCase):
             }
         }
         expected_state = state.pre
-        next_state = state.command_comment(data, line)
+        next_state = state.command_comment(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -525,7 +527,7 @@ class PreState(TestCase):
         line = ''
         expected = dict(data)
         expected_state = state.pre
-        next_state = state.pre(data, line)
+        next_state = state.pre(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -547,7 +549,7 @@ class PreState(TestCase):
             }
         }
         expected_state = state.pre
-        next_state = state.pre(data, line)
+        next_state = state.pre(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -562,7 +564,7 @@ class PreState(TestCase):
         }
         line = '  """'
         with self.assertRaises(Exception) as cm:
-            state.post(data, line)
+            state.post(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.COMMENT_DELIMITER_UNEXPECTED_ERROR)
 
     def test__parsed_command_appended_to_the_pre_list(self):
@@ -587,7 +589,7 @@ class PreState(TestCase):
             }
         }
         expected_state = state.pre
-        next_state = state.pre(data, line)
+        next_state = state.pre(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -610,7 +612,7 @@ class PreState(TestCase):
             }
         }
         expected_state = state.post
-        next_state = state.pre(data, line)
+        next_state = state.pre(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -636,7 +638,7 @@ class PreState(TestCase):
             }
         }
         expected_state = state.command
-        next_state = state.pre(data, line)
+        next_state = state.pre(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -651,7 +653,7 @@ class PreState(TestCase):
         }
         line = 'next_command|'
         with self.assertRaises(Exception) as cm:
-            state.pre(data, line)
+            state.pre(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_MISSING_COLON_ERROR)
 
 
@@ -667,7 +669,7 @@ class PostState(TestCase):
         line = ''
         expected = dict(data)
         expected_state = state.post
-        next_state = state.post(data, line)
+        next_state = state.post(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -689,7 +691,7 @@ class PostState(TestCase):
             }
         }
         expected_state = state.post
-        next_state = state.post(data, line)
+        next_state = state.post(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -704,7 +706,7 @@ class PostState(TestCase):
         }
         line = '  """'
         with self.assertRaises(Exception) as cm:
-            state.post(data, line)
+            state.post(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.COMMENT_DELIMITER_UNEXPECTED_ERROR)
 
     def test__parsed_command_appended_to_the_post_list(self):
@@ -729,7 +731,7 @@ class PostState(TestCase):
             }
         }
         expected_state = state.post
-        next_state = state.post(data, line)
+        next_state = state.post(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -744,7 +746,7 @@ class PostState(TestCase):
         }
         line = '==='
         with self.assertRaises(Exception) as cm:
-            state.post(data, line)
+            state.post(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.COMMAND_DELIMITER_UNEXPECTED_ERROR)
 
     def test__valid_command_header_finishes_command(self):
@@ -769,7 +771,7 @@ class PostState(TestCase):
             }
         }
         expected_state = state.command
-        next_state = state.post(data, line)
+        next_state = state.post(utils.ParsingContext(data), parse.tokenize(line))
         self.assertEqual(expected, data)
         self.assertEqual(expected_state, next_state)
 
@@ -784,7 +786,7 @@ class PostState(TestCase):
         }
         line = 'next_command|'
         with self.assertRaises(Exception) as cm:
-            state.post(data, line)
+            state.post(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_MISSING_COLON_ERROR)
 
     def test__redefined_command_in_post__raises_error(self):
@@ -798,7 +800,7 @@ class PostState(TestCase):
         }
         line = 'my_command:'
         with self.assertRaises(Exception) as cm:
-            state.post(data, line)
+            state.post(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError,
                          error.COMMAND_HEADER_REDEFINED_ERROR.format('my_command'))
 
@@ -813,6 +815,6 @@ class PostState(TestCase):
         }
         line = 'my_command:'
         with self.assertRaises(Exception) as cm:
-            state.pre(data, line)
+            state.pre(utils.ParsingContext(data), parse.tokenize(line))
         assert_exception(self, cm, SyntaxError,
                          error.COMMAND_HEADER_REDEFINED_ERROR.format('my_command'))
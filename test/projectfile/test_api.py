@@ -190,7 +190,7 @@ command:
             }
         }
         result = projectfile.get_data_for_root('path/root')
-        mock_walk.assert_called_with('path/root')
+        mock_walk.assert_called_with('path/root', ignored=None)
         self.assertEqual(expected, result)
 
 
@@ -221,8 +221,7 @@ class ErrorCasesAndErrorWrapping(TestCase):
 
 class WalkDataStringforGUI(TestCase):
     @mock.patch.object(projectfile.file_handler, 'get_walk_data')
-    @mock.patch.object(projectfile, 'os')
-    def test__walk_data_can_be_generated(self, mock_os, mock_walk):
+    def test__walk_data_can_be_generated(self, mock_walk):
         dummy_walk_data = [
             [
                 os.path.join('root'),
@@ -246,7 +245,6 @@ class WalkDataStringforGUI(TestCase):
             ]
         ]
         mock_walk.return_value = dummy_walk_data
-        mock_os.path.isfile.return_value = True
         expected = '''\
 [x] .
 [x] A
@@ -255,11 +253,10 @@ class WalkDataStringforGUI(TestCase):
 '''
         result = projectfile.get_walk_order('root')
         self.assertEqual(expected, result)
-        mock_walk.assert_called_with('root')
+        mock_walk.assert_called_with('root', ignored=None)
 
     @mock.patch.object(projectfile.file_handler, 'get_walk_data')
-    @mock.patch.object(projectfile, 'os')
-    def test__walk_data_can_be_generated_not_all_directory_contains_projectfile(self, mock_os, mock_walk):
+    def test__walk_data_can_be_generated_not_all_directory_contains_projectfile(self, mock_walk):
         dummy_walk_data = [
             [
                 os.path.join('root'),
@@ -283,7 +280,6 @@ class WalkDataStringforGUI(TestCase):
             ]
         ]
         mock_walk.return_value = dummy_walk_data
-        mock_os.path.isfile.side_effect = [True, True, False, True]
         expected = '''\
 [x] .
 [x] A
@@ -292,7 +288,37 @@ class WalkDataStringforGUI(TestCase):
 '''
         result = projectfile.get_walk_order('root')
         self.assertEqual(expected, result)
-        mock_walk.assert_called_with('root')
+        mock_walk.assert_called_with('root', ignored=None)
 
 
 
+
+
+class CommandTreeCaching(TestCase):
+    @mock.patch.object(projectfile, 'cache', autospec=True)
+    @mock.patch.object(projectfile.file_handler, 'get_node_list', autospec=True)
+    def test__valid_cached_tree__no_walk_happens(self, mock_nodes, mock_cache):
+        dummy_tree = {'commands': {}}
+        mock_cache.load_tree.return_value = dummy_tree
+        result = projectfile.get_data_for_root('root', ignored=['build'], cache_dir='cache')
+        self.assertEqual(dummy_tree, result)
+        mock_cache.load_tree.assert_called_with('cache', 'root', ['build'])
+        self.assertFalse(mock_nodes.called)
+
+    @mock.patch.object(projectfile, 'cache', autospec=True)
+    @mock.patch.object(projectfile.file_handler, 'get_node_list', autospec=True)
+    def test__invalid_cached_tree__tree_gets_rebuilt_and_stored(self, mock_nodes, mock_cache):
+        mock_cache.load_tree.return_value = None
+        mock_nodes.return_value = [{
+            'path': 'root',
+            'min-version': (1, 0, 0),
+            'commands': {'command': {'pre': ['echo "hello"']}}
+        }]
+        expected = {
+            'min-version': (1, 0, 0),
+            'commands': {'command': {'script': ['cd root', 'echo "hello"']}}
+        }
+        result = projectfile.get_data_for_root('root', cache_dir='cache')
+        self.assertEqual(expected, result)
+        mock_nodes.assert_called_with('root', ignored=None, cache_dir='cache', signatures={}, jobs=1)
+        mock_cache.store_tree.assert_called_with('cache', 'root', None, {}, expected)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from projects.projectfile import cache
+
+
+class CacheRoundTrip(TestCase):
+    def setUp(self):
+        self.cache_dir = os.path.join(tempfile.mkdtemp(), 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.cache_dir))
+
+    def test__missing_cache__returns_empty_dict(self):
+        result = cache.load_nodes(self.cache_dir, '/some/project')
+        self.assertEqual({}, result)
+
+    def test__stored_nodes_can_be_loaded(self):
+        nodes = {
+            '/some/project/Projectfile': ((1, 2, 3), {'min-version': (1, 0, 0), 'commands': {}})
+        }
+        cache.store_nodes(self.cache_dir, '/some/project', nodes)
+        result = cache.load_nodes(self.cache_dir, '/some/project')
+        self.assertEqual(nodes, result)
+
+    def test__project_roots_are_cached_separately(self):
+        nodes = {'/a/Projectfile': ((1, 2, 3), {})}
+        cache.store_nodes(self.cache_dir, '/a', nodes)
+        result = cache.load_nodes(self.cache_dir, '/b')
+        self.assertEqual({}, result)
+
+    def test__corrupted_cache_file__returns_empty_dict(self):
+        cache.store_nodes(self.cache_dir, '/some/project', {})
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), 'wb') as f:
+                f.write(b'garbage')
+        result = cache.load_nodes(self.cache_dir, '/some/project')
+        self.assertEqual({}, result)
+
+    def test__cache_with_other_version__returns_empty_dict(self):
+        nodes = {'/a/Projectfile': ((1, 2, 3), {})}
+        cache.store_nodes(self.cache_dir, '/a', nodes)
+        original = cache.CACHE_VERSION
+        cache.CACHE_VERSION = original + 1
+        try:
+            result = cache.load_nodes(self.cache_dir, '/a')
+        finally:
+            cache.CACHE_VERSION = original
+        self.assertEqual({}, result)
+
+
+class TreeRevalidation(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.projectfile = os.path.join(self.root, 'Projectfile')
+        with open(self.projectfile, 'w') as f:
+            f.write('content')
+        self.tree = {'commands': {'command': {'script': ['cd {}'.format(self.root)]}}}
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        shutil.rmtree(self.cache_dir)
+
+    def _store(self, ignored=None):
+        signatures = {
+            self.root: cache.get_signature(self.root),
+            self.projectfile: cache.get_signature(self.projectfile),
+            os.path.join(self.root, '.projectignore'): None
+        }
+        cache.store_tree(self.cache_dir, self.root, ignored, signatures, self.tree)
+
+    def test__unchanged_files__tree_is_returned(self):
+        self._store()
+        result = cache.load_tree(self.cache_dir, self.root, None)
+        self.assertEqual(self.tree, result)
+
+    def test__edited_projectfile__tree_is_invalidated(self):
+        self._store()
+        with open(self.projectfile, 'w') as f:
+            f.write('other content')
+        result = cache.load_tree(self.cache_dir, self.root, None)
+        self.assertEqual(None, result)
+
+    def test__removed_projectfile__tree_is_invalidated(self):
+        self._store()
+        os.remove(self.projectfile)
+        result = cache.load_tree(self.cache_dir, self.root, None)
+        self.assertEqual(None, result)
+
+    def test__created_ignore_file__tree_is_invalidated(self):
+        self._store()
+        with open(os.path.join(self.root, '.projectignore'), 'w') as f:
+            f.write('build')
+        result = cache.load_tree(self.cache_dir, self.root, None)
+        self.assertEqual(None, result)
+
+    def test__changed_ignore_configuration__tree_is_invalidated(self):
+        self._store(ignored=['build'])
+        result = cache.load_tree(self.cache_dir, self.root, ['vendor'])
+        self.assertEqual(None, result)
+
+
+class Signature(TestCase):
+    def test__signature_changes_with_the_content(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            first = cache.get_signature(path)
+            with open(path, 'w') as f:
+                f.write('changed')
+            second = cache.get_signature(path)
+        finally:
+            os.remove(path)
+        self.assertNotEqual(first, second)
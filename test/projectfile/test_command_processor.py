@@ -1338,6 +1338,70 @@ class DependencyAddition(TestCase):
         self.assertEqual(expected, result['commands']['command_A']['dependencies'])
 
 
+class InputOutputAddition(TestCase):
+    def test__paths_are_relative_to_their_projectfile(self):
+        processing_tree = [
+            {
+                'path': '/root',
+                'min-version': (1, 2, 3),
+                'commands': {
+                    'build': {
+                        'inputs': ['src'],
+                        'outputs': ['out/app'],
+                        'pre': ['make']
+                    }
+                }
+            }
+        ]
+        result = command_processor.generate_command_tree(processing_tree)
+        self.assertEqual(['/root/src'], result['commands']['build']['inputs'])
+        self.assertEqual(['/root/out/app'], result['commands']['build']['outputs'])
+
+    def test__paths_of_nested_projectfiles_are_merged(self):
+        processing_tree = [
+            {
+                'path': '/root',
+                'min-version': (1, 2, 3),
+                'commands': {
+                    'build': {
+                        'inputs': ['src'],
+                        'pre': ['make']
+                    }
+                }
+            },
+            {
+                'path': '/root/lib',
+                'min-version': (1, 2, 3),
+                'commands': {
+                    'build': {
+                        'inputs': ['src', '../src'],
+                        'outputs': ['lib.a'],
+                        'pre': ['make']
+                    }
+                }
+            }
+        ]
+        result = command_processor.generate_command_tree(processing_tree)
+        self.assertEqual(['/root/src', '/root/lib/src'], result['commands']['build']['inputs'])
+        self.assertEqual(['/root/lib/lib.a'], result['commands']['build']['outputs'])
+
+    def test__commands_without_paths_get_none(self):
+        processing_tree = [
+            {
+                'path': '/root',
+                'min-version': (1, 2, 3),
+                'commands': {
+                    'build': {
+                        'pre': ['make']
+                    }
+                }
+            }
+        ]
+        result = command_processor.generate_command_tree(processing_tree)
+        self.assertNotIn('inputs', result['commands']['build'])
+        self.assertNotIn('outputs', result['commands']['build'])
+
+
 class AlternativesAddition(TestCase):
     def test__alternatives_can_be_added(self):
         processing_tree = [
@@ -1940,6 +2004,56 @@ class VariableSubstitution(TestCase):
         result = command_processor.substitute_variables(line, variables)
         self.assertEqual(expected, result)
 
+    def test__longest_variable_name_wins_regardless_of_definition_order(self):
+        line = '$a $ab ${a}b'
+        variables = {
+            'a': {
+                'value': '1'
+            },
+            'ab': {
+                'value': '2'
+            }
+        }
+        expected = '1 2 1b'
+        result = command_processor.substitute_variables(line, variables)
+        self.assertEqual(expected, result)
+
+    def test__short_syntax_falls_back_to_the_longest_defined_prefix(self):
+        line = 'cp $name.txt $name-backup.txt'
+        variables = {
+            'name': {
+                'value': 'report'
+            }
+        }
+        expected = 'cp report.txt report-backup.txt'
+        result = command_processor.substitute_variables(line, variables)
+        self.assertEqual(expected, result)
+
+    def test__unknown_variables_are_left_for_the_shell(self):
+        line = 'echo $HOME ${USER} ${magic:-default} $magic'
+        variables = {
+            'magic': {
+                'value': '42'
+            }
+        }
+        expected = 'echo $HOME ${USER} ${magic:-default} 42'
+        result = command_processor.substitute_variables(line, variables)
+        self.assertEqual(expected, result)
+
+    def test__substituted_values_are_not_substituted_again(self):
+        line = '$a'
+        variables = {
+            'a': {
+                'value': '$b'
+            },
+            'b': {
+                'value': '42'
+            }
+        }
+        expected = '$b'
+        result = command_processor.substitute_variables(line, variables)
+        self.assertEqual(expected, result)
+
     def test__variable_can_be_substituted_to_commands(self):
         data = {
             'variables': {
@@ -2102,3 +2216,108 @@ class VariableSubstitution(TestCase):
         self.assertEqual(expected, data)
 
 
+
+
+class LazyCommandExpansion(TestCase):
+    def _get_tree(self):
+        return {
+            'description': 'Main $a',
+            'variables': {
+                'a': {
+                    'value': '42'
+                }
+            },
+            'commands': {
+                'command': {
+                    'description': 'Command ${a}',
+                    'alternatives': ['c'],
+                    'root': [
+                        {
+                            'path': 'root',
+                            'pre': ['echo $a']
+                        }
+                    ]
+                },
+                'c': {
+                    'alias': 'command'
+                }
+            }
+        }
+
+    def test__descriptions_are_substituted_right_away(self):
+        data = command_processor.defer_commands(self._get_tree())
+        self.assertEqual('Main 42', data['description'])
+        self.assertEqual('Command 42', data['commands']['command']['description'])
+        self.assertEqual({'alias': 'command'}, data['commands']['c'])
+        self.assertFalse('variables' in data)
+
+    @mock.patch.object(command_processor, 'flatten_node', wraps=command_processor.flatten_node)
+    def test__script_is_built_only_when_accessed(self, mock_flatten):
+        data = command_processor.defer_commands(self._get_tree())
+        command = data['commands']['command']
+        self.assertEqual(['c'], command['alternatives'])
+        self.assertTrue('script' in command)
+        self.assertFalse(mock_flatten.called)
+        self.assertEqual(['cd root', 'echo 42'], command['script'])
+        self.assertEqual(['cd root', 'echo 42'], command.get('script'))
+        self.assertEqual(1, mock_flatten.call_count)
+
+    def test__lazy_tree_equals_the_eagerly_processed_tree(self):
+        expected = self._get_tree()
+        command_processor.flatten_commands(expected)
+        command_processor.process_variables(expected)
+        result = command_processor.defer_commands(self._get_tree())
+        self.assertEqual(expected, result)
+
+    def test__missing_key__raises_key_error(self):
+        data = command_processor.defer_commands(self._get_tree())
+        with self.assertRaises(KeyError):
+            data['commands']['command']['dependencies']
+        self.assertEqual(None, data['commands']['command'].get('dependencies'))
+
+
+class IncrementalUpdate(TestCase):
+    def _get_nodes(self, child_commands):
+        return [
+            {
+                'path': 'A',
+                'min-version': (1, 2, 3),
+                'variables': {'a': '42'},
+                'commands': {
+                    'command': {
+                        'alternatives': ['c'],
+                        'pre': ['pre A']
+                    },
+                    'c': {
+                        'alias': 'command'
+                    },
+                    'other': {
+                        'pre': ['other A']
+                    }
+                }
+            },
+            {
+                'path': 'A/B',
+                'min-version': (1, 0, 0),
+                'commands': child_commands
+            }
+        ]
+
+    def test__changed_commands_are_merged_like_a_full_merge(self):
+        tree = command_processor.generate_command_tree(self._get_nodes({'c': {'pre': ['pre B']}}))
+        other = tree['commands']['other']
+        nodes = self._get_nodes({'command': {'post': ['post B']}, 'new': {'pre': ['new B']}})
+        command_processor.update_command_tree(tree, nodes, ['c', 'command', 'new'])
+        self.assertEqual(command_processor.generate_command_tree(nodes), tree)
+        self.assertIs(other, tree['commands']['other'])
+
+    def test__removed_commands_are_removed(self):
+        tree = command_processor.generate_command_tree(self._get_nodes({'new': {'pre': ['new B']}}))
+        nodes = self._get_nodes({})
+        command_processor.update_command_tree(tree, nodes, ['new'])
+        self.assertEqual(command_processor.generate_command_tree(nodes), tree)
+
+    def test__aliased_commands_are_related(self):
+        tree = command_processor.generate_command_tree(self._get_nodes({}))
+        related = command_processor.get_related_commands(tree['commands'], self._get_nodes({}), ['c'])
+        self.assertEqual(set(['c', 'command']), related)
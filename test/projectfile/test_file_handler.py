@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import os
+import shutil
+import tempfile
 from unittest import TestCase
 
 try:
@@ -66,7 +68,7 @@ class ProjectfileWalk(TestCase):
 
         result = file_handler.get_node_list(dummy_path)
 
-        mock_walk.assert_called_with(dummy_path)
+        mock_walk.assert_called_with(dummy_path, ignored=None)
         mock_load.assert_called_with(os.path.join(dummy_walk[0][0], dummy_walk[0][2][0]))
         mock_parser.process_lines.assert_called_with(dummy_file_content)
         self.assertEqual(expected, result)
@@ -271,6 +273,168 @@ class ProjectfileWalk(TestCase):
         self.assertEqual(expected, result)
 
 
+class ParseCaching(TestCase):
+    @mock.patch.object(file_handler, 'walk', autospec=True)
+    @mock.patch.object(file_handler, 'cache', autospec=True)
+    @mock.patch.object(file_handler, '_load', autospec=True)
+    @mock.patch.object(file_handler, 'parser', autospec=True)
+    def test__unchanged_projectfile_is_not_parsed_again(self, mock_parser, mock_load, mock_cache, mock_walk):
+        dummy_path = os.path.abspath('root')
+        projectfile_path = os.path.join(dummy_path, defs.PROJECTFILE)
+        mock_walk.return_value = [(dummy_path, [], [defs.PROJECTFILE])]
+        mock_cache.get_signature.return_value = (1, 2, 3)
+        mock_cache.load_nodes.return_value = {
+            projectfile_path: ((1, 2, 3), {'cached': 'data'})
+        }
+        expected = [{'path': dummy_path, 'cached': 'data'}]
+        result = file_handler.get_node_list(dummy_path, cache_dir='cache')
+        self.assertEqual(expected, result)
+        self.assertFalse(mock_parser.process_lines.called)
+        self.assertFalse(mock_cache.store_nodes.called)
+
+    @mock.patch.object(file_handler, 'walk', autospec=True)
+    @mock.patch.object(file_handler, 'cache', autospec=True)
+    @mock.patch.object(file_handler, '_load', autospec=True)
+    @mock.patch.object(file_handler, 'parser', autospec=True)
+    def test__changed_projectfile_is_parsed_and_cache_gets_updated(self, mock_parser, mock_load, mock_cache, mock_walk):
+        dummy_path = os.path.abspath('root')
+        projectfile_path = os.path.join(dummy_path, defs.PROJECTFILE)
+        mock_walk.return_value = [(dummy_path, [], [defs.PROJECTFILE])]
+        mock_cache.get_signature.return_value = (4, 5, 6)
+        mock_cache.load_nodes.return_value = {
+            projectfile_path: ((1, 2, 3), {'cached': 'data'})
+        }
+        mock_parser.process_lines.return_value = {'fresh': 'data'}
+        expected = [{'path': dummy_path, 'fresh': 'data'}]
+        result = file_handler.get_node_list(dummy_path, cache_dir='cache')
+        self.assertEqual(expected, result)
+        mock_cache.store_nodes.assert_called_with('cache', dummy_path, {
+            projectfile_path: ((4, 5, 6), {'fresh': 'data'})
+        })
+
+    @mock.patch.object(file_handler, 'walk', autospec=True)
+    @mock.patch.object(file_handler, 'cache', autospec=True)
+    @mock.patch.object(file_handler, '_load', autospec=True)
+    @mock.patch.object(file_handler, 'parser', autospec=True)
+    def test__removed_projectfile_is_dropped_from_the_cache(self, mock_parser, mock_load, mock_cache, mock_walk):
+        dummy_path = os.path.abspath('root')
+        projectfile_path = os.path.join(dummy_path, defs.PROJECTFILE)
+        removed_path = os.path.join(dummy_path, 'A', defs.PROJECTFILE)
+        mock_walk.return_value = [(dummy_path, [], [defs.PROJECTFILE])]
+        mock_cache.get_signature.return_value = (1, 2, 3)
+        mock_cache.load_nodes.return_value = {
+            projectfile_path: ((1, 2, 3), {'cached': 'data'}),
+            removed_path: ((1, 2, 3), {'removed': 'data'})
+        }
+        file_handler.get_node_list(dummy_path, cache_dir='cache')
+        mock_cache.store_nodes.assert_called_with('cache', dummy_path, {
+            projectfile_path: ((1, 2, 3), {'cached': 'data'})
+        })
+
+
+class ParallelParsing(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for i, d in enumerate(['', 'A', os.path.join('A', 'B'), 'C', 'D']):
+            os.makedirs(os.path.join(self.root, d, 'other'))
+            with open(os.path.join(self.root, d, defs.PROJECTFILE), 'w') as f:
+                f.write('from v1.0.{}\ncommand:\n  echo "{}"\n'.format(i, d))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test__parallel_result_is_the_same_as_the_serial_one(self):
+        expected = file_handler.get_node_list(self.root)
+        result = file_handler.get_node_list(self.root, jobs=3)
+        self.assertEqual(expected, result)
+
+    def test__first_error_in_walk_order_is_reported(self):
+        for d in ['C', 'D']:
+            with open(os.path.join(self.root, d, defs.PROJECTFILE), 'w') as f:
+                f.write('from v1.0.0\n\ncommand\n')
+        with self.assertRaises(Exception) as serial:
+            file_handler.get_node_list(self.root)
+        with self.assertRaises(Exception) as parallel:
+            file_handler.get_node_list(self.root, jobs=3)
+        assert_exception_type(self, parallel, error.ProjectfileError)
+        self.assertEqual(serial.exception.args[0], parallel.exception.args[0])
+        self.assertEqual(3, parallel.exception.args[0]['line'])
+
+
+class DirectoryPruning(TestCase):
+    @mock.patch.object(file_handler, 'walk', autospec=True)
+    @mock.patch.object(file_handler, '_load_ignore_file', autospec=True)
+    def test__default_ignored_directories_are_pruned_before_descending(self, mock_ignore, mock_walk):
+        dummy_path = 'root'
+        dummy_dirs = ['A', '.git', 'node_modules', '__pycache__', 'B']
+        mock_walk.return_value = [(dummy_path, dummy_dirs, [])]
+        mock_ignore.return_value = []
+        list(file_handler.get_walk_data(dummy_path))
+        self.assertEqual(['A', 'B'], dummy_dirs)
+
+    @mock.patch.object(file_handler, 'walk', autospec=True)
+    @mock.patch.object(file_handler, '_load_ignore_file', autospec=True)
+    def test__configured_patterns_are_pruned(self, mock_ignore, mock_walk):
+        dummy_path = 'root'
+        dummy_dirs = ['build', 'build-debug', 'src']
+        mock_walk.return_value = [(dummy_path, dummy_dirs, [])]
+        mock_ignore.return_value = []
+        list(file_handler.get_walk_data(dummy_path, ignored=['build*']))
+        self.assertEqual(['src'], dummy_dirs)
+
+    @mock.patch.object(file_handler, 'walk', autospec=True)
+    @mock.patch.object(file_handler, '_load_ignore_file', autospec=True)
+    def test__patterns_with_slash_are_matched_against_the_relative_path(self, mock_ignore, mock_walk):
+        dummy_path = 'root'
+        root_dirs = ['vendor', 'src']
+        src_dirs = ['vendor']
+        vendor_dirs = ['lib', 'tools']
+        mock_walk.return_value = [
+            (dummy_path, root_dirs, []),
+            (os.path.join(dummy_path, 'vendor'), vendor_dirs, []),
+            (os.path.join(dummy_path, 'src'), src_dirs, [])
+        ]
+        mock_ignore.return_value = ['vendor/lib', '/src/vendor']
+        list(file_handler.get_walk_data(dummy_path))
+        self.assertEqual(['vendor', 'src'], root_dirs)
+        self.assertEqual(['tools'], vendor_dirs)
+        self.assertEqual([], src_dirs)
+
+    @mock.patch.object(file_handler, '_load_ignore_file', autospec=True)
+    def test__ignore_patterns_are_assembled_from_all_sources(self, mock_ignore):
+        mock_ignore.return_value = ['from-file']
+        expected = list(defs.IGNORED_DIRECTORIES) + ['from-config', 'from-file']
+        result = file_handler.get_ignore_patterns('root', ['from-config'])
+        self.assertEqual(expected, result)
+        mock_ignore.assert_called_with(os.path.join('root', defs.IGNOREFILE))
+
+    def test__ignore_file_comments_and_empty_lines_are_skipped(self):
+        mock_open = mock.mock_open(read_data='build\n\n# comment\nvendor/lib  # trailing\n')
+        expected = ['build', 'vendor/lib']
+        with mock.patch(builtin_module + '.open', mock_open):
+            result = file_handler._load_ignore_file('...')
+        self.assertEqual(expected, result)
+
+    def test__missing_ignore_file__no_patterns(self):
+        with mock.patch(builtin_module + '.open') as mock_open:
+            mock_open.side_effect = IOError()
+            result = file_handler._load_ignore_file('...')
+        self.assertEqual([], result)
+
+    @mock.patch.object(file_handler, '_load_ignore_file', autospec=True)
+    def test__ignore_filter_matches_the_pruned_directories_and_their_content(self, mock_ignore):
+        mock_ignore.return_value = ['vendor/lib']
+        is_ignored = file_handler.get_ignore_filter('/root', ['build*'])
+        self.assertTrue(is_ignored('/root/build', True))
+        self.assertTrue(is_ignored('/root/src/.git/index', False))
+        self.assertTrue(is_ignored('/root/vendor/lib/a.c', False))
+        self.assertFalse(is_ignored('/root/src/vendor/lib/a.c', False))
+        self.assertFalse(is_ignored('/root/build.sh', False))
+        self.assertFalse(is_ignored('/root/src/main.c', False))
+        self.assertFalse(is_ignored('/root', True))
+        self.assertFalse(is_ignored('/other/build', True))
+
+
 class ErrorHandling(TestCase):
     @mock.patch.object(file_handler, 'walk', autospec=True)
     def test__no_projectfile_at_all__raises_error(self, mock_walk):
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+
+from test.helpers import *
+
+from projects import projectfile
+from projects.projectfile import command_processor
+from projects.projectfile import error
+from projects.projectfile import file_handler
+from projects.projectfile import index
+
+
+class QueuedWatcher(object):
+    """Watcher that reports the events queued by the test."""
+
+    def __init__(self):
+        self.directories = set()
+        self.events = []
+
+    def add(self, path):
+        self.directories.add(path)
+
+    def remove(self, path):
+        self.directories.discard(path)
+
+    def read(self, timeout=None):
+        events, self.events = self.events, []
+        return events
+
+    def close(self):
+        pass
+
+
+class IndexUpdating(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.write('Projectfile', 'from v1.0.0\n\nvalue = 1\n\nbuild:\n    make $value\n\nother:\n    ls\n')
+        self.write('sub/Projectfile', 'from v1.0.0\n\nbuild:\n    make sub\n')
+        self.watcher = QueuedWatcher()
+        self.index = index.ProjectIndex(self.root, watcher=self.watcher)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def assert_up_to_date(self):
+        self.assertEqual(projectfile.get_data_for_root(self.root), self.index.get_data())
+
+    def test__walked_directories_are_watched(self):
+        self.assertEqual(set([self.root, os.path.join(self.root, 'sub')]), self.watcher.directories)
+
+    def test__data_equals_the_data_of_a_full_run(self):
+        self.assert_up_to_date()
+
+    @mock.patch.object(file_handler, 'get_node', wraps=file_handler.get_node)
+    def test__only_the_changed_projectfile_is_parsed(self, mock_get_node):
+        self.index.get_data()
+        path = self.write('sub/Projectfile', 'from v1.0.0\n\nbuild:\n    make changed\n\ntest:\n    pytest\n')
+        self.watcher.events.append((path, False))
+        self.assert_up_to_date()
+        mock_get_node.assert_called_once_with(os.path.join(self.root, 'sub'))
+
+    def test__only_the_affected_commands_are_merged(self):
+        self.index.get_data()
+        path = self.write('sub/Projectfile', 'from v1.0.0\n\nbuild:\n    make changed\n')
+        self.watcher.events.append((path, False))
+        with mock.patch.object(command_processor, 'process_commands', wraps=command_processor.process_commands) as mock_process:
+            self.index.update(0)
+        self.assertEqual(2, mock_process.call_count)
+        for call in mock_process.mock_calls:
+            self.assertEqual(set(['build']), call[1][2])
+        self.assert_up_to_date()
+
+    def test__new_projectfile_in_new_directory_is_picked_up(self):
+        self.index.get_data()
+        path = self.write('new/Projectfile', 'from v1.0.0\n\nnew:\n    echo new\n')
+        self.watcher.events.append((os.path.dirname(path), True))
+        self.assert_up_to_date()
+        self.assertIn(os.path.dirname(path), self.watcher.directories)
+
+    def test__deleted_projectfile_is_dropped(self):
+        self.index.get_data()
+        shutil.rmtree(os.path.join(self.root, 'sub'))
+        self.watcher.events.append((os.path.join(self.root, 'sub'), True))
+        self.assert_up_to_date()
+        self.assertEqual(set([self.root]), self.watcher.directories)
+
+    def test__parse_error_is_reported_until_fixed(self):
+        self.index.get_data()
+        path = self.write('sub/Projectfile', 'invalid\n')
+        self.watcher.events.append((path, False))
+        with self.assertRaises(error.ProjectfileError):
+            self.index.get_data()
+        self.write('sub/Projectfile', 'from v1.0.0\n\nfixed:\n    echo fixed\n')
+        self.watcher.events.append((path, False))
+        self.assert_up_to_date()
+
+    def test__lost_events_reparse_everything(self):
+        self.index.get_data()
+        self.write('Projectfile', 'from v1.0.0\n\nvalue = 2\n\nbuild:\n    make $value\n')
+        self.watcher.events.append((None, True))
+        self.assert_up_to_date()
+
+    def test__changes_in_ignored_directories_are_dropped(self):
+        self.write('.projectignore', 'build\n')
+        self.watcher.events.append((os.path.join(self.root, '.projectignore'), False))
+        self.index.update(0)
+        self.watcher.events.extend([
+            (os.path.join(self.root, 'build'), True),
+            (os.path.join(self.root, '.git', 'index'), False)
+        ])
+        self.assertEqual([], self.index.update(0))
+
+    def test__changes_are_returned(self):
+        path = os.path.join(self.root, 'main.c')
+        self.watcher.events.append((path, False))
+        self.assertEqual([(path, False)], self.index.update(0))
+
+    def test__revision_is_increased_only_by_projectfile_changes(self):
+        revision = self.index.revision
+        self.watcher.events.append((os.path.join(self.root, 'main.c'), False))
+        self.index.update(0)
+        self.assertEqual(revision, self.index.revision)
+        self.watcher.events.append((os.path.join(self.root, 'sub', 'Projectfile'), False))
+        self.index.update(0)
+        self.assertEqual(revision + 1, self.index.revision)
+
+    def test__projectfiles_are_listed_in_walk_order(self):
+        self.assertEqual(projectfile.get_projectfiles(self.root), self.index.get_projectfiles())
+
+    def test__editing_the_same_projectfile_twice_leaves_no_stale_dependencies(self):
+        self.write('Projectfile', 'from v1.0.0\n\na:\n    echo a\n\nbuild: [a]\n    make\n')
+        self.watcher.events.append((os.path.join(self.root, 'Projectfile'), False))
+        content = 'from v1.0.0\n\n{}build: [{}]\n    make sub\n'
+        path = self.write('sub/Projectfile', content.format('b:\n    echo b\n\nc:\n    echo c\n\n', 'b'))
+        self.watcher.events.append((path, False))
+        self.assert_up_to_date()
+        self.write('sub/Projectfile', content.format('b:\n    echo b\n\nc:\n    echo c\n\n', 'c'))
+        self.watcher.events.append((path, False))
+        self.assert_up_to_date()
+        self.assertEqual(['a', 'c'], self.index.get_data()['commands']['build']['dependencies'])
+        self.write('sub/Projectfile', content.format('c:\n    echo c\n\n', 'c'))
+        self.watcher.events.append((path, False))
+        self.assert_up_to_date()
+        self.assertNotIn('b', self.index.get_data()['commands'])
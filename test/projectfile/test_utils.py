@@ -3,7 +3,9 @@
 
 from unittest import TestCase
 
+from projects.projectfile import error
 from projects.projectfile import utils
+from test.helpers import *
 
 
 class AdditionalHelperFunctions(TestCase):
@@ -51,4 +53,57 @@ class AdditionalHelperFunctions(TestCase):
         }
         expected = None
         result = utils.get_current_command(data)
-        self.assertEqual(expected, result)
\ No newline at end of file
+        self.assertEqual(expected, result)
+
+
+class ParsingContextHandling(TestCase):
+    def test__new_context_has_no_active_command(self):
+        context = utils.ParsingContext()
+        self.assertEqual({}, context.data)
+        self.assertEqual(None, context.command)
+
+    def test__context_picks_up_the_active_command_of_existing_data(self):
+        data = {
+            'commands': {
+                'finished-command': {
+                    'done': True
+                },
+                'current-command': {
+                    'done': False
+                }
+            }
+        }
+        context = utils.ParsingContext(data)
+        self.assertTrue(context.command is data['commands']['current-command'])
+
+    def test__first_command_becomes_active(self):
+        context = utils.ParsingContext()
+        context.add_command({
+            'command': {'done': False},
+            'c': {'alias': 'command'}
+        })
+        self.assertTrue(context.command is context.data['commands']['command'])
+
+    def test__new_command_closes_the_active_one(self):
+        context = utils.ParsingContext()
+        context.add_command({'first': {'done': False}})
+        context.add_command({
+            'alternative': {'alias': 'second'},
+            'second': {'done': False}
+        })
+        expected = {
+            'commands': {
+                'first': {'done': True},
+                'second': {'done': False},
+                'alternative': {'alias': 'second'}
+            }
+        }
+        self.assertEqual(expected, context.data)
+        self.assertTrue(context.command is context.data['commands']['second'])
+
+    def test__redefined_command__raises_error(self):
+        context = utils.ParsingContext()
+        context.add_command({'command': {'done': False}})
+        with self.assertRaises(Exception) as cm:
+            context.add_command({'command': {'done': False}})
+        assert_exception(self, cm, SyntaxError, error.COMMAND_HEADER_REDEFINED_ERROR.format('command'))
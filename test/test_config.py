@@ -1,6 +1,9 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
+import shutil
+import tempfile
 from unittest import TestCase
 
 try:
@@ -72,6 +75,34 @@ class Loading(TestCase):
         assert_exception(self, cm, SyntaxError, error_message)
 
 
+class MemoryLoading(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, '.prc')
+        self.write('projects-path: ~/first\n')
+        config.keep_in_memory()
+
+    def tearDown(self):
+        config._memory = None
+        shutil.rmtree(self.directory)
+
+    def write(self, content):
+        with open(self.path, 'w') as f:
+            f.write(content)
+
+    @mock.patch.object(config, '_get_config_path')
+    def test__config_is_parsed_again_only_if_the_file_changes(self, mock_path):
+        mock_path.return_value = self.path
+        with mock.patch.object(config.yaml, 'safe_load', wraps=config.yaml.safe_load) as mock_load:
+            first = config._load_config()
+            first['projects-path'] = 'modified'
+            self.assertEqual({'projects-path': '~/first'}, config._load_config())
+            self.assertEqual(1, mock_load.call_count)
+            self.write('projects-path: ~/second/path\n')
+            self.assertEqual({'projects-path': '~/second/path'}, config._load_config())
+            self.assertEqual(2, mock_load.call_count)
+
+
 class Validation(TestCase):
 
     def test__mandatory_keys_present__no_exception_raised(self):
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from unittest import TestCase, skipUnless
+
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+
+from test.helpers import *
+
+from projects import client
+from projects import daemon
+from projects import main
+from projects.gui import gui
+
+_FD_PASSING = hasattr(socket, 'AF_UNIX') and hasattr(socket.socket, 'sendmsg')
+
+
+@skipUnless(_FD_PASSING, 'file descriptor passing is not supported')
+class RequestTransfer(TestCase):
+    def setUp(self):
+        self.client, self.server = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def test__request_is_received_with_the_file_descriptors(self):
+        read_fd, write_fd = os.pipe()
+        request = {'args': ['p', '/cwd', 'build'], 'cwd': '/cwd', 'env': {'A': 'b' * 100000}}
+        try:
+            daemon.send_request(self.client, request, [write_fd, write_fd, write_fd])
+            received, fds = daemon.receive_request(self.server)
+            self.assertEqual(request, received)
+            self.assertEqual(3, len(fds))
+            os.write(fds[1], b'output')
+            for fd in fds:
+                os.close(fd)
+            self.assertEqual(b'output', os.read(read_fd, 6))
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test__closed_connection_is_not_a_request(self):
+        self.client.close()
+        self.assertEqual((None, []), daemon.receive_request(self.server))
+
+
+@skipUnless(_FD_PASSING, 'file descriptor passing is not supported')
+class ProjectSelectionInDaemon(TestCase):
+    def invoke(self, run):
+        client_socket, server_socket = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        null_fd = os.open(os.devnull, os.O_RDWR)
+        try:
+            daemon.send_request(client_socket, {'args': [], 'cwd': os.getcwd(), 'env': dict(os.environ)}, [null_fd] * 3)
+            daemon._handle(server_socket, run)
+            return client_socket.recv(64)
+        finally:
+            os.close(null_fd)
+            client_socket.close()
+            server_socket.close()
+
+    @mock.patch.object(gui.urwid, 'MainLoop')
+    def test__selections_in_a_row_use_the_streams_of_their_invocation(self, mock_loop):
+        streams = []
+
+        def run(args):
+            with mock.patch.object(gui, 'Screen', wraps=gui.Screen) as mock_screen:
+                gui.select_project(['one', 'two'], lambda path: None)
+            kwargs = mock_screen.call_args[1]
+            streams.append((kwargs['input'] is sys.stdin, kwargs['output'] is sys.stdout,
+                            kwargs['input'].closed, kwargs['output'].closed))
+
+        self.assertEqual(b'0\n', self.invoke(run))
+        self.assertEqual(b'0\n', self.invoke(run))
+        self.assertEqual([(True, True, False, False)] * 2, streams)
+
+    @mock.patch.object(main.paths, 'list_dir_for_path')
+    @mock.patch('projects.gui.select_project')
+    def test__quitting_the_selection_keeps_the_previous_path(self, mock_select, mock_list):
+        conf = {'projects-path': '/projects'}
+        mock_open = mock.mock_open()
+        with mock.patch('projects.main.open', mock_open, create=True):
+            mock_select.side_effect = lambda projects, callback: callback('one')
+            main.handle_project_selection(conf)
+            mock_select.side_effect = lambda projects, callback: None
+            main.handle_project_selection(conf)
+        self.assertEqual(1, mock_open.call_count)
+
+
+@skipUnless(_FD_PASSING, 'file descriptor passing is not supported')
+class OverlappingInvocations(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.directory, 'daemon.sock')
+        self.started = os.path.join(self.directory, 'started')
+        self.release = os.path.join(self.directory, 'release')
+        self.pid = os.fork()
+        if self.pid == 0:
+            try:
+                null_fd = os.open(os.devnull, os.O_RDWR)
+                os.dup2(null_fd, 2)
+                daemon.serve(self.socket_path, self.run_slowly)
+            finally:
+                os._exit(0)
+        self.wait_for(lambda: os.path.exists(self.socket_path))
+
+    def tearDown(self):
+        os.kill(self.pid, signal.SIGINT)
+        os.waitpid(self.pid, 0)
+        shutil.rmtree(self.directory)
+
+    def run_slowly(self, args):
+        open(self.started, 'w').close()
+        self.wait_for(lambda: os.path.exists(self.release))
+
+    def wait_for(self, condition):
+        deadline = time.time() + 5
+        while not condition():
+            if time.time() > deadline:
+                raise AssertionError('Timed out.')
+            time.sleep(0.01)
+
+    def connect(self):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(self.socket_path)
+        null_fd = os.open(os.devnull, os.O_RDWR)
+        try:
+            daemon.send_request(connection, {'args': [], 'cwd': os.getcwd(), 'env': dict(os.environ)}, [null_fd] * 3)
+        finally:
+            os.close(null_fd)
+        return connection
+
+    def receive(self, connection):
+        try:
+            return connection.recv(64)
+        finally:
+            connection.close()
+
+    def test__invocation_during_a_running_one_gets_busy_response(self):
+        first = self.connect()
+        self.wait_for(lambda: os.path.exists(self.started))
+        self.assertEqual(daemon.BUSY_RESPONSE, self.receive(self.connect()))
+        open(self.release, 'w').close()
+        self.assertEqual(b'0\n', self.receive(first))
+        self.assertEqual(b'0\n', self.receive(self.connect()))
+
+
+class InvocationOutcome(TestCase):
+    def test__returning_invocation_exits_with_zero(self):
+        self.assertEqual(0, daemon.run_invocation(lambda args: None, []))
+
+    def test__exit_code_is_taken_from_sys_exit(self):
+        def run(args):
+            sys.exit(-1)
+        self.assertEqual(-1, daemon.run_invocation(run, []))
+
+    def test__interrupted_invocation_exits_with_130(self):
+        def run(args):
+            raise KeyboardInterrupt()
+        self.assertEqual(130, daemon.run_invocation(run, []))
+
+    @mock.patch.object(sys, 'stderr')
+    def test__unexpected_error_is_reported(self, mock_stderr):
+        def run(args):
+            raise ValueError('error')
+        self.assertEqual(1, daemon.run_invocation(run, []))
+        self.assertTrue(mock_stderr.write.called)
+
+
+class ClientFallback(TestCase):
+    @mock.patch.object(client.os, 'execv')
+    @mock.patch.object(client.paths, 'get_socket_path')
+    def test__invocation_runs_in_process_without_daemon(self, mock_path, mock_execv):
+        mock_path.return_value = '/nonexistent/daemon.sock'
+        mock_execv.side_effect = SystemExit(0)
+        with self.assertRaises(SystemExit):
+            client.main(['client', '/cwd', 'build'])
+        mock_execv.assert_called_with(sys.executable, [sys.executable, '-m', 'projects', '/cwd', 'build'])
+
+    @skipUnless(_FD_PASSING, 'file descriptor passing is not supported')
+    @mock.patch.object(client.os, 'execv')
+    @mock.patch.object(client.paths, 'get_socket_path')
+    def test__invocation_runs_in_process_if_daemon_is_busy(self, mock_path, mock_execv):
+        directory = tempfile.mkdtemp()
+        mock_path.return_value = os.path.join(directory, 'daemon.sock')
+        mock_execv.side_effect = SystemExit(0)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        def reply_busy():
+            connection, address = server.accept()
+            request, fds = daemon.receive_request(connection)
+            daemon._close_all(fds)
+            connection.sendall(daemon.BUSY_RESPONSE)
+            connection.close()
+
+        try:
+            server.bind(mock_path.return_value)
+            server.listen(1)
+            thread = threading.Thread(target=reply_busy)
+            thread.start()
+            with self.assertRaises(SystemExit):
+                client.main(['client', '/cwd', 'build'])
+            thread.join()
+        finally:
+            server.close()
+            shutil.rmtree(directory)
+        mock_execv.assert_called_with(sys.executable, [sys.executable, '-m', 'projects', '/cwd', 'build'])
+
+    @mock.patch.object(client.os, 'execv')
+    def test__daemon_is_started_in_process(self, mock_execv):
+        mock_execv.side_effect = SystemExit(0)
+        with self.assertRaises(SystemExit):
+            client.main(['client', '/cwd', '--daemon'])
+        mock_execv.assert_called_with(sys.executable, [sys.executable, '-m', 'projects', '/cwd', '--daemon'])
@@ -1,6 +1,9 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
+import shutil
+import tempfile
 from unittest import TestCase
 try:
     import mock
@@ -86,3 +89,71 @@ class ListDirForPath(TestCase):
         mock_os.path.expanduser.assert_called_with('my-path')
 
 
+class KeptListings(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'a'))
+        paths.keep_listings()
+
+    def tearDown(self):
+        paths._listings = None
+        shutil.rmtree(self.directory)
+
+    def test__unchanged_directory_is_listed_only_once(self):
+        with mock.patch.object(paths.os, 'listdir', wraps=os.listdir) as mock_listdir:
+            self.assertEqual(['a'], paths.list_dir_for_path(self.directory))
+            self.assertEqual(['a'], paths.list_dir_for_path(self.directory))
+        self.assertEqual(1, mock_listdir.call_count)
+
+    def test__changed_directory_is_listed_again(self):
+        paths.list_dir_for_path(self.directory)
+        os.mkdir(os.path.join(self.directory, 'b'))
+        os.utime(self.directory, (1000, 1000))
+        self.assertEqual(['a', 'b'], sorted(paths.list_dir_for_path(self.directory)))
+
+
+
+
+class CachePath(TestCase):
+    @mock.patch('projects.paths.os.path.expanduser')
+    def test__cache_is_located_inside_the_config_folder(self, mock_expand):
+        mock_expand.return_value = '/home/user'
+        result = paths.get_cache_path()
+        self.assertEqual('/home/user/.p/cache', result)
+        mock_expand.assert_called_with('~')
+
+
+class StatePath(TestCase):
+    @mock.patch('projects.paths.os.path.expanduser')
+    def test__state_is_located_inside_the_config_folder(self, mock_expand):
+        mock_expand.return_value = '/home/user'
+        result = paths.get_state_path()
+        self.assertEqual('/home/user/.p/state', result)
+        mock_expand.assert_called_with('~')
+
+
+class ArtifactsPath(TestCase):
+    @mock.patch('projects.paths.os.path.expanduser')
+    def test__artifacts_are_located_inside_the_config_folder(self, mock_expand):
+        mock_expand.return_value = '/home/user'
+        result = paths.get_artifacts_path()
+        self.assertEqual('/home/user/.p/artifacts', result)
+        mock_expand.assert_called_with('~')
+
+
+class ProfilesPath(TestCase):
+    @mock.patch('projects.paths.os.path.expanduser')
+    def test__profiles_are_located_inside_the_config_folder(self, mock_expand):
+        mock_expand.return_value = '/home/user'
+        result = paths.get_profiles_path()
+        self.assertEqual('/home/user/.p/profiles', result)
+        mock_expand.assert_called_with('~')
+
+
+class SocketPath(TestCase):
+    @mock.patch('projects.paths.os.path.expanduser')
+    def test__socket_is_located_inside_the_config_folder(self, mock_expand):
+        mock_expand.return_value = '/home/user'
+        result = paths.get_socket_path()
+        self.assertEqual('/home/user/.p/daemon.sock', result)
+        mock_expand.assert_called_with('~')
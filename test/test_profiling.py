@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+from unittest import TestCase
+
+try:
+    import mock
+except ImportError:
+    from unittest import mock
+
+from test.helpers import *
+
+from projects import main
+from projects import profiling
+
+
+class CpuProfiling(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'profiles', 'p.prof')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @mock.patch.object(sys, 'stderr')
+    def test__statistics_are_dumped_and_summarized(self, mock_stderr):
+        def function():
+            return sorted([3, 1, 2])
+        self.assertEqual([1, 2, 3], profiling.profile_cpu(function, self.path, 5))
+        self.assertTrue(pstats.Stats(self.path).total_calls > 0)
+        output = ''.join(c[1][0] for c in mock_stderr.write.mock_calls)
+        self.assertIn('cumulative', output)
+
+    @mock.patch.object(sys, 'stderr')
+    def test__statistics_are_dumped_on_exit(self, mock_stderr):
+        def function():
+            sys.exit(1)
+        with self.assertRaises(SystemExit):
+            profiling.profile_cpu(function, self.path)
+        self.assertTrue(os.path.isfile(self.path))
+
+
+class MemoryProfiling(TestCase):
+    @mock.patch.object(sys, 'stderr')
+    def test__peak_and_allocation_sites_are_reported(self, mock_stderr):
+        try:
+            import tracemalloc
+        except ImportError:
+            self.skipTest('tracemalloc is not available')
+
+        def function():
+            kept.append([str(i) for i in range(1000)])
+        kept = []
+        profiling.profile_memory(function, 3)
+        output = ''.join(c[1][0] for c in mock_stderr.write.mock_calls)
+        self.assertIn('Peak memory:', output)
+        self.assertIn('test_profiling.py', output)
+
+
+class ProfilingOptions(TestCase):
+    @mock.patch.object(profiling, 'get_default_profile_path')
+    def test__options_are_separated_from_the_arguments(self, mock_path):
+        mock_path.return_value = 'default.prof'
+        args, options = main.get_profiling_options(['p', '/cwd', '--profile', 'build', '--profile-memory'], {})
+        self.assertEqual(['p', '/cwd', 'build'], args)
+        self.assertEqual({'profile-file': 'default.prof', 'profile-memory': True}, options)
+
+    def test__profile_file_can_be_given(self):
+        args, options = main.get_profiling_options(['p', '/cwd', '--profile=out.prof'], {})
+        self.assertEqual('out.prof', options['profile-file'])
+        self.assertFalse(options['profile-memory'])
+
+    @mock.patch.object(profiling, 'get_default_profile_path')
+    def test__environment_variable_turns_profiling_on(self, mock_path):
+        mock_path.return_value = 'default.prof'
+        args, options = main.get_profiling_options(['p', '/cwd'], {'P_PROFILE': '1'})
+        self.assertEqual('default.prof', options['profile-file'])
+        args, options = main.get_profiling_options(['p', '/cwd'], {'P_PROFILE': 'memory'})
+        self.assertTrue(options['profile-memory'])
+        args, options = main.get_profiling_options(['p', '/cwd'], {'P_PROFILE': '0'})
+        self.assertEqual({'profile-file': None, 'profile-memory': False}, options)
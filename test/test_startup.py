@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+from test.helpers import *
+
+from projects import version
+
+# Modules that the command execution path must not import on startup.
+_HEAVY_MODULES = [
+    'pkg_resources',
+    'urwid',
+    'pydoc',
+    'termcolor',
+    'multiprocessing',
+    'cProfile',
+    'tracemalloc',
+    'projects.gui'
+]
+
+
+class StartupImports(TestCase):
+    def get_imported_modules(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = 'import sys, projects.__main__; print("\\n".join(sorted(sys.modules)))'
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=root)
+        return output.decode('utf-8').split()
+
+    def test__heavy_modules_are_not_imported_on_startup(self):
+        modules = self.get_imported_modules()
+        self.assertIn('projects.main', modules)
+        self.assertEqual([], [m for m in _HEAVY_MODULES if m in modules])
+
+
+class Version(TestCase):
+    def test__version_comes_from_the_version_module(self):
+        from projects import main
+        self.assertEqual(version.__version__, main.__version__)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+
+from test.helpers import *
+
+from projects import timing
+
+
+class DisabledRecording(TestCase):
+    def setUp(self):
+        timing.disable()
+
+    def test__spans_are_not_recorded(self):
+        with timing.span('name', 'phase') as span:
+            span.set('key', 'value')
+        self.assertFalse(timing.is_enabled())
+        self.assertEqual([], timing.get_spans())
+
+    def test__disabled_spans_are_shared(self):
+        self.assertIs(timing.span('a', 'phase'), timing.span('b', 'step'))
+
+
+class EnabledRecording(TestCase):
+    def setUp(self):
+        timing.enable()
+
+    def tearDown(self):
+        timing.disable()
+
+    def test__span_is_recorded_with_its_data(self):
+        with timing.span('parse', 'phase', files=3) as span:
+            span.set('exit_code', 0)
+        spans = timing.get_spans()
+        self.assertEqual(1, len(spans))
+        self.assertEqual('parse', spans[0].name)
+        self.assertEqual('phase', spans[0].category)
+        self.assertEqual({'files': 3, 'exit_code': 0}, spans[0].args)
+        self.assertEqual('MainThread', spans[0].thread)
+        self.assertTrue(spans[0].start >= 0)
+        self.assertTrue(spans[0].duration >= 0)
+
+    def test__nested_spans_are_recorded_in_finishing_order(self):
+        with timing.span('outer', 'command'):
+            with timing.span('inner', 'step'):
+                pass
+        spans = timing.get_spans()
+        self.assertEqual(['inner', 'outer'], [s.name for s in spans])
+        self.assertTrue(spans[1].start <= spans[0].start)
+        self.assertTrue(spans[1].duration >= spans[0].duration)
+
+    def test__spans_of_other_threads_are_recorded(self):
+        def work():
+            with timing.span('worker', 'command'):
+                pass
+        thread = threading.Thread(target=work, name='worker-thread')
+        thread.start()
+        thread.join()
+        self.assertEqual('worker-thread', timing.get_spans()[0].thread)
+
+    def test__summary_aggregates_and_sorts_the_spans(self):
+        for name, duration in [('a', 0.001), ('b', 0.003), ('a', 0.001)]:
+            span = timing.Span(name, 'step', {})
+            span.start = 0
+            span.duration = duration
+            timing._spans.append(span)
+        lines = timing.format_summary().splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertEqual(['step', '1', '3.0', 'b'], lines[1].split())
+        self.assertEqual(['step', '2', '2.0', 'a'], lines[2].split())
+
+    def test__spans_are_appended_as_json_lines(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'timings.jsonl')
+            with timing.span('walk', 'phase'):
+                pass
+            timing.write_json_lines(path)
+            timing.write_json_lines(path)
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(2, len(lines))
+        self.assertEqual('walk', lines[0]['name'])
+        self.assertEqual(timing.get_start_time(), lines[0]['invocation'])
+
+    def test__measured_spans_can_be_added(self):
+        timing.add_span('parse Projectfile', 'phase', 0.5, 0.25, 'parser-1', path='Projectfile')
+        span = timing.get_spans()[0]
+        self.assertEqual('parser-1', span.thread)
+        self.assertEqual(0.5, span.start)
+        self.assertEqual({'path': 'Projectfile'}, span.args)
+
+    def test__spans_are_written_as_trace_events(self):
+        timing.add_span('a', 'command', 0.002, 0.001, 'worker-1', exit_code=0)
+        timing.add_span('walk', 'phase', 0.001, 0.001, 'MainThread')
+        timing.add_span('b', 'command', 0.003, 0.001, 'worker-1')
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'trace.json')
+            timing.write_trace(path)
+            with open(path) as f:
+                events = json.load(f)['traceEvents']
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(['M', 'X', 'M', 'X', 'X'], [e['ph'] for e in events])
+        self.assertEqual({'name': 'worker-1'}, events[2]['args'])
+        self.assertEqual([1, 1, 2, 2, 2], [e['tid'] for e in events])
+        self.assertAlmostEqual(2000, events[3]['ts'])
+        self.assertAlmostEqual(1000, events[3]['dur'])
+        self.assertEqual({'exit_code': 0}, events[3]['args'])
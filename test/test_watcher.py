@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from test.helpers import *
+
+from projects import watcher
+
+
+class WatcherBehavior(object):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.watcher = self.create_watcher()
+        self.watcher.add(self.directory)
+
+    def tearDown(self):
+        self.watcher.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test__written_file_is_reported(self):
+        with open(self.path('Projectfile'), 'w') as f:
+            f.write('content')
+        self.assertIn((self.path('Projectfile'), False), self.watcher.read(5))
+
+    def test__created_and_deleted_directories_are_reported(self):
+        os.mkdir(self.path('sub'))
+        self.assertIn((self.path('sub'), True), self.watcher.read(5))
+        os.rmdir(self.path('sub'))
+        self.assertIn((self.path('sub'), True), self.watcher.read(5))
+
+    def test__timeout_without_changes_returns_no_events(self):
+        self.assertEqual([], self.watcher.read(0.05))
+
+    def test__removed_directory_is_not_reported(self):
+        self.watcher.remove(self.directory)
+        os.mkdir(self.path('sub'))
+        self.assertEqual([], self.watcher.read(0.05))
+
+    def test__missing_directory_cannot_be_watched(self):
+        with self.assertRaises(OSError):
+            self.watcher.add(self.path('missing'))
+
+
+class InotifyWatching(WatcherBehavior, TestCase):
+    def create_watcher(self):
+        try:
+            return watcher.InotifyWatcher()
+        except OSError:
+            self.skipTest('inotify is not available')
+
+
+class PollingWatching(WatcherBehavior, TestCase):
+    def create_watcher(self):
+        return watcher.PollingWatcher(interval=0.01)